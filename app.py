@@ -1,7 +1,8 @@
-import logging, json, time
+import logging, json, math, os, time
+import numpy as np
 from rich.logging import RichHandler
 from rich.traceback import install as rich_traceback_install
-from flask import Flask, request, jsonify, render_template, g
+from flask import Flask, Response, request, jsonify, render_template, g
 
 rich_traceback_install(show_locals=False, width=120)
 
@@ -30,11 +31,25 @@ def api_click():
             f"[magenta]MAP CLICK[/] type={click_type} "
             f"lat={lat:.6f} lon={lon:.6f}" + (f" alg={alg}" if alg else "")
         )
+        # ALT-ийн "od" landmark сонголтод зориулсан эхлэл/төгсгөлийн лог.
+        if CLICK_LOG:
+            try:
+                with open(CLICK_LOG, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"type": click_type, "lat": lat, "lon": lon,
+                                        "ts": round(time.time(), 3)}) + "\n")
+            except OSError as exc:
+                logger.warning(f"click log бичиж чадсангүй: {exc}")
         return jsonify({"ok": True})
     except Exception:
         logger.exception("click log parse error")
         return jsonify({"ok": False, "error": "bad payload"}), 400
 
+@app.errorhandler(TimeoutError)
+def _graph_busy(exc):
+    # read_consistent: жингийн шинэчлэлт дуусаагүй (бичигч унасан) үед хайлт гацахгүй.
+    logger.error(f"[bold red]GRAPH BUSY[/] {exc}")
+    return jsonify({"error": "Граф шинэчлэгдэж байна, дахин оролдоно уу."}), 503
+
 @app.before_request
 def _start_timer():
     g._t0 = time.perf_counter()
@@ -63,6 +78,7 @@ def _log_request(resp):
                         "alg": data.get("algorithm"),
                         "nodes": len(data.get("nodes", [])),
                         "weight": data.get("total_weight"),
+                        "settled": data.get("settled"),
                     }
             except:
                 pass
@@ -78,20 +94,154 @@ def _log_request(resp):
     return resp
 
 from graph import (
-    RoadGraph,
+    CSRGraph,
+    EdgeUpdate,
+    SearchStats,
+    astar_shortest,
+    astar_snapped,
     bfs_shortest_hops,
+    bidijkstra_shortest,
+    bidijkstra_snapped,
     dfs_all_paths,
     dijkstra_shortest,
+    dijkstra_snapped,
+)
+from graph.algorithms.alt import load_or_build_landmarks
+from graph.algorithms.ch import load_or_build_hierarchy
+from graph.algorithms.crp import (
+    load_customized_overlay,
+    load_or_build_overlay,
+    save_customized_overlay,
 )
-from graph.io.loader import load_graph_from_shapefile
+from graph.algorithms.hub_labels import load_or_build_hub_labels
+from graph.io.snapshot import load_graph_cached
+from graph.shared import SHM_ENV, attach_shared
 
 SHAPEFILE_PATH = "data/gis_osm_roads_free_1.shp"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(SHAPEFILE_PATH)), ".graph_cache")
+# /api/click-ийн JSONL лог (ROUTE_CLICK_LOG="" бол бичихгүй)
+CLICK_LOG = os.environ.get("ROUTE_CLICK_LOG", os.path.join(CACHE_DIR, "clicks.jsonl"))
 UB_CENTER = (47.918, 106.917)
+ADMIN_TOKEN = os.environ.get("ROUTE_ADMIN_TOKEN")
+# /api/snap нэг хүсэлтэд дээд тал нь хэдэн цэг (ROUTE_MAX_SNAP_POINTS)
+MAX_SNAP_POINTS = int(os.environ.get("ROUTE_MAX_SNAP_POINTS", 1_000_000))
+# Бүсийн граф: ROUTE_BBOX="minlon,minlat,maxlon,maxlat" (жишээ нь UB_CENTER орчим)
+REGION_BBOX = (tuple(float(v) for v in os.environ["ROUTE_BBOX"].split(","))
+               if os.environ.get("ROUTE_BBOX") else None)
 
 
-app.logger.info("Shapefile-с граф үүсгэж байна...")
-GRAPH: RoadGraph = load_graph_from_shapefile(SHAPEFILE_PATH, reproject_to_meters=False)
+if os.environ.get(SHM_ENV):
+    app.logger.info(f"Shared memory граф руу холбогдож байна: {os.environ[SHM_ENV]}")
+    GRAPH: CSRGraph = attach_shared(os.environ[SHM_ENV])
+else:
+    app.logger.info("Shapefile-с граф үүсгэж байна...")
+    GRAPH = load_graph_cached(SHAPEFILE_PATH, reproject_to_meters=False, bbox=REGION_BBOX)
 app.logger.info(f"Граф үүссэн. node={len(GRAPH.nodes)}")
+# Ирмэгийн R-tree (shapely) shared memory-д орохгүй тул анхны snap=edge хүсэлтээр
+# shared координатаас барина; snap хийдэггүй worker санах ой зарцуулахгүй.
+# Contraction hierarchy: cache-д байвал ачаална (ROUTE_BUILD_CH=1 үед байхгүй бол барина).
+CH = load_or_build_hierarchy(GRAPH, CACHE_DIR, build=bool(os.environ.get("ROUTE_BUILD_CH")))
+if CH is None:
+    app.logger.info("Contraction hierarchy алга; alg=ch нь bidijkstra-аар хайна.")
+
+
+def ch_shortest(graph, start, goal, stats):
+    # Жин өөрчлөгдсөн (version) бол hierarchy хуучирсан тул bidijkstra руу буцна.
+    if CH is not None and CH.is_valid(graph):
+        return CH.shortest(graph, start, goal, stats)
+    return bidijkstra_shortest(graph, start, goal, stats)
+
+
+def ch_snapped(graph, src, dst, stats):
+    if CH is not None and CH.is_valid(graph):
+        return CH.snapped(graph, src, dst, stats)
+    return bidijkstra_snapped(graph, src, dst, stats)
+
+# ALT landmark-ууд: cache-д байвал ачаална (ROUTE_BUILD_ALT=1 үед байхгүй бол барина).
+ALT = load_or_build_landmarks(GRAPH, CACHE_DIR, build=bool(os.environ.get("ROUTE_BUILD_ALT")))
+if ALT is None:
+    app.logger.info("Landmark алга; alg=alt нь astar-аар хайна.")
+
+
+def alt_shortest(graph, start, goal, stats):
+    # Жингийн өөрчлөлтийг Landmarks.scale даах тул зөвхөн бүтэц таарахыг шалгана.
+    if ALT is not None and ALT.is_valid(graph):
+        return ALT.shortest(graph, start, goal, stats)
+    return astar_shortest(graph, start, goal, stats)
+
+
+def alt_snapped(graph, src, dst, stats):
+    if ALT is not None and ALT.is_valid(graph):
+        return ALT.snapped(graph, src, dst, stats)
+    return astar_snapped(graph, src, dst, stats)
+
+# Hub label: cache-д байвал ачаална (ROUTE_BUILD_HL=1 үед байхгүй бол барина).
+HL = load_or_build_hub_labels(GRAPH, CACHE_DIR, build=bool(os.environ.get("ROUTE_BUILD_HL")))
+if HL is None:
+    app.logger.info("Hub label алга; alg=hl нь bidijkstra-аар хайна.")
+
+
+def hl_shortest(graph, start, goal, stats):
+    # Label-ууд CH-тэй адил жингийн өөрчлөлтөөр хуучирна.
+    if HL is not None and HL.is_valid(graph):
+        return HL.shortest(graph, start, goal, stats)
+    return bidijkstra_shortest(graph, start, goal, stats)
+
+
+def hl_snapped(graph, src, dst, stats):
+    if HL is not None and HL.is_valid(graph):
+        return HL.snapped(graph, src, dst, stats)
+    return bidijkstra_snapped(graph, src, dst, stats)
+
+# CRP overlay: cache-д байвал ачаална (ROUTE_BUILD_CRP=1 үед байхгүй бол барина).
+# Жин өөрчлөгдөхөд admin хүсэлт хүлээн авсан worker л хөндөгдсөн cell-үүдийг
+# дахин тооцож (ROUTE_CRP_WORKERS процесс, default 1) cache-д хадгална.
+CRP_WORKERS = int(os.environ.get("ROUTE_CRP_WORKERS", 1))
+CRP = load_or_build_overlay(GRAPH, CACHE_DIR, build=bool(os.environ.get("ROUTE_BUILD_CRP")),
+                            workers=CRP_WORKERS)
+if CRP is None:
+    app.logger.info("CRP overlay алга; alg=crp нь bidijkstra-аар хайна.")
+
+
+def _crp_overlay(graph):
+    # Өөр worker жин өөрчилсөн (shared memory) бол түүний хадгалсан overlay-г
+    # ачаална; хараахан бэлэн биш бол энэ хүсэлт bidijkstra-аар явна.
+    global CRP
+    if CRP is None or not CRP.is_valid(graph):
+        return None
+    if not CRP.is_customized(graph):
+        fresh = load_customized_overlay(graph, CACHE_DIR)
+        if fresh is None:
+            return None
+        CRP = fresh
+    return CRP
+
+
+def crp_shortest(graph, start, goal, stats):
+    overlay = _crp_overlay(graph)
+    if overlay is not None:
+        return overlay.shortest(graph, start, goal, stats)
+    return bidijkstra_shortest(graph, start, goal, stats)
+
+
+def crp_snapped(graph, src, dst, stats):
+    overlay = _crp_overlay(graph)
+    if overlay is not None:
+        return overlay.snapped(graph, src, dst, stats)
+    return bidijkstra_snapped(graph, src, dst, stats)
+
+# Жинтэй хайлтууд: alg -> (node-оос node, ирмэг дээр snap хийсэн цэгүүдээс).
+WEIGHTED_ENGINES = {
+    "dijkstra": (dijkstra_shortest, dijkstra_snapped),
+    "astar": (astar_shortest, astar_snapped),
+    "bidijkstra": (bidijkstra_shortest, bidijkstra_snapped),
+    "ch": (ch_shortest, ch_snapped),
+    "alt": (alt_shortest, alt_snapped),
+    "hl": (hl_shortest, hl_snapped),
+    "crp": (crp_shortest, crp_snapped),
+}
+# Ирмэгийн жингийн нэгж: haversine жинтэй граф метрээр, бусад нь CRS-ийн нэгжээр.
+WEIGHT_UNIT = "m" if GRAPH.meta.get("options", {}).get("weights") == "haversine" else None
 
 @app.route("/")
 def index():
@@ -99,6 +249,11 @@ def index():
                            center_lat=UB_CENTER[0],
                            center_lon=UB_CENTER[1])
 
+def _search(engine, *args):
+    stats = SearchStats()
+    node_path, total_weight = engine(GRAPH, *args, stats)
+    return node_path, total_weight, stats.settled
+
 @app.route("/api/path")
 def api_path():
     try:
@@ -109,40 +264,160 @@ def api_path():
         end_lat = float(request.args["end_lat"])
     except (KeyError, ValueError):
         return jsonify({"error": "Параметр буруу байна."}), 400
+    # Жинтэй хайлтыг default-аар ирмэг дээр snap хийсэн цэгүүдээс эхлүүлнэ.
+    snap = request.args.get("snap", "edge" if alg in WEIGHTED_ENGINES else "node").lower()
+
+    if snap == "edge" and alg in WEIGHTED_ENGINES:
+        src = GRAPH.snap_to_edge(start_lon, start_lat, main_component=True)
+        dst = GRAPH.snap_to_edge(end_lon, end_lat, main_component=True)
+        if src is None or dst is None:
+            return jsonify({"error": "Ойролцоо зам олдсонгүй."}), 404
+        node_path, total_weight, settled = GRAPH.read_consistent(
+            lambda: _search(WEIGHTED_ENGINES[alg][1], src, dst))
+        if total_weight == float("inf"):
+            app.logger.info(f"No path ({alg}, edge snap): start={src}, end={dst}")
+            return jsonify({"error": "Зам олдсонгүй."}), 404
+        coords = [{"lon": lon, "lat": lat}
+                  for lon, lat in GRAPH.snapped_path_coords(src, dst, node_path)]
+        return jsonify({
+            "algorithm": alg,
+            "snap": snap,
+            "nodes": node_path,
+            "orig_nodes": GRAPH.snapped_original_ids(src, dst, node_path),
+            "coords": coords,
+            "total_weight": total_weight,
+            "weight_unit": WEIGHT_UNIT,
+            "settled": settled,
+        })
 
-    start_node = GRAPH.nearest_node(start_lon, start_lat)
-    end_node = GRAPH.nearest_node(end_lon, end_lat)
+    start_node = GRAPH.nearest_node(start_lon, start_lat, main_component=True)
+    end_node = GRAPH.nearest_node(end_lon, end_lat, main_component=True)
 
     if start_node == -1 or end_node == -1:
         return jsonify({"error": "Ойролцоо зангилаа олдсонгүй."}), 404
 
+    if not GRAPH.may_reach(start_node, end_node):
+        app.logger.info(f"Unreachable ({alg}): start={start_node}, end={end_node}")
+        return jsonify({"error": "Зам олдсонгүй."}), 404
+
+    settled = None
     if alg == "bfs":
-        node_path = bfs_shortest_hops(GRAPH, start_node, end_node)
+        node_path = GRAPH.read_consistent(
+            lambda: bfs_shortest_hops(GRAPH, start_node, end_node))
         total_weight = None
     elif alg == "dfs":
         max_paths = int(request.args.get("max_paths", 1))
         max_depth = int(request.args.get("max_depth", 20000))
         max_expanded = int(request.args.get("max_expanded", 1000000))
-        paths = dfs_all_paths(GRAPH, start_node, end_node,
-                              max_paths=max_paths,
-                              max_depth=max_depth,
-                              max_expanded=max_expanded)
+        paths = GRAPH.read_consistent(
+            lambda: dfs_all_paths(GRAPH, start_node, end_node,
+                                  max_paths=max_paths,
+                                  max_depth=max_depth,
+                                  max_expanded=max_expanded))
         node_path = paths[0] if paths else []
         total_weight = None
-    else:  # dijkstra
-        node_path, total_weight = dijkstra_shortest(GRAPH, start_node, end_node)
+    else:  # dijkstra, astar, bidijkstra, ch, alt, hl, crp
+        engine = WEIGHTED_ENGINES.get(alg, WEIGHTED_ENGINES["dijkstra"])[0]
+        node_path, total_weight, settled = GRAPH.read_consistent(
+            lambda: _search(engine, start_node, end_node))
 
     if not node_path:
         app.logger.info(f"No path ({alg}): start={start_node}, end={end_node}")
         return jsonify({"error": "Зам олдсонгүй."}), 404
 
-    coords = [{"lon": GRAPH.nodes[nid][0], "lat": GRAPH.nodes[nid][1]} for nid in node_path]
+    coords = [{"lon": lon, "lat": lat} for lon, lat in GRAPH.path_coords(node_path)]
     return jsonify({
         "algorithm": alg,
+        "snap": "node",
         "nodes": node_path,
+        "orig_nodes": GRAPH.original_ids(node_path),
         "coords": coords,
         "total_weight": total_weight,
+        "weight_unit": WEIGHT_UNIT,
+        "settled": settled,
+    })
+
+@app.post("/api/snap")
+def api_snap():
+    """
+    GPS цэгүүдийг хамгийн ойр node руу багцаар snap хийнэ: JSON {"points": [[lon, lat], ...]}
+    эсвэл octet-stream float64 хосууд → node-ууд ба зай_м (олдоогүй бол -1).
+    Параметр: max_dist_m, main_component (default 1).
+    """
+    binary = request.mimetype == "application/octet-stream"
+    try:
+        if binary:
+            body = request.get_data()
+            if len(body) % 16:
+                raise ValueError("өгөгдлийн урт 16-д хуваагдахгүй байна")
+            points = np.frombuffer(body, dtype="<f8").reshape(-1, 2)
+            max_dist = request.args.get("max_dist_m")
+        else:
+            data = request.get_json(silent=True) or {}
+            points = np.asarray(data.get("points", []), dtype=np.float64).reshape(-1, 2)
+            max_dist = data.get("max_dist_m", request.args.get("max_dist_m"))
+        max_dist = None if max_dist is None else float(max_dist)
+        main_component = request.args.get("main_component", "1") not in ("0", "false", "no")
+    except (TypeError, ValueError) as exc:
+        return jsonify({"error": f"Параметр буруу байна: {exc}"}), 400
+    if len(points) > MAX_SNAP_POINTS:
+        return jsonify({"error": f"Цэг хэт олон байна (дээд тал нь {MAX_SNAP_POINTS})."}), 413
+
+    nodes, dist = GRAPH.nearest_nodes(points[:, 0], points[:, 1],
+                                      main_component=main_component, max_dist_m=max_dist)
+    if binary:
+        return Response(nodes.astype("<i8").tobytes() + dist.astype("<f8").tobytes(),
+                        mimetype="application/octet-stream")
+    return jsonify({
+        "nodes": nodes.tolist(),
+        "dist_m": [None if np.isinf(d) else d for d in dist.tolist()],
     })
 
+def _json_bool(item, key, default):
+    # bool("false") нь True тул JSON-ын жинхэнэ true/false-оос өөрийг татгалзана.
+    value = item.get(key, default)
+    if value is not None and not isinstance(value, bool):
+        raise ValueError(f"{key} нь true/false байх ёстой: {value!r}")
+    return value
+
+@app.post("/api/admin/edges")
+def api_admin_edges():
+    """
+    Замын хаалт / жингийн шинэчлэлт (граф дахин ачаалахгүй):
+    {"updates": [{"u": 1, "v": 2, "closed": true}, {"u": 3, "v": 4, "weight": 185.0}]}
+    weight нь графын жингийн нэгжээр (/api/path-ын weight_unit).
+    """
+    if not ADMIN_TOKEN or request.headers.get("X-Admin-Token") != ADMIN_TOKEN:
+        return jsonify({"error": "Эрх хүрэлцэхгүй байна."}), 403
+    try:
+        data = request.get_json(silent=True) or {}
+        updates = []
+        for item in data.get("updates", []):
+            u, v = int(item["u"]), int(item["v"])
+            if u not in GRAPH.nodes or v not in GRAPH.nodes:
+                raise ValueError(f"node байхгүй: {u}, {v}")
+            weight = item.get("weight")
+            if weight is not None and not (math.isfinite(float(weight)) and float(weight) >= 0):
+                # NaN бүх харьцуулалтад False тул хайлтыг чимээгүй эвдэнэ; хаахад closed.
+                raise ValueError("жин сөрөг биш төгсгөлөг тоо байх ёстой (хаахад closed)")
+            updates.append(EdgeUpdate(
+                u=u, v=v,
+                weight=None if weight is None else float(weight),
+                closed=_json_bool(item, "closed", None),
+                both_directions=_json_bool(item, "both_directions", False),
+            ))
+    except (KeyError, TypeError, ValueError) as exc:
+        return jsonify({"error": f"Параметр буруу байна: {exc}"}), 400
+
+    changed = GRAPH.update_edges(updates)
+    logger.info(f"[yellow]EDGE UPDATE[/] updates={len(updates)} edges={changed} version={GRAPH.version}")
+    if CRP is not None and CRP.is_valid(GRAPH):
+        # Нэг л удаа энд; бусад worker-ууд хадгалсан үр дүнг нь ачаална.
+        cells = CRP.customize(GRAPH, CRP_WORKERS)
+        save_customized_overlay(CRP, GRAPH, CACHE_DIR)
+        logger.info(f"[yellow]CRP CUSTOMIZE[/] cells={cells} "
+                    f"seconds={CRP.meta['customize_seconds']:.2f}")
+    return jsonify({"ok": True, "edges": changed, "version": GRAPH.version})
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,52 @@
+"""
+RoadGraph (dict-of-lists) ба түүнээс хөлдөөсөн CSRGraph-ийн санах ой болон
+dijkstra_shortest-ийн хурдыг УБ даяарх урт маршрутууд дээр харьцуулна.
+
+    python -m benchmarks.bench_csr [shapefile] [--routes 30]
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from graph import dijkstra_shortest
+from graph.io.loader import edges_to_road_graph, load_edge_list
+
+from .bench_reorder import long_routes
+
+SHAPEFILE_PATH = "data/gis_osm_roads_free_1.shp"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("shapefile", nargs="?", default=SHAPEFILE_PATH)
+    parser.add_argument("--routes", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    edges = load_edge_list(args.shapefile)
+    tracemalloc.start()
+    road = edges_to_road_graph(edges)
+    road_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    csr = road.freeze()
+    csr_mb = sum(arr.nbytes for arr in csr.arrays().values()) / 1e6
+    pairs = long_routes(csr, args.routes)
+
+    print(f"nodes={csr.num_nodes} edges={csr.num_edges} routes={len(pairs)}")
+    print(f"санах ой: RoadGraph {road_mb:.1f} MB, CSR {csr_mb:.1f} MB ({road_mb / csr_mb:.1f}x)")
+    baseline = None
+    for name, graph in (("RoadGraph", road), ("CSR", csr)):
+        runs = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            for s, t in pairs:
+                dijkstra_shortest(graph, s, t)
+            runs.append((time.perf_counter() - t0) / len(pairs) * 1000)
+        ms = statistics.median(runs)
+        baseline = baseline or ms
+        print(f"{name:>9}: {ms:8.2f} ms/route  ({baseline / ms:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Замын давхаргыг Shapefile / GeoParquet / FlatGeobuf-аас унших (граф барих
+хүртэлх) хугацааг харьцуулна. Хөрвүүлсэн файлууд байхгүй бол түр хавтаст
+үүсгэнэ; гурван форматаас гарсан граф ижил эсэхийг мөн шалгана.
+
+    python -m benchmarks.bench_formats [shapefile] [--repeat 3]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from graph.io.convert import convert
+from graph.io.loader import edges_to_csr, load_edge_list
+
+SHAPEFILE_PATH = "data/gis_osm_roads_free_1.shp"
+
+
+def same_graph(a, b) -> bool:
+    arrays_a, arrays_b = a.arrays(), b.arrays()
+    return (arrays_a.keys() == arrays_b.keys() and a.meta == b.meta
+            and all(np.array_equal(arrays_a[k], arrays_b[k]) for k in arrays_a))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("shapefile", nargs="?", default=SHAPEFILE_PATH)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stem = os.path.splitext(os.path.basename(args.shapefile))[0]
+        paths = {"shapefile": args.shapefile}
+        for fmt, ext in (("geoparquet", ".parquet"), ("flatgeobuf", ".fgb")):
+            paths[fmt] = os.path.join(tmp, stem + ext)
+            convert(args.shapefile, paths[fmt])
+
+        reference = None
+        baseline = None
+        for fmt, path in paths.items():
+            runs = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                edges = load_edge_list(path)
+                runs.append(time.perf_counter() - t0)
+            graph, _ = edges_to_csr(edges)
+            reference = reference or graph
+            ms = statistics.median(runs) * 1000
+            baseline = baseline or ms
+            size = sum(os.path.getsize(p) for p in
+                       ([path] if fmt != "shapefile" else
+                        [os.path.splitext(path)[0] + e for e in (".shp", ".shx", ".dbf")]))
+            print(f"{fmt:>10}: {ms:8.1f} ms  {size / 2**20:7.1f} MiB  ({baseline / ms:.2f}x)"
+                  f"  ижил={same_graph(reference, graph)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Node-уудын дараалал (shapefile / BFS / Hilbert) dijkstra_shortest-ийн
+хурдад хэрхэн нөлөөлөхийг УБ даяарх урт маршрутууд дээр хэмжинэ.
+
+    python -m benchmarks.bench_reorder [shapefile] [--routes 30]
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from graph import dijkstra_shortest
+from graph.io.snapshot import load_graph_cached
+
+SHAPEFILE_PATH = "data/gis_osm_roads_free_1.shp"
+
+
+def orig_ids(graph) -> np.ndarray:
+    if graph.orig_ids is None:
+        return np.arange(graph.num_nodes)
+    return np.asarray(graph.orig_ids)
+
+
+def long_routes(graph, count: int, seed: int = 0):
+    """
+    Санамсаргүй хосуудаас шулуун зай нь хамгийн урт `count`-ийг (анхны id-аар) сонгоно.
+    """
+    rng = np.random.default_rng(seed)
+    n = graph.num_nodes
+    a = rng.integers(0, n, size=count * 20)
+    b = rng.integers(0, n, size=count * 20)
+    d = (graph.lon[a] - graph.lon[b]) ** 2 + (graph.lat[a] - graph.lat[b]) ** 2
+    best = np.argsort(d)[::-1][:count]
+    orig = orig_ids(graph)
+    return [(int(orig[a[i]]), int(orig[b[i]])) for i in best]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("shapefile", nargs="?", default=SHAPEFILE_PATH)
+    parser.add_argument("--routes", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    graphs = {mode: load_graph_cached(args.shapefile, reorder=mode)
+              for mode in ("none", "bfs", "hilbert")}
+    routes = long_routes(graphs["none"], args.routes)
+
+    print(f"nodes={graphs['none'].num_nodes} edges={graphs['none'].num_edges} routes={len(routes)}")
+    baseline = None
+    for mode, graph in graphs.items():
+        to_new = {int(o): i for i, o in enumerate(orig_ids(graph).tolist())}
+        pairs = [(to_new[s], to_new[t]) for s, t in routes]
+        runs = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            for s, t in pairs:
+                dijkstra_shortest(graph, s, t)
+            runs.append((time.perf_counter() - t0) / len(pairs) * 1000)
+        ms = statistics.median(runs)
+        baseline = baseline or ms
+        print(f"{mode:>8}: {ms:8.2f} ms/route  ({baseline / ms:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
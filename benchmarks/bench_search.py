@@ -0,0 +1,87 @@
+"""
+Хайлтын хөдөлгүүрүүдийг dijkstra_shortest-тэй УБ даяарх урт маршрутууд
+дээр харьцуулна: жин ижил эсэх, settled node-ын тоо, хугацаа.
+
+    python -m benchmarks.bench_search [shapefile] [--routes 30]
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+
+from graph import SearchStats, astar_shortest, bidijkstra_shortest, dijkstra_shortest
+from graph.algorithms.alt import load_or_build_landmarks
+from graph.algorithms.ch import load_or_build_hierarchy
+from graph.algorithms.crp import load_or_build_overlay
+from graph.algorithms.hub_labels import load_or_build_hub_labels
+from graph.io.snapshot import load_graph_cached
+
+from .bench_reorder import long_routes, orig_ids
+
+SHAPEFILE_PATH = "data/gis_osm_roads_free_1.shp"
+
+ENGINES = {
+    "dijkstra": dijkstra_shortest,
+    "astar": astar_shortest,
+    "bidijkstra": bidijkstra_shortest,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("shapefile", nargs="?", default=SHAPEFILE_PATH)
+    parser.add_argument("--routes", type=int, default=30)
+    parser.add_argument("--ch", action="store_true",
+                        help="contraction hierarchy-г (байхгүй бол барьж) харьцуулна")
+    parser.add_argument("--alt", action="store_true",
+                        help="ALT landmark-уудыг (байхгүй бол барьж) харьцуулна")
+    parser.add_argument("--hl", action="store_true",
+                        help="hub label-ийг (байхгүй бол барьж) зам сэргээх ба зөвхөн зайгаар харьцуулна")
+    parser.add_argument("--crp", action="store_true",
+                        help="CRP overlay-г (байхгүй бол барьж) харьцуулна")
+    args = parser.parse_args()
+
+    graph = load_graph_cached(args.shapefile)
+    engines = dict(ENGINES)
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(args.shapefile)), ".graph_cache")
+    if args.ch:
+        ch = load_or_build_hierarchy(graph, cache_dir)
+        engines["ch"] = ch.shortest
+    if args.alt:
+        alt = load_or_build_landmarks(graph, cache_dir)
+        engines["alt"] = alt.shortest
+    if args.hl:
+        hl = load_or_build_hub_labels(graph, cache_dir)
+        engines["hl"] = hl.shortest
+        engines["hl-dist"] = lambda graph, s, t, stats: ([], hl.distance(s, t))
+    if args.crp:
+        crp = load_or_build_overlay(graph, cache_dir, workers=os.cpu_count() or 1)
+        engines["crp"] = crp.shortest
+    to_new = {int(o): i for i, o in enumerate(orig_ids(graph).tolist())}
+    pairs = [(to_new[s], to_new[t]) for s, t in long_routes(graph, args.routes)]
+    print(f"nodes={graph.num_nodes} edges={graph.num_edges} routes={len(pairs)}")
+
+    reference = None
+    base_settled = base_ms = None
+    for name, engine in engines.items():
+        weights, settled, runs = [], [], []
+        for s, t in pairs:
+            stats = SearchStats()
+            t0 = time.perf_counter()
+            _, weight = engine(graph, s, t, stats)
+            runs.append((time.perf_counter() - t0) * 1000)
+            weights.append(weight)
+            settled.append(stats.settled)
+        reference = reference or weights
+        same = all(math.isclose(a, b, rel_tol=1e-9) for a, b in zip(reference, weights))
+        mean_settled = statistics.mean(settled)
+        ms = statistics.median(runs)
+        base_settled = base_settled or mean_settled
+        base_ms = base_ms or ms
+        print(f"{name:>10}: settled={mean_settled:10.0f} ({mean_settled / base_settled:5.1%})"
+              f"  {ms:8.2f} ms/route ({base_ms / ms:.2f}x)  ижил жин={same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Node-д ба ирмэгт snap хийх хоёр аргыг санамсаргүй товшилтын хосууд дээр
+харьцуулна: R-tree барих хугацаа, snap-ийн хугацаа, settled node, маршрутын
+дундаж жин (node snap-д товшилтоос node хүртэлх зай орохгүй).
+
+    python -m benchmarks.bench_snap [shapefile] [--routes 200]
+"""
+import argparse
+import math
+import statistics
+import time
+
+import numpy as np
+
+from graph import SearchStats, dijkstra_shortest, dijkstra_snapped
+from graph.io.snapshot import load_graph_cached
+
+SHAPEFILE_PATH = "data/gis_osm_roads_free_1.shp"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("shapefile", nargs="?", default=SHAPEFILE_PATH)
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    graph = load_graph_cached(args.shapefile)
+    t0 = time.perf_counter()
+    graph.edge_index(main_component=True)
+    print(f"nodes={graph.num_nodes} edges={graph.num_edges} "
+          f"R-tree: {time.perf_counter() - t0:.2f} s")
+
+    rng = np.random.default_rng(args.seed)
+    lon, lat = np.asarray(graph.lon), np.asarray(graph.lat)
+    clicks = np.column_stack([rng.uniform(lon.min(), lon.max(), args.routes * 2),
+                              rng.uniform(lat.min(), lat.max(), args.routes * 2)])
+
+    for mode in ("node", "edge"):
+        snap_ms, settled, weights = [], [], []
+        for (slon, slat), (tlon, tlat) in zip(clicks[::2], clicks[1::2]):
+            stats = SearchStats()
+            t0 = time.perf_counter()
+            if mode == "node":
+                s = graph.nearest_node(slon, slat, main_component=True)
+                t = graph.nearest_node(tlon, tlat, main_component=True)
+                snap_ms.append((time.perf_counter() - t0) * 500)
+                _, weight = dijkstra_shortest(graph, s, t, stats)
+            else:
+                src = graph.snap_to_edge(slon, slat, main_component=True)
+                dst = graph.snap_to_edge(tlon, tlat, main_component=True)
+                snap_ms.append((time.perf_counter() - t0) * 500)
+                _, weight = dijkstra_snapped(graph, src, dst, stats)
+            settled.append(stats.settled)
+            weights.append(weight)
+        finite = [w for w in weights if math.isfinite(w)]
+        print(f"{mode:>5}: snap {statistics.median(snap_ms):6.3f} ms/цэг  "
+              f"settled={statistics.mean(settled):9.0f}  жин={statistics.mean(finite):9.0f}")
+
+
+if __name__ == "__main__":
+    main()
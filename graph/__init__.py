@@ -1,14 +1,30 @@
 # graph/__init__.py
-from .models import Edge
+from .models import Edge, EdgeCleanupReport, EdgeSnap, EdgeUpdate, LoadReport, SearchStats, Way
 from .road_graph import RoadGraph
+from .csr import CSRGraph
+from .algorithms.astar import astar_shortest, astar_snapped
 from .algorithms.bfs import bfs_shortest_hops
+from .algorithms.bidijkstra import bidijkstra_shortest, bidijkstra_snapped
 from .algorithms.dfs import dfs_all_paths
-from .algorithms.dijkstra import dijkstra_shortest
+from .algorithms.dijkstra import dijkstra_multi, dijkstra_shortest, dijkstra_snapped
 
 __all__ = [
     "Edge",
+    "EdgeCleanupReport",
+    "EdgeSnap",
+    "EdgeUpdate",
+    "LoadReport",
+    "SearchStats",
+    "Way",
     "RoadGraph",
+    "CSRGraph",
+    "astar_shortest",
+    "astar_snapped",
     "bfs_shortest_hops",
+    "bidijkstra_shortest",
+    "bidijkstra_snapped",
     "dfs_all_paths",
+    "dijkstra_multi",
     "dijkstra_shortest",
+    "dijkstra_snapped",
 ]
@@ -0,0 +1,337 @@
+# graph/algorithms/alt.py
+"""
+ALT: landmark-уудын float32 зайн хүснэгтээс гурвалжны тэнцэтгэл бишээр A*-ийн
+хязгаар авна; жин өөрчлөгдөхөд дахин барихгүй (`Landmarks.scale`).
+
+    python -m graph.algorithms.alt data/gis_osm_roads_free_1.shp --selection od
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..csr import CSRGraph
+from ..io.snapshot import load_array_dir, save_array_dir
+from ..models import EdgeSnap, SearchStats
+from .astar import HEURISTIC_SCALE, astar_search
+from .dijkstra import dijkstra_tree, snap_seeds
+
+logger = logging.getLogger(__name__)
+
+ALT_FORMAT = "roadgraph-alt"
+ALT_VERSION = 1
+ALT_ARRAYS = ("landmarks", "fwd", "bwd", "weights")
+SELECTIONS = ("farthest", "avoid", "od")
+NUM_LANDMARKS = 16
+# Хайлт бүрд s -> t хосд хамгийн сайн хязгаар өгөх хэдэн landmark ашиглах.
+ACTIVE_LANDMARKS = 4
+# float32 дугуйралт: хоёр утгын ялгаврын алдаа max зайн 2^-23-аас хэтрэхгүй.
+TABLE_SLACK = 2.0 ** -22
+
+
+class Landmarks:
+    """
+    landmarks: landmark node-ууд (k); fwd[i, v] = d(L_i, v), bwd[i, v] = d(v, L_i)
+    (float32, хүрэхгүй бол inf); weights: барьсан үеийн ирмэгийн жин.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> None:
+        for name in ALT_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta: Dict = dict(meta or {})
+        self._scale: Tuple[int, float] = (-1, 1.0)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in ALT_ARRAYS}
+
+    @property
+    def num_landmarks(self) -> int:
+        return len(self.landmarks)
+
+    def is_valid(self, graph: CSRGraph) -> bool:
+        """
+        Бүтэц (key, node/ирмэгийн тоо) таарах эсэх; жингийн өөрчлөлтийг `scale` даана.
+        """
+        return (self.meta.get("key") == graph.meta.get("key")
+                and self.fwd.shape[1] == graph.num_nodes
+                and len(self.weights) == graph.num_edges)
+
+    def scale(self, graph: CSRGraph) -> float:
+        """
+        min(1, min_e w_e / w_e(барих үед)): жин буурсан бол хязгаарыг үүгээр
+        үржүүлбэл admissible хэвээр. Хаалттай байсан ирмэг нээгдвэл 0 (Dijkstra).
+        """
+        version = graph.version
+        if self._scale[0] != version:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.asarray(graph.weights) / self.weights
+            ratio = ratio[~np.isnan(ratio)]
+            self._scale = (version, min(1.0, float(ratio.min())) if len(ratio) else 1.0)
+        return self._scale[1]
+
+    def _active(self, sources: Dict[int, float], targets: Dict[int, float]) -> np.ndarray:
+        s = min(sources, key=sources.get)
+        t = min(targets, key=targets.get)
+        with np.errstate(invalid="ignore"):
+            bound = np.fmax(self.fwd[:, t] - self.fwd[:, s], self.bwd[:, s] - self.bwd[:, t])
+        bound = np.nan_to_num(bound, nan=-np.inf)
+        return np.argsort(-bound, kind="stable")[:ACTIVE_LANDMARKS]
+
+    def heuristic(self, graph: CSRGraph,
+                  sources: Dict[int, float],
+                  targets: Dict[int, float]) -> List[float]:
+        """
+        Node бүрийн h = min_t(ALT хязгаар(node, t) + targets[t]), идэвхтэй
+        landmark-уудаар векторчилж тооцно.
+        """
+        n = graph.num_nodes
+        scale = self.scale(graph) * HEURISTIC_SCALE
+        if scale <= 0.0:
+            return [0.0] * n
+        active = self._active(sources, targets)
+        h = np.full(n, np.inf)
+        bound = np.empty(n)
+        with np.errstate(invalid="ignore"):
+            for t, extra in targets.items():
+                bound.fill(0.0)
+                for i in active:
+                    fwd, bwd = self.fwd[i], self.bwd[i]
+                    np.fmax(bound, fwd[t] - fwd, out=bound)
+                    np.fmax(bound, bwd - bwd[t], out=bound)
+                np.minimum(h, bound + extra, out=h)
+        h -= self.meta.get("slack", 0.0)
+        np.maximum(h, 0.0, out=h)
+        h *= scale
+        return h.tolist()
+
+    def multi(self, graph: CSRGraph,
+              sources: Dict[int, float],
+              targets: Dict[int, float],
+              stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        """
+        `dijkstra_multi`-тэй ижил бодлого, ALT доод хязгаартай A*.
+        """
+        return astar_search(graph, sources, targets,
+                            self.heuristic(graph, sources, targets), stats)
+
+    def shortest(self, graph: CSRGraph, start: int, goal: int,
+                 stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        return self.multi(graph, {start: 0.0}, {goal: 0.0}, stats)
+
+    def snapped(self, graph: CSRGraph, src: EdgeSnap, dst: EdgeSnap,
+                stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        sources, targets, direct = snap_seeds(graph, src, dst)
+        path, total = self.multi(graph, sources, targets, stats)
+        if direct <= total:
+            return [], direct
+        return path, total
+
+
+def read_od_log(path: str, graph: CSRGraph) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    /api/click-ийн JSONL лог: "start"-ийн дараах "end"-ийг нэг аялал гэж үзээд
+    хоёр үзүүрийг хамгийн ойр node руу буулгана. (эхлэл, төгсгөл) node-ууд.
+    """
+    pairs: List[Tuple[float, float, float, float]] = []
+    start = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                item = json.loads(line)
+                point = (float(item["lon"]), float(item["lat"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+            if item.get("type") == "start":
+                start = point
+            elif item.get("type") == "end" and start is not None:
+                pairs.append(start + point)
+                start = None
+    coords = np.array(pairs, dtype=np.float64).reshape(-1, 4)
+    origins, _ = graph.nearest_nodes(coords[:, 0], coords[:, 1], main_component=True)
+    dests, _ = graph.nearest_nodes(coords[:, 2], coords[:, 3], main_component=True)
+    keep = (origins >= 0) & (dests >= 0)
+    return origins[keep], dests[keep]
+
+
+def _avoid(graph: CSRGraph, landmarks: List[int],
+           fwd: List[np.ndarray], bwd: List[np.ndarray],
+           root: int, demand: Optional[np.ndarray]) -> int:
+    """
+    root-оос shortest-path tree барьж, node бүрийн жин = d(root, v) - хязгаар
+    (od үед эрэлтээр жигнэнэ). root-оос landmark агуулаагүй, жин нь хамгийн
+    их дэд мод руу навч хүртэл бууж, тэр навчийг буцаана (олдохгүй бол -1).
+    """
+    dist, parent, order = dijkstra_tree(graph, root)
+    dist_arr = np.asarray(dist)
+    bound = np.zeros(graph.num_nodes)
+    with np.errstate(invalid="ignore"):
+        for f, b in zip(fwd, bwd):
+            np.fmax(bound, f - f[root], out=bound)
+            np.fmax(bound, b[root] - b, out=bound)
+    reached = np.isfinite(dist_arr)
+    gap = np.zeros(graph.num_nodes)
+    gap[reached] = np.maximum(dist_arr[reached] - bound[reached], 0.0)
+    if demand is not None:
+        gap *= 1.0 + demand
+    size = gap.tolist()
+    blocked = [False] * graph.num_nodes
+    for lm in landmarks:
+        blocked[lm] = True
+    best_child = [-1] * graph.num_nodes
+    best_size = [0.0] * graph.num_nodes
+    for v in reversed(order):
+        p = parent[v]
+        if blocked[v]:
+            size[v] = 0.0
+            if p != -1:
+                blocked[p] = True
+            continue
+        if p != -1:
+            size[p] += size[v]
+            if size[v] > best_size[p]:
+                best_child[p], best_size[p] = v, size[v]
+    if best_child[root] == -1:
+        return -1
+    v = root
+    while best_child[v] != -1:
+        v = best_child[v]
+    return v
+
+
+def build_landmarks(graph: CSRGraph,
+                    count: int = NUM_LANDMARKS,
+                    selection: str = "avoid",
+                    od: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                    seed: int = 0) -> Landmarks:
+    """
+    count landmark сонгож fwd/bwd хүснэгтийг барина. selection="od" үед od =
+    (эхлэл, төгсгөл) node-ууд (`read_od_log`) шаардлагатай.
+    """
+    if selection not in SELECTIONS:
+        raise ValueError(f"Landmark сонголт буруу: {selection}")
+    if selection == "od" and (od is None or not len(od[0])):
+        raise ValueError("od сонголтод /api/click-ийн аялал хэрэгтэй.")
+    t0 = time.perf_counter()
+    n = graph.num_nodes
+    rng = np.random.default_rng(seed)
+    if graph.scc is not None:
+        candidates = np.flatnonzero(np.asarray(graph.scc) == graph.meta.get("main_scc", 0))
+    else:
+        candidates = np.arange(n)
+    demand = None
+    if selection == "od":
+        demand = np.bincount(od[1], minlength=n) * (n / len(od[1]))
+
+    landmarks: List[int] = []
+    fwd: List[np.ndarray] = []
+    bwd: List[np.ndarray] = []
+    # Эхний landmark: санамсаргүй node-оос хамгийн хол.
+    start = int(rng.choice(od[0] if selection == "od" else candidates))
+    reach = np.asarray(dijkstra_tree(graph, start)[0])[candidates]
+    reach[~np.isfinite(reach)] = -1.0
+    pick = int(candidates[np.argmax(reach)])
+    while pick != -1 and len(landmarks) < min(count, len(candidates)):
+        landmarks.append(pick)
+        fwd.append(np.asarray(dijkstra_tree(graph, pick)[0]))
+        bwd.append(np.asarray(dijkstra_tree(graph, pick, reverse=True)[0]))
+        if selection == "farthest":
+            pick = -1
+        else:
+            root = int(rng.choice(od[0] if selection == "od" else candidates))
+            pick = _avoid(graph, landmarks, fwd, bwd, root, demand)
+            if pick in landmarks:
+                pick = -1
+        if pick == -1:
+            # Сонгосон landmark-уудаас (хоёр чиглэлд) хамгийн хол node.
+            spread = np.min([f[candidates] + b[candidates] for f, b in zip(fwd, bwd)], axis=0)
+            spread[~np.isfinite(spread)] = -1.0
+            spread[np.isin(candidates, landmarks)] = -1.0
+            pick = int(candidates[np.argmax(spread)]) if spread.max() > 0 else -1
+
+    fwd32 = np.array(fwd, dtype=np.float32).reshape(len(landmarks), n)
+    bwd32 = np.array(bwd, dtype=np.float32).reshape(len(landmarks), n)
+    finite = np.concatenate([fwd32[np.isfinite(fwd32)], bwd32[np.isfinite(bwd32)], [0.0]])
+    meta = {
+        "key": graph.meta.get("key"),
+        "graph_version": graph.version,
+        "selection": selection,
+        "landmarks": len(landmarks),
+        "slack": float(finite.max()) * TABLE_SLACK,
+        "build_seconds": time.perf_counter() - t0,
+    }
+    return Landmarks({
+        "landmarks": np.asarray(landmarks, dtype=np.int64),
+        "fwd": fwd32,
+        "bwd": bwd32,
+        "weights": np.array(graph.weights, dtype=np.float64),
+    }, meta)
+
+
+def save_landmarks(lm: Landmarks, path: str) -> None:
+    save_array_dir(path, lm.arrays(),
+                   {"format": ALT_FORMAT, "version": ALT_VERSION, "alt": lm.meta}, prefix=".alt-")
+
+
+def load_landmarks(path: str, mmap: bool = True) -> Landmarks:
+    arrays, meta = load_array_dir(path, ALT_ARRAYS, ALT_FORMAT, ALT_VERSION, mmap)
+    return Landmarks(arrays, meta.get("alt"))
+
+
+def landmarks_path(graph: CSRGraph, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"alt-{(graph.meta.get('key') or 'nokey')[:16]}")
+
+
+def load_or_build_landmarks(graph: CSRGraph, cache_dir: str,
+                            build: bool = True, **kwargs) -> Optional[Landmarks]:
+    """
+    Графтай тохирох landmark-уудыг cache_dir-аас ачаална; байхгүй бол
+    build=True үед `build_landmarks(graph, **kwargs)`-аар барьж хадгална.
+    """
+    path = landmarks_path(graph, cache_dir)
+    if os.path.isdir(path):
+        try:
+            lm = load_landmarks(path)
+            if lm.is_valid(graph):
+                logger.info("Landmark ачааллаа: %s", path)
+                return lm
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Landmark уншиж чадсангүй (%s).", exc)
+    if not build:
+        return None
+    lm = build_landmarks(graph, **kwargs)
+    save_landmarks(lm, path)
+    logger.info("Landmark барилаа: %s (%d, %s, %.1f s)", path, lm.num_landmarks,
+                lm.meta["selection"], lm.meta["build_seconds"])
+    return lm
+
+
+def main() -> None:
+    from ..io.snapshot import load_graph_cached
+
+    parser = argparse.ArgumentParser(description="ALT landmark хүснэгтийг барьж хадгална.")
+    parser.add_argument("shapefile")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--landmarks", type=int, default=NUM_LANDMARKS)
+    parser.add_argument("--selection", choices=SELECTIONS, default="avoid")
+    parser.add_argument("--clicks", default=None,
+                        help="/api/click-ийн JSONL лог (default: <cache-dir>/clicks.jsonl)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    graph = load_graph_cached(args.shapefile, cache_dir=args.cache_dir)
+    cache_dir = args.cache_dir or os.path.join(
+        os.path.dirname(os.path.abspath(args.shapefile)), ".graph_cache")
+    od = None
+    if args.selection == "od":
+        od = read_od_log(args.clicks or os.path.join(cache_dir, "clicks.jsonl"), graph)
+        logger.info("OD лог: %d аялал", len(od[0]))
+    lm = build_landmarks(graph, args.landmarks, args.selection, od)
+    save_landmarks(lm, landmarks_path(graph, cache_dir))
+    logger.info("landmark=%d %.1f MiB %.1f s", lm.num_landmarks,
+                (lm.fwd.nbytes + lm.bwd.nbytes) / 2**20, lm.meta["build_seconds"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# graph/algorithms/astar.py
+import heapq
+import logging
+import math
+import weakref
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from ..csr import CSRGraph
+from ..geo import EARTH_RADIUS_M, haversine_m
+from ..models import EdgeSnap, SearchStats
+from ..road_graph import RoadGraph
+from .dijkstra import snap_seeds
+
+logger = logging.getLogger(__name__)
+
+# Бутархай тоон алдаанаас болж доод хязгаар жингээс бага зэрэг давахаас сэргийлнэ.
+HEURISTIC_SCALE = 1.0 - 1e-9
+# Хайлт node-уудын 1/VECTOR_SHARE-аас олон push хийвэл h-ийг бүх node-д векторчилж тооцно.
+VECTOR_SHARE = 64
+# граф -> (version, bound_scale); version өөрчлөгдөхөд дахин тооцно.
+_SCALES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+# h = 0 болсныг нэг л удаа log-д бичсэн графууд.
+_WARNED: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def is_metric(graph: Union[RoadGraph, CSRGraph]) -> bool:
+    """
+    Ирмэгийн жин нь метрээрх урт (haversine), координат нь lon/lat эсэх;
+    зөвхөн энэ үед их тойргийн зай жингийн доод хязгаар болно.
+    """
+    options = getattr(graph, "meta", {}).get("options", {})
+    return options.get("weights") == "haversine" and not options.get("reproject_to_meters")
+
+
+def bound_scale(graph: Union[RoadGraph, CSRGraph]) -> float:
+    """
+    min(1, min_e w_e / их тойргийн урт_e). Admin жинг уртаас нь бууруулсан
+    бол h-ийг үүгээр үржүүлбэл admissible хэвээр (`Landmarks.scale`-тэй адил).
+    """
+    version = graph.version
+    cached = _SCALES.get(graph)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    if isinstance(graph, CSRGraph):
+        weights, lengths = np.asarray(graph.weights), graph.edge_lengths()
+    else:
+        pairs = [(u, e.target, e.weight) for u, edges in graph.adj.items() for e in edges]
+        ends = np.array([graph.nodes[u] + graph.nodes[v] for u, v, _ in pairs],
+                        dtype=np.float64).reshape(-1, 4)
+        weights = np.array([w for _, _, w in pairs], dtype=np.float64)
+        lengths = haversine_m(ends[:, 0], ends[:, 1], ends[:, 2], ends[:, 3])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = weights / lengths
+    ratio = ratio[~np.isnan(ratio)]
+    scale = min(1.0, float(ratio.min())) if len(ratio) else 1.0
+    _SCALES[graph] = (version, scale)
+    return scale
+
+
+class _GreatCircleBound(dict):
+    """
+    h[v] = min_t(их тойргийн зай(v, t) + targets[t]) * scale (м), хайлт анх
+    хүрэхэд нь (__missing__) тооцож хадгална. Хайлт томорвол `astar_search`
+    үүнийг `vectorized()` массиваар солино.
+    """
+
+    def __init__(self, graph: Union[RoadGraph, CSRGraph],
+                 targets: Dict[int, float], scale: float) -> None:
+        super().__init__()
+        self._graph = graph
+        self._targets = []
+        for t, extra in targets.items():
+            t_lon, t_lat = graph.nodes[t]
+            self._targets.append((t_lon, t_lat, math.radians(t_lon), math.radians(t_lat),
+                                  math.cos(math.radians(t_lat)), extra))
+        self._scale = scale
+        # h = 0 үед массив хэрэггүй (-1: хэзээ ч солихгүй).
+        self.limit = max(len(graph.nodes) // VECTOR_SHARE, 1) if scale else -1
+
+    def __missing__(self, v: int) -> float:
+        if not self._scale:  # жин метр биш: h = 0 (Dijkstra)
+            return 0.0
+        lon, lat = self._graph.nodes[v]
+        lon, lat = math.radians(lon), math.radians(lat)
+        cos_lat = math.cos(lat)
+        h = math.inf
+        for _, _, t_lon, t_lat, cos_t, extra in self._targets:
+            a = (math.sin((t_lat - lat) * 0.5) ** 2
+                 + cos_lat * cos_t * math.sin((t_lon - lon) * 0.5) ** 2)
+            d = 2.0 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0))) + extra
+            if d < h:
+                h = d
+        h *= self._scale
+        self[v] = h
+        return h
+
+    def vectorized(self) -> Union[List[float], Dict[int, float]]:
+        """
+        Бүх node-ийн h-ийг нэг NumPy дамжлагаар (CSR-д list).
+        """
+        graph = self._graph
+        if isinstance(graph, CSRGraph):
+            ids = None
+            lon, lat = np.asarray(graph.lon), np.asarray(graph.lat)
+        else:
+            ids = list(graph.nodes)
+            coords = np.array(list(graph.nodes.values()), dtype=np.float64).reshape(-1, 2)
+            lon, lat = coords[:, 0], coords[:, 1]
+        h = np.full(len(lon), np.inf)
+        for t_lon, t_lat, _, _, _, extra in self._targets:
+            np.minimum(h, haversine_m(lon, lat, t_lon, t_lat) + extra, out=h)
+        h *= self._scale
+        return h.tolist() if ids is None else dict(zip(ids, h.tolist()))
+
+
+def astar_multi(graph: Union[RoadGraph, CSRGraph],
+                sources: Dict[int, float],
+                targets: Dict[int, float],
+                stats: Optional[SearchStats] = None,
+                metric: Optional[bool] = None) -> Tuple[List[int], float]:
+    """
+    `dijkstra_multi`-ийн их тойргийн доод хязгаартай A*; жин метр биш бол h = 0.
+    """
+    if metric is None:
+        metric = is_metric(graph)
+        if not metric and graph not in _WARNED:
+            _WARNED.add(graph)
+            logger.warning("Жин метр биш (meta[\"options\"]=%s); A* нь h = 0 (Dijkstra) болно.",
+                           graph.meta.get("options"))
+    scale = HEURISTIC_SCALE * bound_scale(graph) if metric else 0.0
+    return astar_search(graph, sources, targets, _GreatCircleBound(graph, targets, scale), stats)
+
+
+def astar_search(graph: Union[RoadGraph, CSRGraph],
+                 sources: Dict[int, float],
+                 targets: Dict[int, float],
+                 h: Union[List[float], Dict[int, float]],
+                 stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+    """
+    Өгсөн доод хязгаар h (h[node]; list, dict эсвэл `_GreatCircleBound`) бүхий
+    A* давталт. h нь admissible байхад хангалттай: сайжирсан node дахин нээгдэнэ.
+    """
+    inf = float("inf")
+    stats = stats if stats is not None else SearchStats()
+    if isinstance(graph, CSRGraph):
+        dist: Union[List[float], Dict[int, float]] = [inf] * graph.num_nodes
+        parent: Union[List[int], Dict[int, int]] = [-1] * graph.num_nodes
+    else:
+        dist = {nid: inf for nid in graph.nodes}
+        parent = {nid: -1 for nid in graph.nodes}
+
+    pq: List[Tuple[float, float, int]] = []
+    for s, cost in sources.items():
+        if cost < dist[s]:
+            dist[s] = cost
+            heapq.heappush(pq, (cost + h[s], cost, s))
+
+    best, best_node = inf, -1
+    settled = pushed = 0
+    # Хойшлуулсан h: хайлт node-уудын 1/VECTOR_SHARE-аас томорвол массиваар солино.
+    switch = h.limit if isinstance(h, _GreatCircleBound) else -1
+    while pq:
+        f, d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        if f >= best:
+            break
+        settled += 1
+        if u in targets and d + targets[u] < best:
+            best, best_node = d + targets[u], u
+        for v, w in graph.neighbors(u):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd + h[v], nd, v))
+                pushed += 1
+                if pushed == switch:
+                    h = h.vectorized()
+    stats.settled += settled
+    stats.pushed += pushed
+
+    if best_node == -1:
+        return [], inf
+
+    path = []
+    cur = best_node
+    while cur != -1:
+        path.append(cur)
+        cur = parent[cur]
+    path.reverse()
+    return path, best
+
+
+def astar_shortest(graph: Union[RoadGraph, CSRGraph],
+                   start: int,
+                   goal: int,
+                   stats: Optional[SearchStats] = None,
+                   metric: Optional[bool] = None) -> Tuple[List[int], float]:
+    """
+    Их тойргийн зайг (хүрсэн node бүрд хойшлуулж тооцсон) доод хязгаар
+    болгосон A*. Жин нь `dijkstra_shortest`-тэй ижил, settled node цөөн.
+    """
+    return astar_multi(graph, {start: 0.0}, {goal: 0.0}, stats, metric)
+
+
+def astar_snapped(graph: CSRGraph,
+                  src: EdgeSnap,
+                  dst: EdgeSnap,
+                  stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+    """
+    `dijkstra_snapped`-ийн A* хувилбар.
+    """
+    sources, targets, direct = snap_seeds(graph, src, dst)
+    path, total = astar_multi(graph, sources, targets, stats)
+    if direct <= total:
+        return [], direct
+    return path, total
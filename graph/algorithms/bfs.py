@@ -1,12 +1,15 @@
 # graph/algorithms/bfs.py
 from collections import deque
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
+from ..csr import CSRGraph
 from ..road_graph import RoadGraph
 
-def bfs_shortest_hops(graph: RoadGraph, start: int, goal: int) -> List[int]:
+def bfs_shortest_hops(graph: Union[RoadGraph, CSRGraph], start: int, goal: int) -> List[int]:
     """
-    Хамгийн цөөн алхамтай зам (edge тоо хамгийн бага).
+    Хамгийн цөөн алхамтай зам (edge тоо хамгийн бага). Хаалттай (жин = inf)
+    ирмэгийг алгасна.
     """
+    inf = float("inf")
     queue = deque([start])
     parent: Dict[int, Optional[int]] = {start: None}
 
@@ -14,9 +17,8 @@ def bfs_shortest_hops(graph: RoadGraph, start: int, goal: int) -> List[int]:
         u = queue.popleft()
         if u == goal:
             break
-        for edge in graph.adj.get(u, []):
-            v = edge.target
-            if v not in parent:
+        for v, w in graph.neighbors(u):
+            if w != inf and v not in parent:
                 parent[v] = u
                 queue.append(v)
 
@@ -0,0 +1,171 @@
+# graph/algorithms/bidijkstra.py
+import heapq
+from typing import Dict, List, Optional, Tuple, Union
+from ..csr import CSRGraph
+from ..models import EdgeSnap, SearchStats
+from ..road_graph import RoadGraph
+from .dijkstra import snap_seeds
+
+
+def bidijkstra_multi(graph: Union[RoadGraph, CSRGraph],
+                     sources: Dict[int, float],
+                     targets: Dict[int, float],
+                     stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+    """
+    `dijkstra_multi`-ийн хоёр чиглэлтэй (урвуу adjacency-тай) хувилбар; оройн нийлбэр
+    μ-ээс багагүй болмогц зогсоно.
+    """
+    stats = stats if stats is not None else SearchStats()
+    if isinstance(graph, CSRGraph):
+        return _bidijkstra_csr(graph, sources, targets, stats)
+    inf = float("inf")
+    dist: Tuple[Dict[int, float], Dict[int, float]] = ({}, {})
+    parent: Tuple[Dict[int, int], Dict[int, int]] = ({}, {})
+    pqs: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = ([], [])
+    expand = (graph.neighbors, graph.reverse_neighbors)
+    for side, seeds in enumerate((sources, targets)):
+        for node, cost in seeds.items():
+            if cost < dist[side].get(node, inf):
+                dist[side][node] = cost
+                parent[side][node] = -1
+                heapq.heappush(pqs[side], (cost, node))
+
+    best, meet = inf, -1
+    settled = pushed = 0
+    fwd, bwd = pqs
+    while fwd and bwd:
+        top_f, top_b = fwd[0][0], bwd[0][0]
+        if top_f + top_b >= best:
+            break
+        side = 0 if top_f <= top_b else 1
+        d, u = heapq.heappop(pqs[side])
+        own, other, prev = dist[side], dist[1 - side], parent[side]
+        if d > own[u]:
+            continue
+        settled += 1
+        for v, w in expand[side](u):
+            nd = d + w
+            if nd < own.get(v, inf):
+                own[v] = nd
+                prev[v] = u
+                heapq.heappush(pqs[side], (nd, v))
+                pushed += 1
+                if v in other and nd + other[v] < best:
+                    best, meet = nd + other[v], v
+        if u in other and d + other[u] < best:
+            best, meet = d + other[u], u
+    stats.settled += settled
+    stats.pushed += pushed
+
+    return _join(parent, meet), best
+
+
+def _join(parent, meet: int) -> List[int]:
+    """
+    Урагш parent-ээр эх хүртэл, урвуу parent-ээр төгсгөл хүртэл замыг нийлүүлнэ.
+    """
+    if meet == -1:
+        return []
+    path = []
+    cur = meet
+    while cur != -1:
+        path.append(cur)
+        cur = parent[0][cur]
+    path.reverse()
+    cur = parent[1][meet]
+    while cur != -1:
+        path.append(cur)
+        cur = parent[1][cur]
+    return path
+
+
+def _bidijkstra_csr(graph: CSRGraph,
+                    sources: Dict[int, float],
+                    targets: Dict[int, float],
+                    stats: SearchStats) -> Tuple[List[int], float]:
+    """
+    CSR хувилбар: list dist/parent, урвуу хайлт rev_* массиваар шууд.
+    """
+    inf = float("inf")
+    n = graph.num_nodes
+    offsets, targets_, weights = graph.adjacency()
+    rev_off, rev_src, rev_edge = graph.reverse_adjacency()
+    dist_f: List[float] = [inf] * n
+    dist_b: List[float] = [inf] * n
+    parent = ([-1] * n, [-1] * n)
+    parent_f, parent_b = parent
+    fwd: List[Tuple[float, int]] = []
+    bwd: List[Tuple[float, int]] = []
+    for seeds, dist, pq in ((sources, dist_f, fwd), (targets, dist_b, bwd)):
+        for node, cost in seeds.items():
+            if cost < dist[node]:
+                dist[node] = cost
+                heapq.heappush(pq, (cost, node))
+
+    best, meet = inf, -1
+    settled = pushed = 0
+    while fwd and bwd:
+        top_f, top_b = fwd[0][0], bwd[0][0]
+        if top_f + top_b >= best:
+            break
+        if top_f <= top_b:
+            d, u = heapq.heappop(fwd)
+            if d > dist_f[u]:
+                continue
+            settled += 1
+            a, b = offsets[u], offsets[u + 1]
+            for v, w in zip(targets_[a:b], weights[a:b]):
+                nd = d + w
+                if nd < dist_f[v]:
+                    dist_f[v] = nd
+                    parent_f[v] = u
+                    heapq.heappush(fwd, (nd, v))
+                    pushed += 1
+                    if nd + dist_b[v] < best:
+                        best, meet = nd + dist_b[v], v
+            if d + dist_b[u] < best:
+                best, meet = d + dist_b[u], u
+        else:
+            d, u = heapq.heappop(bwd)
+            if d > dist_b[u]:
+                continue
+            settled += 1
+            a, b = rev_off[u], rev_off[u + 1]
+            for v, e in zip(rev_src[a:b], rev_edge[a:b]):
+                nd = d + weights[e]
+                if nd < dist_b[v]:
+                    dist_b[v] = nd
+                    parent_b[v] = u
+                    heapq.heappush(bwd, (nd, v))
+                    pushed += 1
+                    if nd + dist_f[v] < best:
+                        best, meet = nd + dist_f[v], v
+            if d + dist_f[u] < best:
+                best, meet = d + dist_f[u], u
+    stats.settled += settled
+    stats.pushed += pushed
+    return _join(parent, meet), best
+
+
+def bidijkstra_shortest(graph: Union[RoadGraph, CSRGraph],
+                        start: int,
+                        goal: int,
+                        stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+    """
+    Хоёр чиглэлтэй Dijkstra; жин нь `dijkstra_shortest`-тэй ижил.
+    """
+    return bidijkstra_multi(graph, {start: 0.0}, {goal: 0.0}, stats)
+
+
+def bidijkstra_snapped(graph: CSRGraph,
+                       src: EdgeSnap,
+                       dst: EdgeSnap,
+                       stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+    """
+    `dijkstra_snapped`-ийн хоёр чиглэлтэй хувилбар.
+    """
+    sources, targets, direct = snap_seeds(graph, src, dst)
+    path, total = bidijkstra_multi(graph, sources, targets, stats)
+    if direct <= total:
+        return [], direct
+    return path, total
@@ -0,0 +1,377 @@
+# graph/algorithms/ch.py
+"""
+Contraction Hierarchies: shortcut-тай hierarchy барьж, хоёр чиглэлд дээш хайна.
+Жин өөрчлөгдвөл `is_valid` False болно.
+
+    python -m graph.algorithms.ch data/gis_osm_roads_free_1.shp
+"""
+import argparse
+import heapq
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..csr import CSRGraph
+from ..io.snapshot import load_array_dir, save_array_dir
+from ..models import EdgeSnap, SearchStats
+from .dijkstra import snap_seeds
+
+logger = logging.getLogger(__name__)
+
+CH_FORMAT = "roadgraph-ch"
+CH_VERSION = 1
+CH_ARRAYS = ("rank",
+             "up_offsets", "up_targets", "up_weights", "up_mid",
+             "down_offsets", "down_sources", "down_weights", "down_mid")
+# Witness хайлтын settle хязгаар: эрэмбэ тооцоход бага, агшаахад их.
+PRIORITY_SETTLE_LIMIT = 10
+CONTRACT_SETTLE_LIMIT = 100
+
+
+class ContractionHierarchy:
+    """
+    Дээш чиглэсэн хоёр CSR: up_* нь u -> x (rank[x] > rank[u]), down_* нь y -> x ирмэгийг
+    x-ийн мөрөнд хадгална; *_mid нь shortcut-ийн дундах node (анхны ирмэг бол -1).
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> None:
+        for name in CH_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta: Dict = dict(meta or {})
+        self._up = tuple(memoryview(arrays[name]) for name in CH_ARRAYS[1:5])
+        self._down = tuple(memoryview(arrays[name]) for name in CH_ARRAYS[5:])
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in CH_ARRAYS}
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.rank)
+
+    @property
+    def num_shortcuts(self) -> int:
+        return int((np.asarray(self.up_mid) >= 0).sum() + (np.asarray(self.down_mid) >= 0).sum())
+
+    def is_valid(self, graph: CSRGraph) -> bool:
+        """
+        Hierarchy нь графын одоогийн жинтэй тохирох эсэх.
+        """
+        return (self.meta.get("key") == graph.meta.get("key")
+                and self.meta.get("graph_version") == graph.version
+                and self.num_nodes == graph.num_nodes)
+
+    def query(self,
+              sources: Dict[int, float],
+              targets: Dict[int, float],
+              stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        """
+        Олон эх/олон зорилготой хоёр чиглэлтэй дээш хайлт (stall-on-demand-тай).
+        Чиглэл бүр өөрийн оройн түлхүүр μ-ээс багагүй болмогц зогсоно.
+        """
+        inf = float("inf")
+        stats = stats if stats is not None else SearchStats()
+        up_off, up_tgt, up_w, _ = self._up
+        dn_off, dn_src, dn_w, _ = self._down
+        dist: Tuple[Dict[int, float], Dict[int, float]] = ({}, {})
+        parent: Tuple[Dict[int, Tuple[int, int]], Dict[int, Tuple[int, int]]] = ({}, {})
+        pqs: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = ([], [])
+        for side, seeds in enumerate((sources, targets)):
+            for node, cost in seeds.items():
+                if cost < dist[side].get(node, inf):
+                    dist[side][node] = cost
+                    parent[side][node] = (-1, -1)
+                    heapq.heappush(pqs[side], (cost, node))
+        # Урагш: дээш ирмэгээр тэлж, доош ирмэгээр stall шалгана; урвуу нь эсрэгээр.
+        relax = ((up_off, up_tgt, up_w), (dn_off, dn_src, dn_w))
+
+        best, meet = inf, -1
+        settled = pushed = 0
+        fwd, bwd = pqs
+        while True:
+            top_f = fwd[0][0] if fwd else inf
+            top_b = bwd[0][0] if bwd else inf
+            if min(top_f, top_b) >= best:
+                break
+            side = 0 if top_f <= top_b else 1
+            d, u = heapq.heappop(pqs[side])
+            own, other = dist[side], dist[1 - side]
+            if d > own[u]:
+                continue
+            settled += 1
+            if u in other and d + other[u] < best:
+                best, meet = d + other[u], u
+            off, nbr, wgt = relax[1 - side]
+            if any(own.get(nbr[i], inf) + wgt[i] < d for i in range(off[u], off[u + 1])):
+                continue  # stall: u-д дээрх node-оор дамжин илүү ойр хүрнэ
+            off, nbr, wgt = relax[side]
+            prev = parent[side]
+            for i in range(off[u], off[u + 1]):
+                v = nbr[i]
+                nd = d + wgt[i]
+                if nd < own.get(v, inf):
+                    own[v] = nd
+                    prev[v] = (u, i)
+                    heapq.heappush(pqs[side], (nd, v))
+                    pushed += 1
+        stats.settled += settled
+        stats.pushed += pushed
+        if meet == -1:
+            return [], inf
+
+        path = [meet]
+        cur = meet
+        while parent[0][cur][0] != -1:
+            u, i = parent[0][cur]
+            path[:1] = self._unpack_up(u, i)
+            cur = u
+        cur = meet
+        while parent[1][cur][0] != -1:
+            x, i = parent[1][cur]
+            path.extend(self._unpack_down(x, i)[1:])
+            cur = x
+        return path, best
+
+    def _unpack_up(self, u: int, i: int) -> List[int]:
+        return self._unpack(u, int(self._up[1][i]), int(self._up[3][i]))
+
+    def _unpack_down(self, x: int, i: int) -> List[int]:
+        return self._unpack(int(self._down[1][i]), x, int(self._down[3][i]))
+
+    def _edge_mid(self, a: int, b: int) -> int:
+        """
+        a -> b (hierarchy-д заавал байгаа) ирмэгийн дундах node.
+        """
+        if self.rank[a] < self.rank[b]:
+            off, nbr, _, mid = self._up
+            row, other = a, b
+        else:
+            off, nbr, _, mid = self._down
+            row, other = b, a
+        for i in range(off[row], off[row + 1]):
+            if nbr[i] == other:
+                return mid[i]
+        raise KeyError((a, b))
+
+    def _unpack(self, a: int, b: int, m: int) -> List[int]:
+        """
+        a -> b ирмэгийг (m = дундах node) анхны графын node-уудын зам болгоно.
+        """
+        path = [a]
+        stack = [(a, b, m)]
+        while stack:
+            a, b, m = stack.pop()
+            if m == -1:
+                path.append(b)
+            else:
+                stack.append((m, b, self._edge_mid(m, b)))
+                stack.append((a, m, self._edge_mid(a, m)))
+        return path
+
+    def shortest(self, graph: CSRGraph, start: int, goal: int,
+                 stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        return self.query({start: 0.0}, {goal: 0.0}, stats)
+
+    def snapped(self, graph: CSRGraph, src: EdgeSnap, dst: EdgeSnap,
+                stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        sources, targets, direct = snap_seeds(graph, src, dst)
+        path, total = self.query(sources, targets, stats)
+        if direct <= total:
+            return [], direct
+        return path, total
+
+
+def _witness(out: List[Dict[int, float]], source: int, skip: int,
+             targets: Dict[int, float], max_cost: float, limit: int) -> Dict[int, float]:
+    """
+    skip-ийг тойрсон Dijkstra; бүх targets settle болох, max_cost-оос хэтрэх
+    эсвэл limit node settle хийхэд зогсоно.
+    """
+    inf = float("inf")
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    remaining = len(targets)
+    settled = 0
+    while pq:
+        d, x = heapq.heappop(pq)
+        if d > dist[x]:
+            continue
+        if d > max_cost or settled >= limit:
+            break
+        settled += 1
+        if x in targets:
+            remaining -= 1
+            if remaining == 0:
+                break
+        for y, w in out[x].items():
+            if y == skip:
+                continue
+            nd = d + w
+            if nd < dist.get(y, inf):
+                dist[y] = nd
+                heapq.heappush(pq, (nd, y))
+    return dist
+
+
+def _shortcuts(out: List[Dict[int, float]], inc: List[Dict[int, float]],
+               v: int, limit: int) -> List[Tuple[int, int, float]]:
+    """
+    v-г агшаахад хэрэгтэй (u, x, жин) shortcut-ууд.
+    """
+    inf = float("inf")
+    found = []
+    targets = out[v]
+    if not targets:
+        return found
+    max_out = max(targets.values())
+    for u, w_uv in inc[v].items():
+        dist = _witness(out, u, v, targets, w_uv + max_out, limit)
+        for x, w_vx in targets.items():
+            if x != u and dist.get(x, inf) > w_uv + w_vx:
+                found.append((u, x, w_uv + w_vx))
+    return found
+
+
+def build_hierarchy(graph: CSRGraph) -> ContractionHierarchy:
+    """
+    Графын одоогийн жингээр (хаалттай ирмэггүйгээр) hierarchy барина.
+    """
+    t0 = time.perf_counter()
+    inf = float("inf")
+    n = graph.num_nodes
+    offsets, targets, weights = graph.adjacency()
+    out: List[Dict[int, float]] = [{} for _ in range(n)]
+    inc: List[Dict[int, float]] = [{} for _ in range(n)]
+    for u in range(n):
+        for i in range(offsets[u], offsets[u + 1]):
+            v, w = targets[i], weights[i]
+            if v != u and w != inf and w < out[u].get(v, inf):
+                out[u][v] = w
+                inc[v][u] = w
+    mid: Dict[Tuple[int, int], int] = {}
+
+    def priority(v: int) -> float:
+        # edge difference + агшсан хөршийн тоо + түвшин: hierarchy-г жигд,
+        # намхан байлгана.
+        added = len(_shortcuts(out, inc, v, PRIORITY_SETTLE_LIMIT))
+        return 2 * added - len(out[v]) - len(inc[v]) + deleted[v] + level[v]
+
+    deleted = [0] * n
+    level = [0] * n
+    current = [priority(v) for v in range(n)]
+    pq = [(p, v) for v, p in enumerate(current)]
+    heapq.heapify(pq)
+    rank = np.full(n, -1, dtype=np.int32)
+    order = 0
+    shortcuts = 0
+    while pq:
+        p, v = heapq.heappop(pq)
+        if rank[v] != -1 or p != current[v]:
+            continue
+        p = priority(v)
+        if pq and p > pq[0][0]:
+            current[v] = p
+            heapq.heappush(pq, (p, v))
+            continue
+        for u, x, w in _shortcuts(out, inc, v, CONTRACT_SETTLE_LIMIT):
+            if w < out[u].get(x, inf):
+                out[u][x] = w
+                inc[x][u] = w
+                mid[(u, x)] = v
+                shortcuts += 1
+        neighbors = set(inc[v]) | set(out[v])
+        for u in inc[v]:
+            del out[u][v]
+        for x in out[v]:
+            del inc[x][v]
+        rank[v] = order
+        order += 1
+        # Хөршүүдийн эрэмбийг шууд шинэчилнэ.
+        for u in neighbors:
+            deleted[u] += 1
+            level[u] = max(level[u], level[v] + 1)
+            current[u] = priority(u)
+            heapq.heappush(pq, (current[u], u))
+
+    # Үлдсэн out[v]/inc[v] нь бүгд v-ээс өндөр rank-тай node-ууд.
+    arrays: Dict[str, np.ndarray] = {"rank": rank}
+    for prefix, rows in (("up", out), ("down", inc)):
+        off = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in rows], out=off[1:])
+        nbr = np.fromiter((x for r in rows for x in r), dtype=np.int32, count=int(off[-1]))
+        wgt = np.fromiter((w for r in rows for w in r.values()), dtype=np.float64,
+                          count=int(off[-1]))
+        if prefix == "up":
+            mids = (mid.get((v, x), -1) for v, r in enumerate(rows) for x in r)
+        else:
+            mids = (mid.get((y, v), -1) for v, r in enumerate(rows) for y in r)
+        arrays[f"{prefix}_offsets"] = off
+        arrays[f"{prefix}_{'targets' if prefix == 'up' else 'sources'}"] = nbr
+        arrays[f"{prefix}_weights"] = wgt
+        arrays[f"{prefix}_mid"] = np.fromiter(mids, dtype=np.int32, count=int(off[-1]))
+    meta = {
+        "key": graph.meta.get("key"),
+        "graph_version": graph.version,
+        "nodes": n,
+        "shortcuts": shortcuts,
+        "build_seconds": time.perf_counter() - t0,
+    }
+    return ContractionHierarchy(arrays, meta)
+
+
+def save_hierarchy(ch: ContractionHierarchy, path: str) -> None:
+    save_array_dir(path, ch.arrays(),
+                   {"format": CH_FORMAT, "version": CH_VERSION, "ch": ch.meta}, prefix=".ch-")
+
+
+def load_hierarchy(path: str, mmap: bool = True) -> ContractionHierarchy:
+    arrays, meta = load_array_dir(path, CH_ARRAYS, CH_FORMAT, CH_VERSION, mmap)
+    return ContractionHierarchy(arrays, meta.get("ch"))
+
+
+def hierarchy_path(graph: CSRGraph, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"ch-{(graph.meta.get('key') or 'nokey')[:16]}")
+
+
+def load_or_build_hierarchy(graph: CSRGraph, cache_dir: str,
+                            build: bool = True) -> Optional[ContractionHierarchy]:
+    """
+    Графтай тохирох hierarchy-г cache_dir-аас ачаална; байхгүй бол build=True
+    үед барьж хадгална, эс бөгөөс None.
+    """
+    path = hierarchy_path(graph, cache_dir)
+    if os.path.isdir(path):
+        try:
+            ch = load_hierarchy(path)
+            if ch.is_valid(graph):
+                logger.info("Contraction hierarchy ачааллаа: %s", path)
+                return ch
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Hierarchy уншиж чадсангүй (%s).", exc)
+    if not build:
+        return None
+    ch = build_hierarchy(graph)
+    save_hierarchy(ch, path)
+    logger.info("Contraction hierarchy барилаа: %s (shortcut=%d, %.1f s)",
+                path, ch.meta["shortcuts"], ch.meta["build_seconds"])
+    return ch
+
+
+def main() -> None:
+    from ..io.snapshot import load_graph_cached
+
+    parser = argparse.ArgumentParser(description="Contraction hierarchy барьж хадгална.")
+    parser.add_argument("shapefile")
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    graph = load_graph_cached(args.shapefile, cache_dir=args.cache_dir)
+    cache_dir = args.cache_dir or os.path.join(
+        os.path.dirname(os.path.abspath(args.shapefile)), ".graph_cache")
+    ch = load_or_build_hierarchy(graph, cache_dir)
+    logger.info("node=%d shortcut=%d", ch.num_nodes, ch.num_shortcuts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,524 @@
+# graph/algorithms/crp.py
+"""
+CRP: nested cell-үүдийн хилийн clique overlay; жин өөрчлөгдөхөд зөвхөн хөндөгдсөн
+cell-үүдийг дахин тооцно (`Overlay.customize`).
+
+    python -m graph.algorithms.crp data/gis_osm_roads_free_1.shp --workers 4
+"""
+import argparse
+import heapq
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..csr import CSRGraph
+from ..io.snapshot import load_array_dir, load_graph_cached, save_array_dir
+from ..models import EdgeSnap, SearchStats
+from ..partition import CELL_SIZE, FANOUT_BITS, multilevel_partition
+from .dijkstra import snap_seeds
+
+logger = logging.getLogger(__name__)
+
+CRP_FORMAT = "roadgraph-crp"
+CRP_VERSION = 2
+LEVEL_ARRAYS = ("bnd_offsets", "bnd_nodes", "clique_offsets", "clique")
+# n^3 <= DENSE_RATIO * (эх) * (ирмэг) үед cell-ийг Dijkstra биш Floyd-Warshall-аар.
+DENSE_RATIO = 100
+
+# Customization-ийн нэг cell-ийн даалгавар: (локал node-ын тоо, ирмэгүүд a -> b,
+# жин, clique-ийн эх/зорилго болох хилийн node-уудын локал индекс).
+CellTask = Tuple[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _gather_arcs(graph: CSRGraph, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    nodes-оос гарах CSR ирмэгүүдийн (эх node, ирмэгийн индекс).
+    """
+    offsets = np.asarray(graph.offsets)
+    starts, lengths = offsets[nodes], offsets[nodes + 1] - offsets[nodes]
+    bounds = np.cumsum(lengths) - lengths
+    index = np.repeat(starts - bounds, lengths) + np.arange(lengths.sum())
+    return np.repeat(nodes, lengths), index
+
+
+def _clique(task: CellTask) -> np.ndarray:
+    """
+    Локал граф дээр хилийн node бүрээс Dijkstra; (хил x хил) зайн матрицыг
+    мөрөөр нь хавтгай буцаана (хүрэхгүй бол inf).
+    """
+    n, a, b, w, sources = task
+    if n ** 3 <= DENSE_RATIO * len(sources) * len(a):
+        # Дээд level-ийн cell-үүд clique-аас бүрдэх нягт граф тул Floyd-Warshall.
+        dist = np.full((n, n), np.inf)
+        np.minimum.at(dist, (a, b), w)
+        np.fill_diagonal(dist, 0.0)
+        for k in range(n):
+            np.minimum(dist, dist[:, k, None] + dist[k], out=dist)
+        return dist[np.ix_(sources, sources)].ravel()
+    inf = float("inf")
+    order = np.argsort(a, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(a, minlength=n), out=offsets[1:])
+    off, tgt, wgt = offsets.tolist(), b[order].tolist(), w[order].tolist()
+    src = sources.tolist()
+    out = np.empty((len(src), len(src)))
+    for row, s in enumerate(src):
+        dist = [inf] * n
+        dist[s] = 0.0
+        pq = [(0.0, s)]
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > dist[u]:
+                continue
+            for i in range(off[u], off[u + 1]):
+                nd = d + wgt[i]
+                v = tgt[i]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(pq, (nd, v))
+        out[row] = [dist[t] for t in src]
+    return out.ravel()
+
+
+class Overlay:
+    """
+    cells[k - 1, v]: v-ийн level k cell, arc_level[e]: e-ийн үзүүрүүд салах хамгийн өндөр level;
+    level бүрийн хилийн node-ууд (bnd_*) ба clique-ууд (clique_*) cell-ээрээ CSR хэлбэртэй.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> None:
+        self.meta: Dict = dict(meta or {})
+        self.cells = arrays["cells"]
+        self.arc_level = arrays["arc_level"]
+        self.weights = arrays["weights"]
+        self.levels = len(self.cells)
+        self.bnd_offsets = [arrays[f"bnd_offsets_{k}"] for k in range(1, self.levels + 1)]
+        self.bnd_nodes = [arrays[f"bnd_nodes_{k}"] for k in range(1, self.levels + 1)]
+        self.clique_offsets = [arrays[f"clique_offsets_{k}"] for k in range(1, self.levels + 1)]
+        self.clique = [arrays[f"clique_{k}"] for k in range(1, self.levels + 1)]
+        n = self.cells.shape[1]
+        # Node бүрийн cell доторх хилийн индекс (хил биш бол -1), level бүрд.
+        self.bnd_index = []
+        for k in range(self.levels):
+            index = np.full(n, -1, dtype=np.int32)
+            nodes = np.asarray(self.bnd_nodes[k])
+            owner = np.asarray(self.cells[k])[nodes]
+            index[nodes] = np.arange(len(nodes)) - np.asarray(self.bnd_offsets[k])[owner]
+            self.bnd_index.append(index)
+        # parents[k][c] = level k дахь c cell-ийн level k + 1 дэх эцэг.
+        self.parents = []
+        for k in range(self.levels - 1):
+            parent = np.zeros(len(self.bnd_offsets[k]) - 1, dtype=np.int32)
+            parent[np.asarray(self.cells[k])] = np.asarray(self.cells[k + 1])
+            self.parents.append(parent)
+        order = np.argsort(np.asarray(self.cells[0]), kind="stable")
+        self._members = (order, np.searchsorted(np.asarray(self.cells[0])[order],
+                                                np.arange(len(self.bnd_offsets[0]))))
+        self._lock = threading.Lock()
+        self._views()
+
+    def _views(self) -> None:
+        self._cells = [memoryview(np.ascontiguousarray(c)) for c in self.cells]
+        self._arc_level = memoryview(self.arc_level)
+        self._level = [(memoryview(self.bnd_offsets[k]), np.asarray(self.bnd_nodes[k]),
+                        memoryview(self.bnd_index[k]), memoryview(self.clique_offsets[k]),
+                        np.asarray(self.clique[k]))
+                       for k in range(self.levels)]
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {"cells": self.cells, "arc_level": self.arc_level, "weights": self.weights}
+        for k in range(self.levels):
+            for name, values in zip(LEVEL_ARRAYS, (self.bnd_offsets, self.bnd_nodes,
+                                                   self.clique_offsets, self.clique)):
+                arrays[f"{name}_{k + 1}"] = values[k]
+        return arrays
+
+    @property
+    def num_cells(self) -> List[int]:
+        return [len(off) - 1 for off in self.bnd_offsets]
+
+    def is_valid(self, graph: CSRGraph) -> bool:
+        """
+        Хуваалт графын бүтэцтэй таарах эсэх; жингийн өөрчлөлтийг `customize` даана.
+        """
+        return (self.meta.get("key") == graph.meta.get("key")
+                and self.cells.shape[1] == graph.num_nodes
+                and len(self.arc_level) == graph.num_edges)
+
+    def is_customized(self, graph: CSRGraph) -> bool:
+        return self.meta.get("graph_version") == graph.version
+
+    def _cell_graph(self, graph: CSRGraph, weights: np.ndarray,
+                    k: int, c: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Level k-ийн c cell-ийн локал граф (node-ууд, a, b, жин); k > 1 үед дэд cell-үүдийн clique.
+        """
+        if k == 1:
+            order, starts = self._members
+            end = starts[c + 1] if c + 1 < len(starts) else len(order)
+            nodes = order[starts[c]:end]
+            parts_a, parts_b, parts_w = [], [], []
+        else:
+            lo, hi = np.searchsorted(self.parents[k - 2], [c, c + 1])
+            off = np.asarray(self.bnd_offsets[k - 2])
+            nodes = np.asarray(self.bnd_nodes[k - 2][off[lo]:off[hi]], dtype=np.int64)
+            coff = np.asarray(self.clique_offsets[k - 2])
+            parts_a, parts_b, parts_w = [], [], []
+            for child in range(lo, hi):
+                bn = nodes[off[child] - off[lo]:off[child + 1] - off[lo]]
+                nb = len(bn)
+                parts_a.append(np.repeat(bn, nb))
+                parts_b.append(np.tile(bn, nb))
+                parts_w.append(np.asarray(self.clique[k - 2][coff[child]:coff[child + 1]]))
+        src, index = _gather_arcs(graph, nodes)
+        keep = np.asarray(self.arc_level)[index] == k - 1
+        parts_a.append(src[keep])
+        parts_b.append(np.asarray(graph.targets)[index[keep]])
+        parts_w.append(weights[index[keep]])
+        a, b, w = (np.concatenate(p) for p in (parts_a, parts_b, parts_w))
+        keep = (a != b) & (w < np.inf)
+        perm = np.argsort(nodes, kind="stable")
+        local_a = perm[np.searchsorted(nodes, a[keep], sorter=perm)]
+        local_b = perm[np.searchsorted(nodes, b[keep], sorter=perm)]
+        return nodes, local_a, local_b, w[keep]
+
+    def _task(self, graph: CSRGraph, weights: np.ndarray, k: int, c: int) -> CellTask:
+        nodes, a, b, w = self._cell_graph(graph, weights, k, c)
+        off = self.bnd_offsets[k - 1]
+        bnd = np.asarray(self.bnd_nodes[k - 1][off[c]:off[c + 1]], dtype=np.int64)
+        perm = np.argsort(nodes, kind="stable")
+        return len(nodes), a, b, w, perm[np.searchsorted(nodes, bnd, sorter=perm)]
+
+    def customize(self, graph: CSRGraph, workers: int = 1) -> int:
+        """
+        Жин өөрчлөгдсөн ирмэгүүдийг агуулсан cell-үүдийн clique-ийг доороос
+        дээш дахин тооцно; level бүрийн cell-үүд workers > 1 үед процессын
+        pool-д зэрэг. Дахин тооцсон cell-ийн тоог буцаана.
+        """
+        with self._lock:
+            t0 = time.perf_counter()
+            version, weights = graph.read_consistent(
+                lambda: (graph.version, np.array(graph.weights, dtype=np.float64)))
+            changed = np.flatnonzero(weights != self.weights)
+            src = np.repeat(np.arange(graph.num_nodes, dtype=np.int64),
+                            np.diff(np.asarray(graph.offsets)))[changed]
+            levels = np.asarray(self.arc_level)[changed]
+            count = 0
+            pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(changed) else None
+            try:
+                dirty = np.zeros(0, dtype=np.int64)
+                for k in range(1, self.levels + 1):
+                    cells = np.asarray(self.cells[k - 1])
+                    # Дотоод ирмэг нь өөрчлөгдсөн эсвэл дэд cell нь дахин тооцогдсон cell-үүд.
+                    own = cells[src[levels < k]]
+                    if k > 1:
+                        own = np.concatenate([own, self.parents[k - 2][dirty]])
+                    off = np.asarray(self.bnd_offsets[k - 1])
+                    dirty = np.unique(own)
+                    todo = [int(c) for c in dirty if off[c + 1] > off[c]]
+                    if not todo:
+                        continue
+                    tasks = [self._task(graph, weights, k, c) for c in todo]
+                    results = pool.map(_clique, tasks) if pool is not None else map(_clique, tasks)
+                    if not self.clique[k - 1].flags.writeable:
+                        self.clique[k - 1] = np.array(self.clique[k - 1])
+                    coff = np.asarray(self.clique_offsets[k - 1])
+                    for c, values in zip(todo, results):
+                        self.clique[k - 1][coff[c]:coff[c + 1]] = values
+                    count += len(todo)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+            self.weights = weights
+            self.meta.update({
+                "graph_version": version,
+                "customized_cells": count,
+                "customize_seconds": time.perf_counter() - t0,
+            })
+            self._views()
+            return count
+
+    def query(self, graph: CSRGraph,
+              sources: Dict[int, float],
+              targets: Dict[int, float],
+              stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        """
+        `dijkstra_multi`-тэй ижил бодлого overlay дээр. Node-ын level нь эх,
+        зорилгын аль нэгийг агуулаагүй хамгийн өндөр cell-ийн level (0 бол
+        анхны граф); тэр level-ийн clique ба cell-ээс гарах ирмэгүүдээр тэлнэ.
+        """
+        inf = float("inf")
+        stats = stats if stats is not None else SearchStats()
+        offsets, targets_, weights = graph.adjacency()
+        arc_level = self._arc_level
+        cells = self._cells
+        seeds = list(sources) + list(targets)
+        seed_cells = [{cells[k][x] for x in seeds} for k in range(self.levels)]
+        dist = np.full(graph.num_nodes, inf)
+        parent: Dict[int, Tuple[int, int]] = {}
+        pq: List[Tuple[float, int]] = []
+        for s, cost in sources.items():
+            if cost < dist[s]:
+                dist[s] = cost
+                parent[s] = (-1, 0)
+                heapq.heappush(pq, (cost, s))
+
+        best, best_node = inf, -1
+        settled = pushed = 0
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > dist[u]:
+                continue
+            if d >= best:
+                break
+            settled += 1
+            if u in targets and d + targets[u] < best:
+                best, best_node = d + targets[u], u
+            k = self.levels
+            while k > 0 and cells[k - 1][u] in seed_cells[k - 1]:
+                k -= 1
+            a, b = offsets[u], offsets[u + 1]
+            if k > 0:
+                # Clique-ийн мөр урт тул numpy-аар шүүнэ.
+                bnd_off, bnd_nodes, bnd_index, clique_off, clique = self._level[k - 1]
+                c = cells[k - 1][u]
+                lo, hi = bnd_off[c], bnd_off[c + 1]
+                base = clique_off[c] + bnd_index[u] * (hi - lo)
+                nodes = bnd_nodes[lo:hi]
+                cand = clique[base:base + hi - lo] + d
+                better = cand < dist[nodes]
+                nodes, cand = nodes[better], cand[better]
+                dist[nodes] = cand
+                for v, nd in zip(nodes.tolist(), cand.tolist()):
+                    parent[v] = (u, k)
+                    heapq.heappush(pq, (nd, v))
+                pushed += len(nodes)
+                edges = [(targets_[i], weights[i]) for i in range(a, b) if arc_level[i] >= k]
+            else:
+                edges = zip(targets_[a:b], weights[a:b])
+            for v, w in edges:
+                nd = d + w
+                if nd < dist[v]:
+                    dist[v] = nd
+                    parent[v] = (u, 0)
+                    heapq.heappush(pq, (nd, v))
+                    pushed += 1
+        stats.settled += settled
+        stats.pushed += pushed
+
+        if best_node == -1:
+            return [], inf
+        steps = []
+        cur = best_node
+        while cur != -1:
+            prev, kind = parent[cur]
+            steps.append((prev, cur, kind))
+            cur = prev
+        steps.reverse()
+        path = [steps[0][1]]
+        for prev, cur, kind in steps[1:]:
+            path.extend(self._unpack(graph, kind, prev, cur)[1:] if kind else [cur])
+        return path, best
+
+    def _unpack(self, graph: CSRGraph, k: int, u: int, v: int) -> List[int]:
+        """
+        Level k-ийн clique ирмэг u -> v-г cell доторх хайлтаар анхны node-ууд болгоно.
+        """
+        nodes, a, b, w = self._cell_graph(graph, np.asarray(graph.weights), k,
+                                          self._cells[k - 1][u])
+        perm = np.argsort(nodes, kind="stable")
+        s, t = perm[np.searchsorted(nodes, [u, v], sorter=perm)].tolist()
+        order = np.argsort(a, kind="stable")
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(a, minlength=len(nodes)), out=offsets[1:])
+        off, tgt, wgt = offsets.tolist(), b[order].tolist(), w[order].tolist()
+        dist = {s: 0.0}
+        prev = {s: -1}
+        pq = [(0.0, s)]
+        while pq:
+            d, x = heapq.heappop(pq)
+            if x == t:
+                break
+            if d > dist[x]:
+                continue
+            for i in range(off[x], off[x + 1]):
+                y = tgt[i]
+                nd = d + wgt[i]
+                if nd < dist.get(y, float("inf")):
+                    dist[y] = nd
+                    prev[y] = x
+                    heapq.heappush(pq, (nd, y))
+        local = [t]
+        while prev[local[-1]] != -1:
+            local.append(prev[local[-1]])
+        hops = nodes[local[::-1]].tolist()
+        path = [u]
+        for x, y in zip(hops, hops[1:]):
+            if k > 1 and self._cells[k - 2][x] == self._cells[k - 2][y]:
+                path.extend(self._unpack(graph, k - 1, x, y)[1:])
+            else:
+                path.append(y)
+        return path
+
+    def shortest(self, graph: CSRGraph, start: int, goal: int,
+                 stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        return self.query(graph, {start: 0.0}, {goal: 0.0}, stats)
+
+    def snapped(self, graph: CSRGraph, src: EdgeSnap, dst: EdgeSnap,
+                stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        sources, targets, direct = snap_seeds(graph, src, dst)
+        path, total = self.query(graph, sources, targets, stats)
+        if direct <= total:
+            return [], direct
+        return path, total
+
+
+def build_overlay(graph: CSRGraph,
+                  cell_size: int = CELL_SIZE,
+                  fanout_bits: int = FANOUT_BITS,
+                  workers: int = 1) -> Overlay:
+    """
+    Хуваалт, хилийн node-ууд, clique-ийн байрлалыг барьж, анхны customization хийнэ.
+    """
+    t0 = time.perf_counter()
+    n = graph.num_nodes
+    cells = multilevel_partition(graph, cell_size, fanout_bits)
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(np.asarray(graph.offsets)))
+    dst = np.asarray(graph.targets, dtype=np.int64)
+    arc_level = np.zeros(len(dst), dtype=np.int8)
+    for k in range(len(cells)):
+        arc_level[cells[k][src] != cells[k][dst]] = k + 1
+    arrays: Dict[str, np.ndarray] = {
+        "cells": cells,
+        "arc_level": arc_level,
+        # nan != жин тул анхны customization бүх cell-ийг тооцно.
+        "weights": np.full(len(dst), np.nan),
+    }
+    for k in range(1, len(cells) + 1):
+        cut = arc_level >= k
+        nodes = np.unique(np.concatenate([src[cut], dst[cut]]))
+        owner = cells[k - 1][nodes]
+        order = np.argsort(owner, kind="stable")
+        counts = np.bincount(owner, minlength=int(cells[k - 1].max()) + 1)
+        arrays[f"bnd_offsets_{k}"] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        arrays[f"bnd_nodes_{k}"] = nodes[order].astype(np.int32)
+        arrays[f"clique_offsets_{k}"] = np.concatenate([[0], np.cumsum(counts ** 2)]).astype(np.int64)
+        arrays[f"clique_{k}"] = np.full(int((counts ** 2).sum()), np.inf)
+    overlay = Overlay(arrays, {
+        "key": graph.meta.get("key"),
+        "levels": len(cells),
+        "cell_size": cell_size,
+        "fanout_bits": fanout_bits,
+    })
+    overlay.meta["partition_seconds"] = time.perf_counter() - t0
+    overlay.customize(graph, workers)
+    return overlay
+
+
+def save_overlay(overlay: Overlay, path: str) -> None:
+    save_array_dir(path, overlay.arrays(),
+                   {"format": CRP_FORMAT, "version": CRP_VERSION, "crp": overlay.meta}, prefix=".crp-")
+
+
+def load_overlay(path: str, mmap: bool = True) -> Overlay:
+    arrays, meta = load_array_dir(path, None, CRP_FORMAT, CRP_VERSION, mmap)
+    return Overlay(arrays, meta.get("crp"))
+
+
+def overlay_path(graph: CSRGraph, cache_dir: str, version: Optional[int] = None) -> str:
+    """
+    Суурь overlay-н хавтас; version өгвөл тухайн жингийн хувилбарт customize
+    хийсэн overlay-н хавтас (`save_customized_overlay`).
+    """
+    path = os.path.join(cache_dir, f"crp-{(graph.meta.get('key') or 'nokey')[:16]}")
+    return path if version is None else f"{path}-v{version}"
+
+
+def save_customized_overlay(overlay: Overlay, graph: CSRGraph, cache_dir: str) -> str:
+    """
+    Customization-ий үр дүнг жингийн хувилбарын хавтаст хадгалж, хуучин
+    хувилбаруудын хавтсыг устгана. Shared memory граф дээрх бусад worker-ууд
+    үүнийг `load_customized_overlay`-аар mmap-аар ачаална.
+    """
+    version = overlay.meta["graph_version"]
+    path = overlay_path(graph, cache_dir, version)
+    save_overlay(overlay, path)
+    base = os.path.basename(overlay_path(graph, cache_dir)) + "-v"
+    for name in os.listdir(cache_dir):
+        if name.startswith(base) and name[len(base):].isdigit() and int(name[len(base):]) < version:
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+    return path
+
+
+def load_customized_overlay(graph: CSRGraph, cache_dir: str) -> Optional[Overlay]:
+    """
+    Графын одоогийн жинд customize хийгдсэн overlay (байхгүй бол None). Өмнөх
+    ажиллагааны ижил дугаартай хавтсыг жингээр нь шалгаж хаяна.
+    """
+    path = overlay_path(graph, cache_dir, graph.version)
+    if not os.path.isdir(path):
+        return None
+    try:
+        overlay = load_overlay(path)
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("Overlay уншиж чадсангүй (%s).", exc)
+        return None
+    if (overlay.is_valid(graph) and overlay.is_customized(graph)
+            and np.array_equal(overlay.weights, graph.weights)):
+        return overlay
+    return None
+
+
+def load_or_build_overlay(graph: CSRGraph, cache_dir: str,
+                          build: bool = True, workers: int = 1) -> Optional[Overlay]:
+    """
+    Графтай тохирох overlay-г cache_dir-аас ачаална; байхгүй бол build=True
+    үед барьж хадгална, эс бөгөөс None.
+    """
+    path = overlay_path(graph, cache_dir)
+    if os.path.isdir(path):
+        try:
+            overlay = load_overlay(path)
+            if overlay.is_valid(graph):
+                logger.info("CRP overlay ачааллаа: %s", path)
+                return overlay
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Overlay уншиж чадсангүй (%s).", exc)
+    if not build:
+        return None
+    overlay = build_overlay(graph, workers=workers)
+    save_overlay(overlay, path)
+    logger.info("CRP overlay барилаа: %s (cell=%s, хуваалт %.1f s, customization %.1f s)",
+                path, overlay.num_cells, overlay.meta["partition_seconds"],
+                overlay.meta["customize_seconds"])
+    return overlay
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CRP хуваалт, overlay-г барьж хадгална.")
+    parser.add_argument("shapefile")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--cell-size", type=int, default=CELL_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    graph = load_graph_cached(args.shapefile, cache_dir=args.cache_dir)
+    cache_dir = args.cache_dir or os.path.join(
+        os.path.dirname(os.path.abspath(args.shapefile)), ".graph_cache")
+    overlay = build_overlay(graph, cell_size=args.cell_size, workers=args.workers)
+    save_overlay(overlay, overlay_path(graph, cache_dir))
+    t0 = time.perf_counter()
+    overlay.weights = np.full(len(overlay.weights), np.nan)
+    overlay.customize(graph, args.workers)
+    logger.info("level=%d cell=%s хил=%s  хуваалт %.1f s, бүтэн customization %.1f s",
+                overlay.levels, overlay.num_cells, [len(b) for b in overlay.bnd_nodes],
+                overlay.meta["partition_seconds"], time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
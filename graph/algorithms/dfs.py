@@ -1,7 +1,8 @@
-from typing import List, Tuple, Dict, Optional, Iterable
+from typing import List, Tuple, Dict, Optional, Iterable, Union
+from ..csr import CSRGraph
 from ..road_graph import RoadGraph
 
-def dfs_all_paths(graph: RoadGraph,
+def dfs_all_paths(graph: Union[RoadGraph, CSRGraph],
                   start: int,
                   goal: int,
                   max_paths: int = 10,
@@ -14,12 +15,14 @@ def dfs_all_paths(graph: RoadGraph,
 
     goal_lon, goal_lat = graph.nodes[goal]
 
+    nodes = graph.nodes
+    inf = float("inf")
+
     def neighbor_iter(u: int) -> Iterable:
-        nbrs = graph.adj.get(u, [])
         return iter(sorted(
-            nbrs,
-            key=lambda e: (graph.nodes[e.target][0] - goal_lon) ** 2 +
-                          (graph.nodes[e.target][1] - goal_lat) ** 2
+            (v for v, w in graph.neighbors(u) if w != inf),
+            key=lambda v: (nodes[v][0] - goal_lon) ** 2 +
+                          (nodes[v][1] - goal_lat) ** 2
         ))
 
     path: List[int] = [start]
@@ -40,8 +43,7 @@ def dfs_all_paths(graph: RoadGraph,
             continue
 
         try:
-            edge = next(it)
-            v = edge.target
+            v = next(it)
             if v in visited:
                 continue
             if len(path) >= max_depth:
@@ -1,24 +1,34 @@
 # graph/algorithms/dijkstra.py
 import heapq
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+from ..csr import CSRGraph
+from ..models import EdgeSnap, SearchStats
 from ..road_graph import RoadGraph
 
-def dijkstra_shortest(graph: RoadGraph,
+def dijkstra_shortest(graph: Union[RoadGraph, CSRGraph],
                       start: int,
-                      goal: int) -> Tuple[List[int], float]:
+                      goal: int,
+                      stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
     """
-    Жинтэй граф дээрх хамгийн богино (жин хамгийн бага) зам.
+    Жинтэй граф дээрх хамгийн богино (жин хамгийн бага) зам. stats өгвөл
+    хайлтын тоолуурууд түүнд нэмэгдэнэ.
     """
+    if isinstance(graph, CSRGraph):
+        return _dijkstra_csr(graph, start, goal, stats)
+    stats = stats if stats is not None else SearchStats()
+
     dist: Dict[int, float] = {nid: float("inf") for nid in graph.nodes}
     parent: Dict[int, Optional[int]] = {nid: None for nid in graph.nodes}
 
     dist[start] = 0.0
     pq: List[Tuple[float, int]] = [(0.0, start)]
+    settled = pushed = 0
 
     while pq:
         d, u = heapq.heappop(pq)
         if d > dist[u]:
             continue
+        settled += 1
         if u == goal:
             break
         for edge in graph.adj.get(u, []):
@@ -28,6 +38,9 @@ def dijkstra_shortest(graph: RoadGraph,
                 dist[v] = nd
                 parent[v] = u
                 heapq.heappush(pq, (nd, v))
+                pushed += 1
+    stats.settled += settled
+    stats.pushed += pushed
 
     if dist[goal] == float("inf"):
         return [], float("inf")
@@ -39,3 +52,191 @@ def dijkstra_shortest(graph: RoadGraph,
         cur = parent[cur]
     path.reverse()
     return path, dist[goal]
+
+
+def _dijkstra_csr(graph: CSRGraph,
+                  start: int,
+                  goal: int,
+                  stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+    """
+    CSR хувилбар: node id нягт тул dict биш list ашиглана.
+    """
+    stats = stats if stats is not None else SearchStats()
+    inf = float("inf")
+    n = graph.num_nodes
+    dist: List[float] = [inf] * n
+    parent: List[int] = [-1] * n
+    offsets, targets, weights = graph.adjacency()
+
+    dist[start] = 0.0
+    pq: List[Tuple[float, int]] = [(0.0, start)]
+    settled = pushed = 0
+
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        settled += 1
+        if u == goal:
+            break
+        a, b = offsets[u], offsets[u + 1]
+        for v, w in zip(targets[a:b], weights[a:b]):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd, v))
+                pushed += 1
+    stats.settled += settled
+    stats.pushed += pushed
+
+    if dist[goal] == inf:
+        return [], inf
+
+    path = []
+    cur = goal
+    while cur != -1:
+        path.append(cur)
+        cur = parent[cur]
+    path.reverse()
+    return path, dist[goal]
+
+
+def dijkstra_multi(graph: Union[RoadGraph, CSRGraph],
+                   sources: Dict[int, float],
+                   targets: Dict[int, float],
+                   stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+    """
+    Олон эх, олон зорилготой хайлт: node s-ээс sources[s] зардлаар эхэлж,
+    t-д хүрээд targets[t]-ийг нэмнэ. Нийт зардал хамгийн бага замыг буцаана.
+    """
+    inf = float("inf")
+    stats = stats if stats is not None else SearchStats()
+    if isinstance(graph, CSRGraph):
+        dist: Union[List[float], Dict[int, float]] = [inf] * graph.num_nodes
+        parent: Union[List[int], Dict[int, int]] = [-1] * graph.num_nodes
+    else:
+        dist = {nid: inf for nid in graph.nodes}
+        parent = {nid: -1 for nid in graph.nodes}
+
+    pq: List[Tuple[float, int]] = []
+    for s, cost in sources.items():
+        if cost < dist[s]:
+            dist[s] = cost
+            heapq.heappush(pq, (cost, s))
+
+    best, best_node = inf, -1
+    settled = pushed = 0
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        if d >= best:
+            break
+        settled += 1
+        if u in targets and d + targets[u] < best:
+            best, best_node = d + targets[u], u
+        for v, w in graph.neighbors(u):
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd, v))
+                pushed += 1
+    stats.settled += settled
+    stats.pushed += pushed
+
+    if best_node == -1:
+        return [], inf
+
+    path = []
+    cur = best_node
+    while cur != -1:
+        path.append(cur)
+        cur = parent[cur]
+    path.reverse()
+    return path, best
+
+
+def _add_seed(seeds: Dict[int, float], node: int, weight: float, fraction: float) -> None:
+    if weight != float("inf"):
+        cost = weight * fraction
+        if cost < seeds.get(node, float("inf")):
+            seeds[node] = cost
+
+
+def snap_seeds(graph: CSRGraph,
+               src: EdgeSnap,
+               dst: EdgeSnap) -> Tuple[Dict[int, float], Dict[int, float], float]:
+    """
+    Snap хийсэн хоёр цэгийн (sources, targets, direct): үзүүрүүд хэсэгчилсэн жинтэй,
+    direct нь нэг ирмэг дээр байхад шууд хүрэх жин (эсвэл inf).
+    """
+    inf = float("inf")
+    src_ab, src_ba = graph.snap_weights(src)
+    dst_ab, dst_ba = graph.snap_weights(dst)
+    sources: Dict[int, float] = {}
+    targets: Dict[int, float] = {}
+    _add_seed(sources, src.b, src_ab, 1.0 - src.t)
+    _add_seed(sources, src.a, src_ba, src.t)
+    _add_seed(targets, dst.a, dst_ab, dst.t)
+    _add_seed(targets, dst.b, dst_ba, 1.0 - dst.t)
+
+    direct = inf
+    if (src.a, src.b, src.geom) == (dst.a, dst.b, dst.geom):
+        if dst.t >= src.t and src_ab != inf:
+            direct = src_ab * (dst.t - src.t)
+        if dst.t <= src.t and src_ba != inf:
+            direct = min(direct, src_ba * (src.t - dst.t))
+    return sources, targets, direct
+
+
+def dijkstra_snapped(graph: CSRGraph,
+                     src: EdgeSnap,
+                     dst: EdgeSnap,
+                     stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+    """
+    Ирмэг дээр snap хийсэн хоёр цэгийн хоорондох хамгийн богино зам
+    (`snap_seeds`-ээр эхэлсэн `dijkstra_multi`). Хоёулаа нэг ирмэг дээр
+    бөгөөд шууд хүрэх нь дөт бол ([], жин) буцаана.
+    """
+    sources, targets, direct = snap_seeds(graph, src, dst)
+    path, total = dijkstra_multi(graph, sources, targets, stats)
+    if direct <= total:
+        return [], direct
+    return path, total
+
+
+def dijkstra_tree(graph: CSRGraph, source: int,
+                  reverse: bool = False) -> Tuple[List[float], List[int], List[int]]:
+    """
+    source-оос бүх node хүртэлх (reverse=True үед бүх node-оос source хүртэлх)
+    зай, shortest-path tree-ийн parent, settle хийсэн дараалал.
+    """
+    inf = float("inf")
+    n = graph.num_nodes
+    offsets, targets, weights = graph.adjacency()
+    if reverse:
+        offsets, targets, edges = graph.reverse_adjacency()
+    dist: List[float] = [inf] * n
+    parent: List[int] = [-1] * n
+    order: List[int] = []
+    dist[source] = 0.0
+    pq: List[Tuple[float, int]] = [(0.0, source)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        order.append(u)
+        a, b = offsets[u], offsets[u + 1]
+        if reverse:
+            arcs = zip(targets[a:b], map(weights.__getitem__, edges[a:b]))
+        else:
+            arcs = zip(targets[a:b], weights[a:b])
+        for v, w in arcs:
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd, v))
+    return dist, parent, order
@@ -0,0 +1,350 @@
+# graph/algorithms/hub_labels.py
+"""
+Hub labeling: d(s, t) = min_h d(s, h) + d(h, t), L_out(s) ∩ L_in(t) дээр
+(pruned landmark labeling). Жин өөрчлөгдвөл `is_valid` False болно.
+
+    python -m graph.algorithms.hub_labels data/gis_osm_roads_free_1.shp --order ch
+"""
+import argparse
+import heapq
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..csr import CSRGraph
+from ..io.snapshot import load_array_dir, save_array_dir
+from ..models import EdgeSnap, SearchStats
+from .dijkstra import dijkstra_tree, snap_seeds
+
+logger = logging.getLogger(__name__)
+
+HL_FORMAT = "roadgraph-hl"
+HL_VERSION = 1
+HL_ARRAYS = ("order",
+             "out_offsets", "out_hubs", "out_dists",
+             "in_offsets", "in_hubs", "in_dists")
+ORDERS = ("coverage", "ch")
+# coverage эрэмбэд хэдэн shortest-path tree түүвэрлэх.
+ORDER_SAMPLES = 64
+
+
+class HubLabels:
+    """
+    order[r] = r дахь hub-ын node; node v-ийн гарах label нь
+    out_hubs/out_dists[out_offsets[v]:out_offsets[v + 1]] (hub rank өсөх
+    дарааллаар), орох label нь in_* массивуудад.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> None:
+        for name in HL_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta: Dict = dict(meta or {})
+        self._out = tuple(memoryview(a) for a in (self.out_offsets, self.out_hubs, self.out_dists))
+        self._in = tuple(memoryview(a) for a in (self.in_offsets, self.in_hubs, self.in_dists))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in HL_ARRAYS}
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.order)
+
+    @property
+    def num_entries(self) -> int:
+        return len(self.out_hubs) + len(self.in_hubs)
+
+    def is_valid(self, graph: CSRGraph) -> bool:
+        return (self.meta.get("key") == graph.meta.get("key")
+                and self.meta.get("graph_version") == graph.version
+                and self.num_nodes == graph.num_nodes)
+
+    def report(self) -> Dict[str, float]:
+        """
+        Node бүрийн label-ийн хэмжээ (гарах + орох entry) ба санах ой, барих хугацаа.
+        """
+        sizes = np.diff(np.asarray(self.out_offsets)) + np.diff(np.asarray(self.in_offsets))
+        p50, p90, p99 = np.percentile(sizes, (50, 90, 99)) if len(sizes) else (0, 0, 0)
+        return {
+            "nodes": self.num_nodes,
+            "entries": self.num_entries,
+            "mean": float(sizes.mean()) if len(sizes) else 0.0,
+            "p50": float(p50),
+            "p90": float(p90),
+            "p99": float(p99),
+            "max": int(sizes.max()) if len(sizes) else 0,
+            "mib": sum(a.nbytes for a in self.arrays().values()) / 2**20,
+            "build_seconds": self.meta.get("build_seconds", 0.0),
+        }
+
+    def distance(self, source: int, target: int,
+                 stats: Optional[SearchStats] = None) -> float:
+        """
+        L_out(source), L_in(target)-ийн merge-join; хүрэхгүй бол inf.
+        stats.settled-д шалгасан label entry-ийн тоо нэмэгдэнэ.
+        """
+        out_off, out_hubs, out_dists = self._out
+        in_off, in_hubs, in_dists = self._in
+        i, i_end = out_off[source], out_off[source + 1]
+        j, j_end = in_off[target], in_off[target + 1]
+        best = float("inf")
+        while i < i_end and j < j_end:
+            a, b = out_hubs[i], in_hubs[j]
+            if a == b:
+                d = out_dists[i] + in_dists[j]
+                if d < best:
+                    best = d
+                i += 1
+                j += 1
+            elif a < b:
+                i += 1
+            else:
+                j += 1
+        if stats is not None:
+            stats.settled += (i - out_off[source]) + (j - in_off[target])
+        return best
+
+    def distance_table(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        len(sources) x len(targets) зайн хүснэгт: эх бүрийн label-ийг rank-аар
+        тарааж, бүх зорилгын label-ийг нэг дор векторчилж цуглуулна.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        table = np.full((len(sources), len(targets)), np.inf)
+        if not len(sources) or not len(targets):
+            return table
+        in_off = np.asarray(self.in_offsets)
+        starts, ends = in_off[targets], in_off[targets + 1]
+        lengths = ends - starts
+        bounds = np.cumsum(lengths) - lengths
+        index = np.repeat(starts - bounds, lengths) + np.arange(lengths.sum())
+        hubs = np.asarray(self.in_hubs)[index]
+        dists = np.asarray(self.in_dists)[index]
+        # Хоосон label-ийн сегментийг reduceat дараагийнхаар нь дүүргэх тул алгасна (inf).
+        filled = lengths > 0
+        bounds = bounds[filled]
+        out_off = np.asarray(self.out_offsets)
+        scratch = np.full(self.num_nodes, np.inf)
+        for row, s in enumerate(sources):
+            a, b = out_off[s], out_off[s + 1]
+            scratch[self.out_hubs[a:b]] = self.out_dists[a:b]
+            if len(bounds):
+                table[row, filled] = np.minimum.reduceat(scratch[hubs] + dists, bounds)
+            scratch[self.out_hubs[a:b]] = np.inf
+        return table
+
+    def path(self, graph: CSRGraph, source: int, target: int,
+             stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        """
+        Замыг (заавал биш) сэргээнэ: хөрш бүрээс w + d(v, target) хамгийн бага
+        нэгийг сонгож target хүртэл алхана.
+        """
+        total = self.distance(source, target, stats)
+        if total == float("inf"):
+            return [], total
+        offsets, targets, weights = graph.adjacency()
+        path = [source]
+        seen = {source}
+        u = source
+        while u != target:
+            best, nxt = float("inf"), -1
+            a, b = offsets[u], offsets[u + 1]
+            for v, w in zip(targets[a:b], weights[a:b]):
+                if v not in seen:
+                    d = w + self.distance(v, target, stats)
+                    if d < best:
+                        best, nxt = d, v
+            if nxt == -1:
+                return [], float("inf")
+            path.append(nxt)
+            seen.add(nxt)
+            u = nxt
+        return path, total
+
+    def shortest(self, graph: CSRGraph, start: int, goal: int,
+                 stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        return self.path(graph, start, goal, stats)
+
+    def snapped(self, graph: CSRGraph, src: EdgeSnap, dst: EdgeSnap,
+                stats: Optional[SearchStats] = None) -> Tuple[List[int], float]:
+        sources, targets, direct = snap_seeds(graph, src, dst)
+        best, pair = float("inf"), None
+        for s, cs in sources.items():
+            for t, ct in targets.items():
+                d = cs + self.distance(s, t, stats) + ct
+                if d < best:
+                    best, pair = d, (s, t)
+        if direct <= best:
+            return [], direct
+        if pair is None:
+            return [], best
+        return self.path(graph, *pair, stats)[0], best
+
+
+def coverage_order(graph: CSRGraph, samples: int = ORDER_SAMPLES, seed: int = 0) -> np.ndarray:
+    """
+    Түүвэрлэсэн shortest-path tree-үүдэд (урагш, урвуу ээлжлэн) node бүрийн
+    дэд модны хэмжээний нийлбэр буурах дараалал: олон хамгийн богино зам
+    дайрдаг node эхэнд hub болно.
+    """
+    n = graph.num_nodes
+    rng = np.random.default_rng(seed)
+    score = [0] * n
+    for k, root in enumerate(rng.integers(n, size=min(samples, n)).tolist()):
+        _, parent, order = dijkstra_tree(graph, root, reverse=bool(k % 2))
+        size = [1] * n
+        for v in reversed(order):
+            p = parent[v]
+            if p != -1:
+                size[p] += size[v]
+            score[v] += size[v]
+    degree = np.diff(np.asarray(graph.offsets))
+    return np.lexsort((-degree, -np.asarray(score))).astype(np.int32)
+
+
+def build_hub_labels(graph: CSRGraph, order: Optional[np.ndarray] = None) -> HubLabels:
+    """
+    Pruned landmark labeling. order (node-ууд, чухал нь эхэнд) өгөөгүй бол
+    `coverage_order`.
+    """
+    t0 = time.perf_counter()
+    inf = float("inf")
+    n = graph.num_nodes
+    if order is None:
+        order = coverage_order(graph)
+    order = np.asarray(order, dtype=np.int32)
+    offsets, targets, weights = graph.adjacency()
+    rev_off, rev_src, rev_edge = graph.reverse_adjacency()
+    labels = {
+        "out": ([[] for _ in range(n)], [[] for _ in range(n)]),
+        "in": ([[] for _ in range(n)], [[] for _ in range(n)]),
+    }
+    scratch: List[float] = [inf] * n
+    dist: List[float] = [inf] * n
+
+    for r, v in enumerate(order.tolist()):
+        # Урагш хайлт L_in-ийг, урвуу хайлт L_out-ийг өргөтгөнө; тайрах
+        # шалгалт нь v-ийн эсрэг талын label-ийг scratch-д rank-аар дэлгэнэ.
+        for side, other, reverse in (("in", "out", False), ("out", "in", True)):
+            own_hubs, own_dists = labels[side]
+            hubs, dists = labels[other][0][v], labels[other][1][v]
+            for h, d in zip(hubs, dists):
+                scratch[h] = d
+            touched = [v]
+            dist[v] = 0.0
+            pq: List[Tuple[float, int]] = [(0.0, v)]
+            while pq:
+                d, u = heapq.heappop(pq)
+                if d > dist[u]:
+                    continue
+                for h, dh in zip(own_hubs[u], own_dists[u]):
+                    if scratch[h] + dh <= d:
+                        break
+                else:
+                    own_hubs[u].append(r)
+                    own_dists[u].append(d)
+                    if reverse:
+                        a, b = rev_off[u], rev_off[u + 1]
+                        arcs = zip(rev_src[a:b], map(weights.__getitem__, rev_edge[a:b]))
+                    else:
+                        a, b = offsets[u], offsets[u + 1]
+                        arcs = zip(targets[a:b], weights[a:b])
+                    for x, w in arcs:
+                        nd = d + w
+                        if nd < dist[x]:
+                            if dist[x] == inf:
+                                touched.append(x)
+                            dist[x] = nd
+                            heapq.heappush(pq, (nd, x))
+            for x in touched:
+                dist[x] = inf
+            for h in hubs:
+                scratch[h] = inf
+
+    arrays: Dict[str, np.ndarray] = {"order": order}
+    for side in ("out", "in"):
+        hubs, dists = labels[side]
+        arrays[f"{side}_offsets"] = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(h) for h in hubs], out=arrays[f"{side}_offsets"][1:])
+        arrays[f"{side}_hubs"] = np.fromiter((h for hs in hubs for h in hs), dtype=np.int32,
+                                             count=int(arrays[f"{side}_offsets"][-1]))
+        arrays[f"{side}_dists"] = np.fromiter((d for ds in dists for d in ds), dtype=np.float64,
+                                              count=int(arrays[f"{side}_offsets"][-1]))
+    meta = {
+        "key": graph.meta.get("key"),
+        "graph_version": graph.version,
+        "nodes": n,
+        "build_seconds": time.perf_counter() - t0,
+    }
+    return HubLabels(arrays, meta)
+
+
+def save_hub_labels(hl: HubLabels, path: str) -> None:
+    save_array_dir(path, hl.arrays(),
+                   {"format": HL_FORMAT, "version": HL_VERSION, "hl": hl.meta}, prefix=".hl-")
+
+
+def load_hub_labels(path: str, mmap: bool = True) -> HubLabels:
+    arrays, meta = load_array_dir(path, HL_ARRAYS, HL_FORMAT, HL_VERSION, mmap)
+    return HubLabels(arrays, meta.get("hl"))
+
+
+def hub_labels_path(graph: CSRGraph, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"hl-{(graph.meta.get('key') or 'nokey')[:16]}")
+
+
+def load_or_build_hub_labels(graph: CSRGraph, cache_dir: str,
+                             build: bool = True,
+                             order: Optional[np.ndarray] = None) -> Optional[HubLabels]:
+    """
+    Графтай тохирох label-уудыг cache_dir-аас ачаална; байхгүй бол build=True
+    үед барьж хадгална, эс бөгөөс None.
+    """
+    path = hub_labels_path(graph, cache_dir)
+    if os.path.isdir(path):
+        try:
+            hl = load_hub_labels(path)
+            if hl.is_valid(graph):
+                logger.info("Hub label ачааллаа: %s", path)
+                return hl
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Hub label уншиж чадсангүй (%s).", exc)
+    if not build:
+        return None
+    hl = build_hub_labels(graph, order)
+    save_hub_labels(hl, path)
+    logger.info("Hub label барилаа: %s (entry=%d, %.1f s)",
+                path, hl.num_entries, hl.meta["build_seconds"])
+    return hl
+
+
+def main() -> None:
+    from ..io.snapshot import load_graph_cached
+    from .ch import load_or_build_hierarchy
+
+    parser = argparse.ArgumentParser(description="Hub label барьж, хэмжээг нь тайлагнана.")
+    parser.add_argument("shapefile")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--order", choices=ORDERS, default="ch",
+                        help="ch: contraction hierarchy-ийн rank (байхгүй бол барина)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    graph = load_graph_cached(args.shapefile, cache_dir=args.cache_dir)
+    cache_dir = args.cache_dir or os.path.join(
+        os.path.dirname(os.path.abspath(args.shapefile)), ".graph_cache")
+    order = None
+    if args.order == "ch":
+        rank = np.asarray(load_or_build_hierarchy(graph, cache_dir).rank)
+        order = np.argsort(-rank, kind="stable")
+    hl = build_hub_labels(graph, order)
+    save_hub_labels(hl, hub_labels_path(graph, cache_dir))
+    rep = hl.report()
+    logger.info("node=%d entry=%d  label/node: mean=%.1f p50=%.0f p90=%.0f p99=%.0f max=%d"
+                "  %.1f MiB  %.1f s", rep["nodes"], rep["entries"], rep["mean"], rep["p50"],
+                rep["p90"], rep["p99"], rep["max"], rep["mib"], rep["build_seconds"])
+
+
+if __name__ == "__main__":
+    main()
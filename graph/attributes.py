@@ -0,0 +1,92 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .models import Way
+
+# Geofabrik OSM roads давхаргын fclass-ууд; 0 = тодорхойгүй.
+FCLASS_CODES: Tuple[str, ...] = (
+    "unknown",
+    "motorway", "trunk", "primary", "secondary", "tertiary",
+    "motorway_link", "trunk_link", "primary_link", "secondary_link", "tertiary_link",
+    "unclassified", "residential", "living_street", "service", "pedestrian",
+    "track", "track_grade1", "track_grade2", "track_grade3", "track_grade4",
+    "track_grade5", "bridleway", "cycleway", "footway", "path", "steps",
+)
+_FCLASS_INDEX = {name: code for code, name in enumerate(FCLASS_CODES)}
+
+FLAG_ONEWAY = 1
+FLAG_ACCESS_DESTINATION = 2
+FLAG_ACCESS_RESTRICTED = 4
+
+ONEWAY_FORWARD = ("yes", "1", "true")
+ONEWAY_BACKWARD = ("-1", "reverse")
+
+
+def fclass_code(fclass: Optional[str]) -> int:
+    return _FCLASS_INDEX.get(fclass, 0) if isinstance(fclass, str) else 0
+
+
+def way_flags(oneway: Optional[str], access: Optional[str]) -> int:
+    flags = 0
+    ow = oneway.strip().lower() if isinstance(oneway, str) else "no"
+    if ow in ONEWAY_FORWARD or ow in ONEWAY_BACKWARD:
+        flags |= FLAG_ONEWAY
+    if isinstance(access, str) and access not in ("", "yes", "permissive"):
+        flags |= FLAG_ACCESS_DESTINATION if access == "destination" else FLAG_ACCESS_RESTRICTED
+    return flags
+
+
+def encode_way_columns(fclass: Sequence[Optional[str]],
+                       oneway: Sequence[Optional[str]],
+                       access: Sequence[Optional[str]],
+                       maxspeed: Sequence[int],
+                       name: Sequence[Optional[str]]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """
+    Way-уудын шинжийг (багана тус бүрээр) баганан массив болгоно. Массивын
+    төгсгөлд way=-1 (шинжгүй ирмэг)-д зориулсан хоосон мөр нэмэгдсэн байгаа.
+    """
+    names: List[str] = [""]
+    name_index: Dict[str, int] = {"": 0}
+
+    def name_code(value: Optional[str]) -> int:
+        if not isinstance(value, str) or not value:
+            return 0
+        code = name_index.get(value)
+        if code is None:
+            code = name_index[value] = len(names)
+            names.append(value)
+        return code
+
+    n = len(fclass)
+    flag_cache: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+    arrays = {
+        "edge_fclass": np.fromiter((fclass_code(v) for v in fclass), dtype=np.uint8, count=n),
+        "edge_flags": np.fromiter(
+            (flag_cache[k] if k in flag_cache else flag_cache.setdefault(k, way_flags(*k))
+             for k in zip(oneway, access)),
+            dtype=np.uint8, count=n),
+        "edge_maxspeed": np.clip(np.nan_to_num(np.asarray(maxspeed, dtype=np.float64)),
+                                 0, 0xFFFF).astype(np.uint16),
+        "edge_name": np.fromiter((name_code(v) for v in name), dtype=np.int32, count=n),
+    }
+    return {key: np.append(arr, arr.dtype.type(0)) for key, arr in arrays.items()}, names
+
+
+def encode_ways(ways: Sequence[Way]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """
+    `RoadGraph.ways`-ийг баганан массив болгоно (`encode_way_columns`).
+    """
+    return encode_way_columns([w.fclass for w in ways],
+                              [w.oneway for w in ways],
+                              [w.access for w in ways],
+                              [w.maxspeed or 0 for w in ways],
+                              [w.name for w in ways])
+
+
+def fclass_mask(edge_fclass: np.ndarray, classes: Sequence[str]) -> np.ndarray:
+    """
+    Ирмэг бүрийн fclass `classes`-д орох эсэх (bool массив), жишээ нь cost model-д.
+    """
+    lookup = np.zeros(len(FCLASS_CODES), dtype=bool)
+    for c in classes:
+        lookup[fclass_code(c)] = True
+    return lookup[np.asarray(edge_fclass)]
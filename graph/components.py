@@ -0,0 +1,105 @@
+from typing import List, Tuple
+import numpy as np
+from .csr import CSRGraph
+
+
+def strong_components(graph: CSRGraph) -> np.ndarray:
+    """
+    Tarjan-ийн алгоритм (давталттай хувилбар). Label нь компонент дууссан
+    дараалал тул u -> v зам байвал scc[u] >= scc[v] байна.
+    """
+    n = graph.num_nodes
+    offsets, targets, _ = graph.adjacency()
+    index = [-1] * n
+    low = [0] * n
+    on_stack = bytearray(n)
+    label = np.full(n, -1, dtype=np.int32)
+    stack: List[int] = []
+    counter = 0
+    n_comp = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work: List[Tuple[int, int]] = [(root, offsets[root])]
+        while work:
+            u, i = work[-1]
+            end = offsets[u + 1]
+            while i < end:
+                v = targets[i]
+                i += 1
+                if index[v] == -1:
+                    break
+                if on_stack[v] and index[v] < low[u]:
+                    low[u] = index[v]
+            else:
+                v = -1
+            if v != -1 and index[v] == -1:
+                work[-1] = (u, i)
+                index[v] = low[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack[v] = 1
+                work.append((v, offsets[v]))
+                continue
+
+            work.pop()
+            if low[u] == index[u]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    label[w] = n_comp
+                    if w == u:
+                        break
+                n_comp += 1
+            if work:
+                p = work[-1][0]
+                if low[u] < low[p]:
+                    low[p] = low[u]
+    return label
+
+
+def weak_components(graph: CSRGraph) -> np.ndarray:
+    """
+    Чиглэлийг үл тооцсон холбоост компонентууд; хамгийн том нь 0 label-тай.
+    """
+    n = graph.num_nodes
+    parent = list(range(n))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u in range(n):
+        for v, _ in graph.neighbors(u):
+            ru, rv = find(u), find(v)
+            if ru != rv:
+                parent[max(ru, rv)] = min(ru, rv)
+
+    roots = np.fromiter((find(x) for x in range(n)), dtype=np.int64, count=n)
+    uniq, inverse, counts = np.unique(roots, return_inverse=True, return_counts=True)
+    rank = np.empty(len(uniq), dtype=np.int32)
+    rank[np.argsort(-counts, kind="stable")] = np.arange(len(uniq), dtype=np.int32)
+    return rank[inverse]
+
+
+def label_components(graph: CSRGraph) -> CSRGraph:
+    """
+    scc/wcc label-уудыг графт нэмж, хамгийн том SCC-ийн label-ыг meta["main_scc"]-д бичнэ.
+    """
+    scc = strong_components(graph)
+    wcc = weak_components(graph)
+    arrays = graph.arrays()
+    arrays["scc"] = scc
+    arrays["wcc"] = wcc
+    meta = dict(graph.meta)
+    meta["main_scc"] = int(np.argmax(np.bincount(scc))) if len(scc) else -1
+    meta["num_scc"] = int(scc.max()) + 1 if len(scc) else 0
+    meta["num_wcc"] = int(wcc.max()) + 1 if len(wcc) else 0
+    return CSRGraph.from_arrays(arrays, meta=meta)
@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .csr import CSRGraph
+
+
+def _edge_keys(graph: CSRGraph) -> Optional[List[int]]:
+    """
+    Ирмэгийн бүх шинжийг нэг int болгоно; шинж өөр ирмэгүүдийг нэгтгэхгүй.
+    """
+    if graph.edge_fclass is None:
+        return None
+    key = (np.asarray(graph.edge_fclass, dtype=np.int64)
+           | (np.asarray(graph.edge_flags, dtype=np.int64) << 8)
+           | (np.asarray(graph.edge_maxspeed, dtype=np.int64) << 16)
+           | (np.asarray(graph.edge_name, dtype=np.int64) << 32))
+    return key.tolist()
+
+
+def _pass_through(out: List[Tuple[int, int]],
+                  inc: List[Tuple[int, int]],
+                  x: int,
+                  keys: Optional[List[int]]) -> bool:
+    """
+    x нь зөвхөн дамжих node эсэх: a <-> x <-> b (хоёр чиглэлтэй) эсвэл
+    a -> x -> b (нэг чиглэлтэй), a != b, өөр ирмэггүй, шинж нь ижил.
+    """
+    if keys is not None and len({keys[e] for _, e in out + inc}) > 1:
+        return False
+    out_nodes = [v for v, _ in out]
+    in_nodes = [u for u, _ in inc]
+    if len(out) == 2 and len(inc) == 2:
+        a, b = out_nodes
+        return a != b and x not in (a, b) and sorted(in_nodes) == sorted(out_nodes)
+    if len(out) == 1 and len(inc) == 1:
+        return out_nodes[0] != in_nodes[0] and x not in (out_nodes[0], in_nodes[0])
+    return False
+
+
+def contract_degree2(graph: CSRGraph) -> CSRGraph:
+    """
+    2 хөрштэй node-уудын гинжийг нэг ирмэг болгон шахна; завсрын цэгүүд geom_*-д үлдэнэ.
+    """
+    if graph.edge_geom is not None:
+        raise ValueError("Граф аль хэдийн шахагдсан байна.")
+
+    n = graph.num_nodes
+    offsets, targets, weights = graph.adjacency()
+    out_adj: List[List[Tuple[int, int]]] = [
+        [(targets[e], e) for e in range(offsets[u], offsets[u + 1])] for u in range(n)
+    ]
+    in_adj: List[List[Tuple[int, int]]] = [[] for _ in range(n)]
+    for u in range(n):
+        for v, e in out_adj[u]:
+            in_adj[v].append((u, e))
+
+    keys = _edge_keys(graph)
+    keep = [not _pass_through(out_adj[x], in_adj[x], x, keys) for x in range(n)]
+    visited = list(keep)
+
+    # s -> [(t, жин, геометр, эхний ирмэгийн индекс)]
+    out_edges: Dict[int, List[Tuple[int, float, int, int]]] = {}
+    geom_pts: List[int] = []
+    geom_offsets: List[int] = [0]
+    chain_geom: Dict[Tuple[int, int], int] = {}
+
+    def walk(s: int) -> None:
+        edges = out_edges.setdefault(s, [])
+        for x, first in out_adj[s]:
+            if keep[x]:
+                edges.append((x, weights[first], 0, first))
+                continue
+            interior: List[int] = []
+            prev, cur, total = s, x, weights[first]
+            while not keep[cur]:
+                visited[cur] = True
+                interior.append(cur)
+                nxt, e = next((v, e) for v, e in out_adj[cur] if v != prev)
+                prev, cur, total = cur, nxt, total + weights[e]
+            if cur == s:
+                continue  # гинж эхэндээ эргэж ирсэн (self-loop) – хэрэггүй
+
+            rev = chain_geom.get((cur, interior[-1]))
+            if rev is not None:
+                geom = -(rev + 1)
+            else:
+                gid = len(geom_offsets) - 1
+                geom_pts.extend(interior)
+                geom_offsets.append(len(geom_pts))
+                chain_geom[(s, interior[0])] = gid
+                geom = gid + 1
+            edges.append((cur, total, geom, first))
+
+    for s in range(n):
+        if keep[s]:
+            walk(s)
+    # Уулзваргүй цагираг: нэг node-ийг нь үлдээгээд түүнээс алхана.
+    for s in range(n):
+        if not visited[s]:
+            keep[s] = visited[s] = True
+            walk(s)
+
+    kept = np.flatnonzero(np.array(keep, dtype=bool))
+    new_id = np.full(n, -1, dtype=np.int64)
+    new_id[kept] = np.arange(len(kept))
+
+    offsets_out = np.zeros(len(kept) + 1, dtype=np.int64)
+    new_targets: List[int] = []
+    new_weights: List[float] = []
+    edge_geom: List[int] = []
+    source_edge: List[int] = []
+    for i, s in enumerate(kept.tolist()):
+        for t, w, geom, first in out_edges.get(s, []):
+            new_targets.append(int(new_id[t]))
+            new_weights.append(w)
+            edge_geom.append(geom)
+            source_edge.append(first)
+        offsets_out[i + 1] = len(new_targets)
+
+    pts = np.array(geom_pts, dtype=np.int64)
+    arrays = graph.arrays()
+    arrays.pop("open_weights", None)  # шахсан ирмэгийн жин доорх weights-ээс гарна
+    for name in CSRGraph.INDEX_ARRAYS:
+        arrays.pop(name, None)
+    for name in CSRGraph.NODE_ARRAYS:
+        if name in arrays:
+            arrays[name] = np.ascontiguousarray(np.asarray(arrays[name])[kept])
+    # Шинэ ирмэг гинжийнхээ эхний ирмэгийн шинжийг авна (гинжинд бүгд ижил).
+    source = np.array(source_edge, dtype=np.int64)
+    for name in CSRGraph.EDGE_ARRAYS:
+        if name in arrays:
+            arrays[name] = np.ascontiguousarray(np.asarray(arrays[name])[source])
+    arrays.update({
+        "offsets": offsets_out,
+        "targets": np.array(new_targets, dtype=np.int32),
+        "weights": np.array(new_weights, dtype=np.float64),
+        "orig_ids": (kept if graph.orig_ids is None
+                     else np.asarray(graph.orig_ids)[kept]).astype(np.int64),
+        "edge_geom": np.array(edge_geom, dtype=np.int32),
+        "geom_offsets": np.array(geom_offsets, dtype=np.int64),
+        "geom_lon": np.ascontiguousarray(graph.lon[pts]),
+        "geom_lat": np.ascontiguousarray(graph.lat[pts]),
+        "geom_ids": (pts if graph.orig_ids is None
+                     else np.asarray(graph.orig_ids)[pts]).astype(np.int64),
+    })
+    return CSRGraph.from_arrays(arrays, meta=graph.meta)
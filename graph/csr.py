@@ -0,0 +1,598 @@
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, TYPE_CHECKING
+import numpy as np
+
+from .attributes import encode_ways
+from .geo import haversine_m
+from .models import EdgeSnap, EdgeUpdate
+from .spatial import EdgeIndex, GridIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+if TYPE_CHECKING:
+    from .road_graph import RoadGraph
+
+T = TypeVar("T")
+logger = logging.getLogger(__name__)
+
+# Seqlock уншигч сондгой (бичигдэж буй) version-ийг хамгийн ихдээ ингэж хүлээнэ.
+READ_TIMEOUT_S = 2.0
+
+
+class _NodeView(Mapping):
+    """
+    `RoadGraph.nodes`-тэй ижил хэлбэрээр nid -> (lon, lat) буцаана.
+    """
+    def __init__(self, lon: np.ndarray, lat: np.ndarray) -> None:
+        self._lon = memoryview(lon)
+        self._lat = memoryview(lat)
+
+    def __getitem__(self, nid: int) -> Tuple[float, float]:
+        if not 0 <= nid < len(self._lon):
+            raise KeyError(nid)
+        return self._lon[nid], self._lat[nid]
+
+    def __contains__(self, nid: object) -> bool:
+        return isinstance(nid, (int, np.integer)) and 0 <= nid < len(self._lon)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self._lon)))
+
+    def __len__(self) -> int:
+        return len(self._lon)
+
+
+class CSRGraph:
+    """
+    RoadGraph-ийн хөлдөөсөн CSR хэлбэр: u-ийн ирмэгүүд targets/weights[offsets[u]:offsets[u + 1]].
+    Бүтэц нь өөрчлөгдөхгүй, зөвхөн жин (`update_edges`) шинэчлэгдэнэ.
+    """
+    ARRAYS = ("offsets", "targets", "weights", "lon", "lat",
+              "orig_ids", "edge_geom", "geom_offsets", "geom_lon", "geom_lat",
+              "geom_ids", "scc", "wcc",  # edge_geom: 0 шулуун, ±k = k-1 геометр (− бол урвуу)
+              "edge_fclass", "edge_flags", "edge_maxspeed", "edge_name",
+              "open_weights", "version",  # version: seqlock, сондгой үед бичиж байна
+              "grid_offsets", "grid_nodes", "grid_params",
+              "rev_offsets", "rev_sources", "rev_edges")
+    # Node/ирмэгийн дарааллаар эрэмбэлэгдсэн массивууд (renumber хийхэд хамт зөөгдөнө).
+    NODE_ARRAYS = ("lon", "lat", "orig_ids", "scc", "wcc")
+    EDGE_ARRAYS = ("targets", "weights", "edge_geom",
+                   "edge_fclass", "edge_flags", "edge_maxspeed", "edge_name",
+                   "open_weights")
+    # Node-ын id/координатаас хамаарсан index; renumber/шахалтын дараа дахин барина.
+    INDEX_ARRAYS = ("grid_offsets", "grid_nodes", "grid_params",
+                    "rev_offsets", "rev_sources", "rev_edges")
+
+    def __init__(self,
+                 offsets: np.ndarray,
+                 targets: np.ndarray,
+                 weights: np.ndarray,
+                 lon: np.ndarray,
+                 lat: np.ndarray,
+                 orig_ids: Optional[np.ndarray] = None,
+                 edge_geom: Optional[np.ndarray] = None,
+                 geom_offsets: Optional[np.ndarray] = None,
+                 geom_lon: Optional[np.ndarray] = None,
+                 geom_lat: Optional[np.ndarray] = None,
+                 geom_ids: Optional[np.ndarray] = None,
+                 scc: Optional[np.ndarray] = None,
+                 wcc: Optional[np.ndarray] = None,
+                 edge_fclass: Optional[np.ndarray] = None,
+                 edge_flags: Optional[np.ndarray] = None,
+                 edge_maxspeed: Optional[np.ndarray] = None,
+                 edge_name: Optional[np.ndarray] = None,
+                 open_weights: Optional[np.ndarray] = None,
+                 version: Optional[np.ndarray] = None,
+                 grid_offsets: Optional[np.ndarray] = None,
+                 grid_nodes: Optional[np.ndarray] = None,
+                 grid_params: Optional[np.ndarray] = None,
+                 rev_offsets: Optional[np.ndarray] = None,
+                 rev_sources: Optional[np.ndarray] = None,
+                 rev_edges: Optional[np.ndarray] = None,
+                 meta: Optional[Dict[str, Any]] = None) -> None:
+        if len(offsets) != len(lon) + 1 or len(lat) != len(lon):
+            raise ValueError("offsets/lon/lat хэмжээ таарахгүй байна.")
+        if len(targets) != len(weights) or offsets[-1] != len(targets):
+            raise ValueError("targets/weights хэмжээ таарахгүй байна.")
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.lon = lon
+        self.lat = lat
+        self.orig_ids = orig_ids
+        self.edge_geom = edge_geom
+        self.geom_offsets = geom_offsets
+        self.geom_lon = geom_lon
+        self.geom_lat = geom_lat
+        self.geom_ids = geom_ids
+        self.scc = scc
+        self.wcc = wcc
+        self.edge_fclass = edge_fclass
+        self.edge_flags = edge_flags
+        self.edge_maxspeed = edge_maxspeed
+        self.edge_name = edge_name
+        self.open_weights = open_weights
+        self.version_counter = version if version is not None else np.zeros(1, dtype=np.int64)
+        self.grid_offsets = grid_offsets
+        self.grid_nodes = grid_nodes
+        self.grid_params = grid_params
+        self.rev_offsets = rev_offsets
+        self.rev_sources = rev_sources
+        self.rev_edges = rev_edges
+        self._rev: Optional[Tuple[memoryview, memoryview, memoryview]] = None
+        self._grid: Optional[GridIndex] = None
+        self._write_lock = threading.Lock()
+        # Жин нь процессуудын дунд хуваалцагдах үед (shared memory) бичигчдийг
+        # процесс хооронд дараалуулах flock файл (`graph.shared.attach_shared`).
+        self.write_lock_path: Optional[str] = None
+        self._main_mask: Optional[memoryview] = None
+        self._edge_index: Dict[bool, EdgeIndex] = {}
+        self._lengths: Optional[np.ndarray] = None
+        self.meta: Dict[str, Any] = dict(meta or {})
+        # memoryview-ийн индекс нь numpy scalar биш энгийн int/float өгдөг тул
+        # Python давталт доторх хандалт хурдан байна.
+        self._off = memoryview(offsets)
+        self._tgt = memoryview(targets)
+        self._wgt = memoryview(weights)
+        self.nodes = _NodeView(lon, lat)
+
+    @classmethod
+    def from_road_graph(cls, graph: "RoadGraph") -> "CSRGraph":
+        n = len(graph.nodes)
+        if any(nid not in graph.nodes for nid in range(n)):
+            raise ValueError("CSR-д node id-ууд 0..n-1 дараалсан байх ёстой.")
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        for nid in range(n):
+            offsets[nid + 1] = len(graph.adj[nid])
+        np.cumsum(offsets, out=offsets)
+
+        m = int(offsets[-1])
+        targets = np.fromiter((e.target for nid in range(n) for e in graph.adj[nid]),
+                              dtype=np.int32, count=m)
+        weights = np.fromiter((e.weight for nid in range(n) for e in graph.adj[nid]),
+                              dtype=np.float64, count=m)
+
+        lon = np.fromiter((graph.nodes[nid][0] for nid in range(n)),
+                          dtype=np.float64, count=n)
+        lat = np.fromiter((graph.nodes[nid][1] for nid in range(n)),
+                          dtype=np.float64, count=n)
+        extra: Dict[str, Any] = {}
+        if any(e.open_weight is not None for nid in range(n) for e in graph.adj[nid]):
+            extra["open_weights"] = np.fromiter(
+                (e.weight if e.open_weight is None else e.open_weight
+                 for nid in range(n) for e in graph.adj[nid]),
+                dtype=np.float64, count=m)
+        meta = dict(graph.meta)
+        if not graph.ways:
+            return cls(offsets, targets, weights, lon, lat, meta=meta, **extra)
+
+        edge_way = np.fromiter((e.way for nid in range(n) for e in graph.adj[nid]),
+                               dtype=np.int64, count=m)
+        way_arrays, names = encode_ways(graph.ways)
+        # way=-1 нь encode_ways-ийн нэмсэн сүүлийн (хоосон) мөрийг заана.
+        extra.update({name: arr[edge_way] for name, arr in way_arrays.items()})
+        meta["edge_names"] = names
+        return cls(offsets, targets, weights, lon, lat, meta=meta, **extra)
+
+    @classmethod
+    def from_arrays(cls,
+                    arrays: Dict[str, np.ndarray],
+                    meta: Optional[Dict[str, Any]] = None) -> "CSRGraph":
+        return cls(**{name: arrays[name] for name in cls.ARRAYS if name in arrays},
+                   meta=meta)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Snapshot болон shared memory-д хадгалах бүх массив (нэр -> массив).
+        """
+        arrays = {name: getattr(self, name) for name in self.ARRAYS
+                  if name != "version" and getattr(self, name) is not None}
+        arrays["version"] = self.version_counter
+        return arrays
+
+    @property
+    def version(self) -> int:
+        """
+        Жин өөрчлөгдөх бүрт 2-оор өсөнө; кэшүүд үүгээр хүчингүй болно.
+        """
+        return int(self.version_counter[0])
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.lon)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays().values())
+
+    def adjacency(self) -> Tuple[memoryview, memoryview, memoryview]:
+        """
+        Хайлтын дотоод давталтад зориулсан (offsets, targets, weights).
+        """
+        return self._off, self._tgt, self._wgt
+
+    def neighbors(self, u: int) -> Iterator[Tuple[int, float]]:
+        a, b = self._off[u], self._off[u + 1]
+        return zip(self._tgt[a:b], self._wgt[a:b])
+
+    def build_reverse(self) -> "CSRGraph":
+        """
+        rev_* массивуудыг (дахин) барина; snapshot/shared memory-д хамт хадгалагдана.
+        """
+        n = self.num_nodes
+        targets = np.asarray(self.targets)
+        sources = np.repeat(np.arange(n, dtype=np.int32), np.diff(np.asarray(self.offsets)))
+        order = np.argsort(targets, kind="stable")
+        self.rev_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=n), out=self.rev_offsets[1:])
+        self.rev_sources = sources[order]
+        self.rev_edges = order.astype(np.int64)
+        self._rev = None
+        return self
+
+    def reverse_adjacency(self) -> Tuple[memoryview, memoryview, memoryview]:
+        """
+        (rev_offsets, rev_sources, rev_edges); урвуу хайлтын жин нь
+        weights[rev_edges[i]] тул `update_edges` хоёр чиглэлд шууд харагдана.
+        """
+        if self._rev is None:
+            if self.rev_offsets is None:
+                self.build_reverse()
+            self._rev = (memoryview(self.rev_offsets), memoryview(self.rev_sources),
+                         memoryview(self.rev_edges))
+        return self._rev
+
+    def reverse_neighbors(self, v: int) -> Iterator[Tuple[int, float]]:
+        """
+        v руу орж ирэх ирмэгүүд: (эх node, жин).
+        """
+        rev_off, rev_src, rev_edge = self.reverse_adjacency()
+        a, b = rev_off[v], rev_off[v + 1]
+        return zip(rev_src[a:b], map(self._wgt.__getitem__, rev_edge[a:b]))
+
+    def edge_indices(self, u: int, v: int) -> List[int]:
+        return [i for i in range(self._off[u], self._off[u + 1]) if self._tgt[i] == v]
+
+    def _make_writable(self) -> None:
+        # mmap snapshot-ын массивууд read-only тул анхны бичилтэд хувийн хуулбар
+        # үүсгэнэ. Shared memory-д эдгээр нь бичигдэх боломжтой тул бүх worker харна.
+        if self.open_weights is None:
+            self.open_weights = np.array(self.weights)
+        elif not self.open_weights.flags.writeable:
+            self.open_weights = np.array(self.open_weights)
+        if not self.weights.flags.writeable:
+            self.weights = np.array(self.weights)
+            self._wgt = memoryview(self.weights)
+        if not self.version_counter.flags.writeable:
+            self.version_counter = np.array(self.version_counter)
+
+    @contextmanager
+    def _writer(self) -> Iterator[None]:
+        """
+        Нэг л бичигч: процесс дотор threading.Lock, write_lock_path байвал
+        процесс хооронд fcntl.flock.
+        """
+        with self._write_lock:
+            if self.write_lock_path is None or fcntl is None:
+                yield
+                return
+            with open(self.write_lock_path, "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def update_edges(self, updates: Iterable[EdgeUpdate]) -> int:
+        """
+        Ирмэгүүдийг хааж/нээж, жинг нь байран дээр нь өөрчилнө (нөлөөлөх ирмэгийн
+        тоотой пропорциональ). Бүх багц нэг seqlock бичилт дотор хийгдэх тул
+        `read_consistent`-ээр ажиллаж буй хайлт хагас шинэчлэлтийг харахгүй.
+        """
+        inf = float("inf")
+        plan: List[Tuple[int, EdgeUpdate]] = []
+        for upd in updates:
+            pairs = [(upd.u, upd.v), (upd.v, upd.u)] if upd.both_directions else [(upd.u, upd.v)]
+            for a, b in pairs:
+                plan.extend((e, upd) for e in self.edge_indices(a, b))
+
+        with self._writer():
+            self._make_writable()
+            try:
+                if self.version_counter[0] % 2:
+                    # Өмнөх бичигч дундуураа унасан (flock нь суларсан ч version сондгой).
+                    logger.warning("Граф version=%d сондгой байна; шинэчлэлтээр сэргээнэ.",
+                                   self.version)
+                else:
+                    self.version_counter[0] += 1
+                for e, upd in plan:
+                    if upd.weight is not None:
+                        self.open_weights[e] = upd.weight
+                    if upd.closed is not None:
+                        closed = upd.closed
+                    else:
+                        closed = self.weights[e] == inf
+                    self.weights[e] = inf if closed else self.open_weights[e]
+            finally:
+                self.version_counter[0] += self.version_counter[0] % 2
+        return len(plan)
+
+    def read_consistent(self, fn: Callable[[], T]) -> T:
+        """
+        fn()-ийг жингийн нэг ч өөрчлөлттэй давхцаагүй үед ажиллуулж буцаана
+        (seqlock уншигч; давхцвал дахин ажиллуулна). Version READ_TIMEOUT_S-ээс
+        удаан сондгой байвал TimeoutError.
+        """
+        stuck, since = -1, 0.0
+        while True:
+            before = self.version
+            if before % 2 == 0:
+                result = fn()
+                if self.version == before:
+                    return result
+            elif before != stuck:
+                stuck, since = before, time.monotonic()
+            elif time.monotonic() - since > READ_TIMEOUT_S:
+                logger.error("Граф version=%d дээр гацсан (бичигч унасан уу?).", before)
+                raise TimeoutError(f"Жингийн шинэчлэлт дуусаагүй байна (version={before}).")
+            time.sleep(0)
+
+    def original_ids(self, node_path: List[int]) -> List[int]:
+        """
+        CSR node-уудын замыг loader-ийн (RoadGraph-ийн) анхны id-уудын зам болгоно;
+        шахагдсан node-ууд ирмэгийн геометрээс (geom_ids) буцаж орно.
+        """
+        out: List[int] = []
+        for i, u in enumerate(node_path):
+            out.append(int(u) if self.orig_ids is None else int(self.orig_ids[u]))
+            if i + 1 < len(node_path) and self.edge_geom is not None:
+                e = self.edge_between(u, node_path[i + 1])
+                if e != -1:
+                    out.extend(self.edge_ids(e))
+        return out
+
+    def snapped_original_ids(self, src: EdgeSnap, dst: EdgeSnap,
+                             node_path: List[int]) -> List[int]:
+        """
+        `snapped_path_coords`-ийн адил: snap цэгээс node хүртэлх хэсгүүдийн
+        шахагдсан node-уудыг ч оруулна.
+        """
+        if not node_path:
+            return self._piece_ids(src, src.t, dst.t)
+        head = self._piece_ids(src, src.t, 0.0 if node_path[0] == src.a else 1.0)
+        tail = self._piece_ids(dst, 0.0 if node_path[-1] == dst.a else 1.0, dst.t)
+        return head + self.original_ids(node_path) + tail
+
+    def _piece_ids(self, snap: EdgeSnap, t0: float, t1: float) -> List[int]:
+        ids: List[int] = []
+        if snap.geom:
+            for (u, v), flip in (((snap.a, snap.b), False), ((snap.b, snap.a), True)):
+                e = next((e for e in self.edge_indices(u, v)
+                          if abs(int(self.edge_geom[e])) == snap.geom), None)
+                if e is not None:
+                    ids = self.edge_ids(e)[::-1] if flip else self.edge_ids(e)
+                    break
+        lo, hi = min(t0, t1), max(t0, t1)
+        inner = [nid for nid, st in zip(ids, snap.stations[1:-1]) if lo < st < hi]
+        return inner if t0 <= t1 else inner[::-1]
+
+    def edge_between(self, u: int, v: int) -> int:
+        """
+        u -> v ирмэгүүдээс хамгийн бага жинтэйн индекс (байхгүй бол -1).
+        """
+        best, best_w = -1, float("inf")
+        for i in range(self._off[u], self._off[u + 1]):
+            if self._tgt[i] == v and self._wgt[i] < best_w:
+                best, best_w = i, self._wgt[i]
+        return best
+
+    def edge_coords(self, e: int) -> List[Tuple[float, float]]:
+        """
+        Ирмэгийн завсрын цэгүүд (төгсгөлийн node-уудыг оруулахгүй).
+        """
+        if self.edge_geom is None or self.edge_geom[e] == 0:
+            return []
+        g = int(self.edge_geom[e])
+        k = abs(g) - 1
+        a, b = int(self.geom_offsets[k]), int(self.geom_offsets[k + 1])
+        pts = list(zip(self.geom_lon[a:b].tolist(), self.geom_lat[a:b].tolist()))
+        return pts if g > 0 else pts[::-1]
+
+    def edge_ids(self, e: int) -> List[int]:
+        """
+        Ирмэгийн завсрын (шахагдсан) node-уудын анхны id, ирмэгийн чиглэлээр.
+        """
+        if self.geom_ids is None or self.edge_geom is None or self.edge_geom[e] == 0:
+            return []
+        g = int(self.edge_geom[e])
+        k = abs(g) - 1
+        ids = np.asarray(self.geom_ids)[int(self.geom_offsets[k]):int(self.geom_offsets[k + 1])]
+        return ids.tolist() if g > 0 else ids[::-1].tolist()
+
+    def edge_lengths(self) -> np.ndarray:
+        """
+        Ирмэг бүрийн геометрийн (завсрын цэгүүдтэй нь) их тойргийн урт, м.
+        Жингээс хамаарахгүй тул admin шинэчлэлтийн дараа ч өөрчлөгдөхгүй.
+        """
+        if self._lengths is None:
+            src = np.repeat(np.arange(self.num_nodes), np.diff(np.asarray(self.offsets)))
+            dst = np.asarray(self.targets)
+            lon, lat = np.asarray(self.lon), np.asarray(self.lat)
+            lengths = haversine_m(lon[src], lat[src], lon[dst], lat[dst])
+            if self.edge_geom is not None and self.geom_lon is not None and len(self.geom_lon):
+                geom = np.asarray(self.edge_geom)
+                goff = np.asarray(self.geom_offsets)
+                glon, glat = np.asarray(self.geom_lon), np.asarray(self.geom_lat)
+                # Дараалсан цэгүүдийн зайн хуримтлал; геометрийн заагийг давсан хосыг хасна.
+                seg = haversine_m(glon[:-1], glat[:-1], glon[1:], glat[1:])
+                bounds = goff[1:-1] - 1
+                seg[bounds[bounds >= 0]] = 0.0
+                cum = np.concatenate([[0.0], np.cumsum(seg)])
+                e = np.flatnonzero(geom)
+                k = np.abs(geom[e]) - 1
+                first, last = goff[k], goff[k + 1] - 1
+                keep = last >= first
+                e, k, first, last = e[keep], k[keep], first[keep], last[keep]
+                forward = geom[e] > 0
+                head = np.where(forward, first, last)
+                tail = np.where(forward, last, first)
+                lengths[e] = (haversine_m(lon[src[e]], lat[src[e]], glon[head], glat[head])
+                              + cum[last] - cum[first]
+                              + haversine_m(glon[tail], glat[tail], lon[dst[e]], lat[dst[e]]))
+            self._lengths = lengths
+        return self._lengths
+
+    def path_coords(self, node_path: List[int]) -> List[Tuple[float, float]]:
+        """
+        Node-уудын замыг шахагдсан ирмэгүүдийн геометртэй нь бүрэн polyline болгоно.
+        """
+        coords: List[Tuple[float, float]] = []
+        for i, u in enumerate(node_path):
+            coords.append(self.nodes[u])
+            if i + 1 < len(node_path) and self.edge_geom is not None:
+                e = self.edge_between(u, node_path[i + 1])
+                if e != -1:
+                    coords.extend(self.edge_coords(e))
+        return coords
+
+    def may_reach(self, u: int, v: int) -> bool:
+        """
+        False бол u -> v зам байхгүй нь гарцаатай (O(1)). True бол хайлт хэрэгтэй.
+        """
+        if self.scc is None:
+            return True
+        su, sv = self.scc[u], self.scc[v]
+        if su == sv:
+            return True
+        if self.wcc is not None and self.wcc[u] != self.wcc[v]:
+            return False
+        # Tarjan-ий label: u -> v зам байвал scc[u] > scc[v].
+        return bool(su > sv)
+
+    def build_spatial_index(self) -> "CSRGraph":
+        """
+        grid_* массивуудыг (дахин) барина; snapshot/shared memory-д хамт хадгалагдана.
+        """
+        self._grid = GridIndex.build(self.lon, self.lat)
+        for name, arr in self._grid.arrays().items():
+            setattr(self, name, arr)
+        return self
+
+    @property
+    def spatial_index(self) -> GridIndex:
+        """
+        Хадгалсан grid_* массиваас, байхгүй бол санах ойд барьсан `GridIndex`.
+        """
+        if self._grid is None:
+            if self.grid_offsets is None:
+                self._grid = GridIndex.build(self.lon, self.lat)
+            else:
+                self._grid = GridIndex(self.grid_offsets, self.grid_nodes, self.grid_params,
+                                       self.lon, self.lat)
+        return self._grid
+
+    def _snap_mask(self, main_component: bool) -> Optional[memoryview]:
+        if not main_component or self.scc is None:
+            return None
+        if self._main_mask is None:
+            self._main_mask = memoryview(np.asarray(self.scc) == self.meta.get("main_scc", 0))
+        return self._main_mask
+
+    def nearest_node(self, lon: float, lat: float, main_component: bool = False,
+                     max_dist_m: Optional[float] = None) -> int:
+        """
+        Хамгийн ойр node (spatial index-ээр). main_component=True үед зөвхөн
+        хамгийн том SCC-ийн node руу snap хийнэ; max_dist_m дотор node
+        байхгүй (сүлжээнээс хол дарсан) бол -1.
+        """
+        return self.spatial_index.nearest(lon, lat, mask=self._snap_mask(main_component),
+                                          max_dist_m=max_dist_m)
+
+    def nearest_nodes(self, lons: np.ndarray, lats: np.ndarray, main_component: bool = False,
+                      max_dist_m: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        `nearest_node`-ийн векторчилсан хувилбар (GPS цэгүүдийг багцаар snap
+        хийхэд): (node-ууд, зай_м) массивууд, олдоогүй цэгт -1 ба inf.
+        """
+        return self.spatial_index.nearest_many(lons, lats, mask=self._snap_mask(main_component),
+                                               max_dist_m=max_dist_m)
+
+    def k_nearest(self, lon: float, lat: float, k: int, main_component: bool = False,
+                  max_dist_m: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Хамгийн ойр k node, [(node, зай_м)] ойроос нь.
+        """
+        return self.spatial_index.k_nearest(lon, lat, k, mask=self._snap_mask(main_component),
+                                            max_dist_m=max_dist_m)
+
+    def nodes_within(self, lon: float, lat: float, radius_m: float,
+                     main_component: bool = False) -> List[Tuple[int, float]]:
+        """
+        radius_m метрийн доторх node-ууд, [(node, зай_м)] ойроос нь.
+        """
+        return self.spatial_index.within(lon, lat, radius_m, mask=self._snap_mask(main_component))
+
+    def edge_index(self, main_component: bool = False) -> EdgeIndex:
+        """
+        Ирмэгүүдийн R-tree; анх хэрэглэхэд барина (shapely геометр тул
+        snapshot-д хадгалагдахгүй).
+        """
+        if main_component not in self._edge_index:
+            mask = self._snap_mask(main_component)
+            self._edge_index[main_component] = EdgeIndex.build(
+                self, self.spatial_index.kx,
+                node_mask=None if mask is None else np.asarray(mask, dtype=bool))
+        return self._edge_index[main_component]
+
+    def snap_to_edge(self, lon: float, lat: float, main_component: bool = False,
+                     max_dist_m: Optional[float] = None) -> Optional[EdgeSnap]:
+        """
+        Цэгийг хамгийн ойр ирмэг дээр проекцлоно (node биш). main_component=True
+        үед хоёр үзүүр нь хамгийн том SCC-д орсон ирмэгүүд л. Хоёр чиглэлдээ
+        хаалттай ирмэгийг алгасна; олдохгүй бол None.
+        """
+        inf = float("inf")
+        return self.edge_index(main_component).nearest(
+            lon, lat, max_dist_m=max_dist_m,
+            usable=lambda a, b, geom: self._piece_weights(a, b, geom) != (inf, inf))
+
+    def _piece_weights(self, a: int, b: int, geom: int) -> Tuple[float, float]:
+        weights = []
+        for u, v in ((a, b), (b, a)):
+            best = float("inf")
+            for e in self.edge_indices(u, v):
+                g = 0 if self.edge_geom is None else abs(int(self.edge_geom[e]))
+                if g == geom and self._wgt[e] < best:
+                    best = self._wgt[e]
+            weights.append(best)
+        return weights[0], weights[1]
+
+    def snap_weights(self, snap: EdgeSnap) -> Tuple[float, float]:
+        """
+        Snap хийсэн ирмэгийн a -> b ба b -> a чиглэлийн одоогийн жин
+        (тэр чиглэлд явах боломжгүй эсвэл хаалттай бол inf).
+        """
+        return self._piece_weights(snap.a, snap.b, snap.geom)
+
+    def snapped_path_coords(self, src: EdgeSnap, dst: EdgeSnap,
+                            node_path: List[int]) -> List[Tuple[float, float]]:
+        """
+        `dijkstra_snapped`-ийн замыг snap цэгүүдээс эхэлж дуусах polyline болгоно.
+        """
+        if not node_path:  # нэг ирмэг дээр шууд
+            return src.part(src.t, dst.t)
+        head = src.part(src.t, 0.0 if node_path[0] == src.a else 1.0)
+        tail = dst.part(0.0 if node_path[-1] == dst.a else 1.0, dst.t)
+        return head[:-1] + self.path_coords(node_path) + tail[1:]
@@ -0,0 +1,15 @@
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8  # дэлхийн дундаж радиус (IUGG)
+
+
+def haversine_m(lon1, lat1, lon2, lat2) -> np.ndarray:
+    """
+    Хоёр цэгийн (градус) хоорондох их тойргийн зай, метрээр. Массив өгвөл
+    бүх хосыг нэг NumPy дамжлагаар бодно.
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(a, dtype=np.float64))
+                              for a in (lon1, lat1, lon2, lat2))
+    a = (np.sin((lat2 - lat1) * 0.5) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2)
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
@@ -0,0 +1,54 @@
+"""
+Замын давхаргыг .parquet (GeoParquet) эсвэл .fgb (FlatGeobuf) руу нэг удаа хөрвүүлнэ.
+
+    python -m graph.io.convert data/gis_osm_roads_free_1.shp data/roads.parquet
+"""
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pyogrio
+
+from .geoparquet import is_geoparquet, write_geoparquet
+from .loader import ORDER_COLUMN, WAY_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+def convert(src: str, dst: str, all_columns: bool = False) -> None:
+    info = pyogrio.read_info(src)
+    fields = info["fields"].tolist()
+    columns = None if all_columns else [col for col in WAY_COLUMNS if col in fields]
+    gdf = pyogrio.read_dataframe(src, columns=columns)
+    if is_geoparquet(dst):
+        write_geoparquet(gdf, dst)
+    elif dst.lower().endswith(".fgb"):
+        # Spatial index feature-уудыг орон зайгаар эрэмбэлдэг тул эх дарааллыг
+        # ORDER_COLUMN-д хадгална; geometry-гүй мөрүүд index-д орж чадахгүй
+        # (граф барихад ч ашиглагддаггүй).
+        gdf[ORDER_COLUMN] = np.arange(len(gdf), dtype=np.int64)
+        gdf = gdf[~(gdf.geometry.isna() | gdf.geometry.is_empty)]
+        pyogrio.write_dataframe(gdf, dst, driver="FlatGeobuf", SPATIAL_INDEX="YES")
+    else:
+        raise ValueError(f"Гаралтын формат танигдсангүй (.parquet эсвэл .fgb): {dst}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замын давхаргыг GeoParquet/FlatGeobuf руу хөрвүүлнэ.")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--all-columns", action="store_true",
+                        help="бүх атрибут баганыг хадгална")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    t0 = time.perf_counter()
+    convert(args.src, args.dst, all_columns=args.all_columns)
+    logger.info("%s -> %s (%.1f MiB, %.2f s)", args.src, args.dst,
+                os.path.getsize(args.dst) / 2**20, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import json
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+import geopandas as gpd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import shapely
+
+PARQUET_EXTENSIONS = (".parquet", ".geoparquet")
+ROW_GROUP_SIZE = 50_000
+
+
+def is_geoparquet(path: str) -> bool:
+    return path.lower().endswith(PARQUET_EXTENSIONS)
+
+
+def geo_metadata(path: str) -> Tuple[str, Dict[str, Any], Sequence[str]]:
+    """
+    GeoParquet файлын (үндсэн geometry багана, түүний "geo" metadata,
+    бүх баганын нэр)-ийг буцаана.
+    """
+    schema = pq.read_schema(path)
+    raw = (schema.metadata or {}).get(b"geo")
+    if raw is None:
+        raise ValueError(f"GeoParquet metadata алга: {path}")
+    geo = json.loads(raw)
+    primary = geo["primary_column"]
+    column = geo["columns"][primary]
+    if column.get("encoding", "WKB").upper() != "WKB":
+        raise ValueError(f"Зөвхөн WKB encoding дэмжинэ: {column['encoding']}")
+    return primary, column, schema.names
+
+
+def iter_geoparquet(path: str,
+                    chunk_size: int,
+                    columns: Sequence[str],
+                    bbox: Optional[Tuple[float, float, float, float]] = None) -> Iterator[gpd.GeoDataFrame]:
+    """
+    GeoParquet-ийг pyarrow-оор багцлан уншина; covering bbox байвал decode-оос өмнө шүүнэ.
+    """
+    primary, column, names = geo_metadata(path)
+    crs = column.get("crs", "OGC:CRS84")
+    wanted = [col for col in columns if col in names]
+
+    expr = None
+    covering = column.get("covering", {}).get("bbox")
+    if bbox is not None and covering is not None:
+        minx, miny, maxx, maxy = bbox
+        field = {key: pc.field(*covering[key]) for key in ("xmin", "ymin", "xmax", "ymax")}
+        expr = ((field["xmin"] <= maxx) & (field["xmax"] >= minx)
+                & (field["ymin"] <= maxy) & (field["ymax"] >= miny))
+
+    dataset = ds.dataset(path, format="parquet")
+    for batch in dataset.to_batches(columns=wanted + [primary], filter=expr,
+                                    batch_size=chunk_size):
+        if batch.num_rows == 0:
+            continue
+        geoms = shapely.from_wkb(batch.column(primary).to_numpy(zero_copy_only=False))
+        frame = batch.select(wanted).to_pandas()
+        yield gpd.GeoDataFrame(frame, geometry=gpd.GeoSeries(geoms, crs=crs))
+
+
+def write_geoparquet(gdf: gpd.GeoDataFrame, path: str) -> None:
+    """
+    bbox шүүлтэд зориулж covering bbox багана, ROW_GROUP_SIZE-тай бичнэ.
+    """
+    gdf.to_parquet(path, index=False, write_covering_bbox=True, row_group_size=ROW_GROUP_SIZE)
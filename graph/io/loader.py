@@ -1,59 +1,616 @@
-from typing import Dict, Tuple, List
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 import geopandas as gpd
-from shapely.geometry import LineString, MultiLineString
+import numpy as np
+import pyogrio
+import pyproj
+import shapely
+from ..attributes import ONEWAY_BACKWARD, ONEWAY_FORWARD, encode_way_columns
+from ..csr import CSRGraph
+from ..geo import haversine_m
+from ..models import EdgeCleanupReport, LoadReport, peak_rss_mb
 from ..road_graph import RoadGraph
+from .geoparquet import is_geoparquet, iter_geoparquet
 
-def load_graph_from_shapefile(shp_path: str,
-                              reproject_to_meters: bool = False) -> RoadGraph:
-    gdf = gpd.read_file(shp_path)
-    if reproject_to_meters:
-        gdf = gdf.to_crs(epsg=3857)
+EXCLUDED_ACCESS = ("no", "private")
+EXCLUDED_FCLASS = ("footway", "path", "track", "pedestrian", "steps", "cycleway")
 
-    graph = RoadGraph()
-    coord_to_id: Dict[Tuple[float, float], int] = {}
-
-    def get_node_id(lon: float, lat: float) -> int:
-        key = (round(lon, 6), round(lat, 6))
-        if key not in coord_to_id:
-            nid = len(coord_to_id)
-            coord_to_id[key] = nid
-            graph.add_node(nid, lon, lat)
-        return coord_to_id[key]
-
-    for _, row in gdf.iterrows():
-        geom = row.geometry
-        access = row.get("access", None)
-        fclass = row.get("fclass", None)
-        oneway = row.get("oneway", "no")
-
-        if access in ("no", "private"):
-            continue
-        if fclass in ("footway", "path", "track", "pedestrian", "steps", "cycleway"):
-            continue
-        if geom is None:
-            continue
-
-        if isinstance(geom, LineString):
-            lines = [geom]
-        elif isinstance(geom, MultiLineString):
-            lines = list(geom)
-        else:
-            continue
+WAY_COLUMNS = ("fclass", "oneway", "access", "maxspeed", "name")
+DEFAULT_CHUNK_SIZE = 50_000
+WEIGHT_MODES = ("haversine", "average")
+ORDER_COLUMN = "src_order"  # хөрвүүлсэн файл дахь feature-ийн эх дараалал
+
+Bbox = Tuple[float, float, float, float]  # (minx, miny, maxx, maxy)
+
+_LINESTRING = 1
+_MULTILINESTRING = 5
+_WIDE_KEY = np.dtype([("x", np.int64), ("y", np.int64)])
+
+
+@dataclass
+class EdgeList:
+    """
+    Loader-ийн гаргасан чиглэлтэй ирмэгүүд (add_edge-ийн дарааллаар) ба
+    node-уудын координат. ways[col][i] нь i дугаар way-ийн түүхий утга.
+    """
+    lon: np.ndarray
+    lat: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    weight: np.ndarray
+    way: np.ndarray
+    ways: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def num_ways(self) -> int:
+        return len(self.ways["fclass"]) if self.ways else 0
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _as_str(values: np.ndarray) -> np.ndarray:
+    return np.array([v if isinstance(v, str) else None for v in values], dtype=object)
+
+
+def _round6(coords: np.ndarray) -> np.ndarray:
+    """
+    round(x, 6) * 1e6-тай яг ижил бүхэл тоонууд. x * 1e6-ийн үржвэрийн алдаа
+    хагаст ойрхон утгын дугуйрлыг өөрчилдөг тул тэдгээрийг round()-оор дахин бодно.
+    """
+    scaled = coords * 1e6
+    q = np.rint(scaled)
+    near = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) <= 2 * np.spacing(np.abs(scaled))
+    for i in zip(*np.nonzero(near)):
+        q[i] = round(round(float(coords[i]), 6) * 1e6)
+    return q.astype(np.int64)
+
+
+def _pack_keys(q: np.ndarray) -> np.ndarray:
+    return (q[:, 0] << 32) | (q[:, 1] & 0xFFFFFFFF)
+
+
+def _wide_keys(q: np.ndarray) -> np.ndarray:
+    wide = np.empty(len(q), dtype=_WIDE_KEY)
+    wide["x"], wide["y"] = q[:, 0], q[:, 1]
+    return wide
+
+
+class NodeIndex:
+    """
+    (round(lon, 6), round(lat, 6))-тай ижил түлхүүрээр node-уудыг нэгтгэнэ.
+    Координатыг хэсэг хэсгээр нь өгч болно; node id-ууд нийт дарааллаар
+    анх гарсан эрэмбээрээ олгогддог тул нэг дор өгсөнтэй ижил үр дүн гарна.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.int64)  # эрэмбэлэгдсэн түлхүүрүүд
+        self.ids = np.empty(0, dtype=np.int64)
+        self.wide = False
+        self._lon: List[np.ndarray] = []
+        self._lat: List[np.ndarray] = []
+        self.count = 0
 
-        for line in lines:
-            coords = list(line.coords)
-            if len(coords) < 2:
-                continue
+    def _keys_of(self, coords: np.ndarray) -> np.ndarray:
+        q = _round6(coords)
+        if not self.wide and len(q) and np.abs(q).max() >= (1 << 31):
+            # Метрийн (EPSG:3857) координат нэг int64-д багтахгүй тул хоёр
+            # талбартай түлхүүр рүү шилжинэ (удаан ч зөв).
+            known = np.stack([self.keys >> 32, (self.keys << 32) >> 32], axis=1)
+            order = np.argsort(_wide_keys(known), kind="stable")
+            self.keys, self.ids = _wide_keys(known)[order], self.ids[order]
+            self.wide = True
+        return _wide_keys(q) if self.wide else _pack_keys(q)
+
+    def assign(self, coords: np.ndarray) -> np.ndarray:
+        """
+        coords (N x 2)-ийн мөр бүрийн node id-г буцаана, шинэ node-уудыг бүртгэнэ.
+        """
+        uniq, first, inverse = np.unique(self._keys_of(coords),
+                                         return_index=True, return_inverse=True)
+        pos = np.searchsorted(self.keys, uniq)
+        found = pos < len(self.keys)
+        found[found] = self.keys[pos[found]] == uniq[found]
+
+        node = np.empty(len(uniq), dtype=np.int64)
+        node[found] = self.ids[pos[found]]
+        new = np.flatnonzero(~found)
+        new = new[np.argsort(first[new], kind="stable")]
+        node[new] = np.arange(self.count, self.count + len(new))
+        self.count += len(new)
+        self._lon.append(coords[first[new], 0])
+        self._lat.append(coords[first[new], 1])
+
+        added = np.sort(new)
+        self.keys = np.insert(self.keys, pos[added], uniq[added])
+        self.ids = np.insert(self.ids, pos[added], node[added])
+        return node[inverse.ravel()]
+
+    def coords(self) -> Tuple[np.ndarray, np.ndarray]:
+        lon = np.concatenate(self._lon) if self._lon else np.empty(0)
+        lat = np.concatenate(self._lat) if self._lat else np.empty(0)
+        return np.ascontiguousarray(lon, dtype=np.float64), np.ascontiguousarray(lat, dtype=np.float64)
+
+
+def edge_list_from_frame(gdf: gpd.GeoDataFrame,
+                         excluded_fclass: Iterable[str] = EXCLUDED_FCLASS,
+                         excluded_access: Iterable[str] = EXCLUDED_ACCESS,
+                         weights: str = "haversine",
+                         reproject_to_meters: bool = False,
+                         report: Optional[LoadReport] = None) -> EdgeList:
+    """
+    GeoDataFrame-ийг векторжсэн дуудлагуудаар ирмэгийн жагсаалт болгоно.
+    weights: "haversine" (сегмент бүрийн метр) эсвэл "average" (хуучин градусын дундаж).
+    """
+    if weights not in WEIGHT_MODES:
+        raise ValueError(f"weights буруу байна: {weights}")
+    geographic = gdf.crs is None or gdf.crs.is_geographic
+    if weights == "haversine" and not geographic:
+        raise ValueError("haversine жин lon/lat (газарзүйн) CRS шаардана.")
+    report = report if report is not None else LoadReport()
+    n_rows = len(gdf)
+    report.features += n_rows
+
+    def column(name: str, default=None) -> np.ndarray:
+        if name in gdf.columns:
+            return gdf[name].to_numpy(dtype=object)
+        return np.full(n_rows, default, dtype=object)
+
+    with report.stage("filter"):
+        geoms = gdf.geometry.to_numpy()
+        type_id = shapely.get_type_id(geoms)
+        keep = (type_id == _LINESTRING) | (type_id == _MULTILINESTRING)
+        if "access" in gdf.columns:
+            keep &= ~gdf["access"].isin(list(excluded_access)).to_numpy()
+        if "fclass" in gdf.columns:
+            keep &= ~gdf["fclass"].isin(list(excluded_fclass)).to_numpy()
+        rows = np.flatnonzero(keep)
+
+        oneway = np.array([str(v) for v in column("oneway", "no")[rows]], dtype=object)
+        ways = {
+            "fclass": _as_str(column("fclass")[rows]),
+            "oneway": oneway,
+            "access": _as_str(column("access")[rows]),
+            "maxspeed": np.array([_to_int(v) for v in column("maxspeed", 0)[rows]], dtype=np.int64),
+            "name": _as_str(column("name")[rows]),
+        }
+        ow = np.array([s.strip().lower() for s in oneway], dtype=object)
+        direction = np.where(np.isin(ow, ONEWAY_FORWARD), 1,
+                             np.where(np.isin(ow, ONEWAY_BACKWARD), -1, 0))
+
+    with report.stage("coords"):
+        parts, part_way = shapely.get_parts(geoms[rows], return_index=True)
+        coords, coord_part = shapely.get_coordinates(parts, return_index=True)
+        counts = np.bincount(coord_part, minlength=len(parts))
+        source = coords
+        if reproject_to_meters:
+            transformer = pyproj.Transformer.from_crs(gdf.crs, 3857, always_xy=True)
+            coords = np.column_stack(transformer.transform(coords[:, 0], coords[:, 1]))
+        if weights == "average":
             if reproject_to_meters:
-                seg_len = line.length / (len(coords) - 1)
-            else:
-                seg_len = line.length / (len(coords) - 1)
+                parts = shapely.set_coordinates(parts, coords)
+            part_weight = shapely.length(parts) / np.maximum(counts - 1, 1)
+
+        # Ганц цэгтэй хэсгүүд ирмэг ч, node ч үүсгэхгүй.
+        valid = (counts >= 2)[coord_part]
+        coords, coord_part, source = coords[valid], coord_part[valid], source[valid]
+
+    with report.stage("dedup"):
+        nodes = NodeIndex()
+        node_of = nodes.assign(coords)
+
+    with report.stage("edges"):
+        seg = np.flatnonzero(coord_part[:-1] == coord_part[1:])
+        if weights == "haversine":
+            seg_weight = haversine_m(source[seg, 0], source[seg, 1],
+                                     source[seg + 1, 0], source[seg + 1, 1])
+        else:
+            seg_weight = part_weight[coord_part[seg]]
+        u, v = node_of[seg], node_of[seg + 1]
+        seg_part = coord_part[seg]
+        seg_way = part_way[seg_part]
+        seg_dir = direction[seg_way]
+
+        # add_edge-ийн дараалал: хоёр чиглэлтэй бол (u, v), (v, u); эсрэг бол (v, u).
+        per_seg = np.where(seg_dir == 0, 2, 1)
+        rep = np.repeat(np.arange(len(seg)), per_seg)
+        second = np.zeros(len(rep), dtype=bool)
+        second[1:] = rep[1:] == rep[:-1]
+        flip = second | (seg_dir[rep] == -1)
+        report.segments += len(seg)
+
+        lon, lat = nodes.coords()
+        return EdgeList(lon=lon, lat=lat,
+                        src=np.where(flip, v[rep], u[rep]),
+                        dst=np.where(flip, u[rep], v[rep]),
+                        weight=seg_weight[rep],
+                        way=seg_way[rep],
+                        ways=ways)
+
+
+class EdgeListBuilder:
+    """
+    Багц бүрийн (локал node id-тай) ирмэгийн жагсаалтыг дарааллаар нь нэгтгэж,
+    node-уудад нийтийн id олгоно. Багцуудыг ямар ч хэмжээгээр хуваасан,
+    аль процесст барьсан ч нэг дор барьсантай ижил үр дүн гарна.
+    """
+
+    def __init__(self,
+                 excluded_fclass: Iterable[str] = EXCLUDED_FCLASS,
+                 excluded_access: Iterable[str] = EXCLUDED_ACCESS,
+                 weights: str = "haversine",
+                 reproject_to_meters: bool = False,
+                 report: Optional[LoadReport] = None):
+        self.report = report if report is not None else LoadReport()
+        self.excluded_fclass = tuple(excluded_fclass)
+        self.excluded_access = tuple(excluded_access)
+        self.weights = weights
+        self.reproject_to_meters = reproject_to_meters
+        self.nodes = NodeIndex()
+        self.num_ways = 0
+        self._parts: Dict[str, List[np.ndarray]] = {
+            name: [] for name in ("src", "dst", "weight", "way") + WAY_COLUMNS}
+
+    def add(self, edges: EdgeList) -> None:
+        with self.report.stage("merge"):
+            # Локал node-ууд анх гарсан дарааллаараа байгаа тул нийт дараалал хадгалагдана.
+            node = self.nodes.assign(np.column_stack([edges.lon, edges.lat]))
+            self._parts["src"].append(node[edges.src])
+            self._parts["dst"].append(node[edges.dst])
+            self._parts["weight"].append(edges.weight)
+            self._parts["way"].append(edges.way + self.num_ways)
+            for col in WAY_COLUMNS:
+                self._parts[col].append(edges.ways[col])
+            self.num_ways += edges.num_ways
 
-            for i in range(len(coords) - 1):
-                x1, y1 = coords[i]
-                x2, y2 = coords[i + 1]
-                u = get_node_id(x1, y1)
-                v = get_node_id(x2, y2)
-                graph.add_edge(u, v, seg_len, oneway=str(oneway))
+    def add_frame(self, gdf: gpd.GeoDataFrame) -> None:
+        self.add(edge_list_from_frame(gdf, self.excluded_fclass, self.excluded_access,
+                                      self.weights, self.reproject_to_meters, self.report))
 
+    def build(self) -> EdgeList:
+        def joined(name: str, dtype) -> np.ndarray:
+            chunks = self._parts[name]
+            return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+        lon, lat = self.nodes.coords()
+        self.report.nodes = len(lon)
+        self.report.edges = sum(len(chunk) for chunk in self._parts["src"])
+        return EdgeList(lon=lon, lat=lat,
+                        src=joined("src", np.int64),
+                        dst=joined("dst", np.int64),
+                        weight=joined("weight", np.float64),
+                        way=joined("way", np.int64),
+                        ways={col: joined(col, np.int64 if col == "maxspeed" else object)
+                              for col in WAY_COLUMNS})
+
+
+def _read_columns(path: str, columns: Sequence[str],
+                  filtered: bool = False) -> Tuple[List[str], int, bool]:
+    """
+    Давхаргад байгаа `columns` баганууд, feature-ийн тоо (filtered=True
+    буюу орон зайн шүүлттэй үед тоо урьдчилан мэдэгдэхгүй тул -1) ба
+    ORDER_COLUMN багана байгаа эсэх.
+    """
+    info = pyogrio.read_info(path)
+    fields = set(info["fields"].tolist())
+    total = -1 if filtered else int(info["features"])
+    return [col for col in columns if col in fields], total, ORDER_COLUMN in fields
+
+
+def _source_order(path: str,
+                  bbox: Optional[Bbox],
+                  mask: Optional[shapely.Geometry]) -> np.ndarray:
+    """
+    Spatial index-тэй FlatGeobuf feature-уудаа орон зайн дарааллаар хадгалдаг.
+    Хөрвүүлэхдээ бичсэн ORDER_COLUMN-аар эх дарааллыг сэргээж, (шүүлттэй
+    бол шүүгдсэн) feature-уудын FID-г тэр дарааллаар буцаана.
+    """
+    order = pyogrio.read_dataframe(path, columns=[ORDER_COLUMN], read_geometry=False,
+                                   bbox=bbox, mask=mask, fid_as_index=True)
+    rank = np.argsort(order[ORDER_COLUMN].to_numpy(), kind="stable")
+    return order.index.to_numpy()[rank]
+
+
+def _filtered_fids(path: str,
+                   bbox: Optional[Bbox],
+                   mask: Optional[shapely.Geometry]) -> np.ndarray:
+    """
+    bbox/mask-д орох feature-уудын FID, файлын дарааллаар (нэг шүүлтийн
+    дамжлага; цонхнууд дахин шүүлгүй FID-ээр уншина).
+    """
+    found = pyogrio.read_dataframe(path, columns=[], read_geometry=False,
+                                   bbox=bbox, mask=mask, fid_as_index=True)
+    return np.sort(found.index.to_numpy())
+
+
+def clip_lines(gdf: gpd.GeoDataFrame, region: shapely.Geometry) -> gpd.GeoDataFrame:
+    """
+    Шугамуудыг `region`-оор огтолно. Огтлолоос гарсан цэг зэрэг шугам биш
+    хэсгүүд хаягдаж, мөр бүр LineString/MultiLineString хэвээр үлдэнэ.
+    """
+    geoms = shapely.intersection(gdf.geometry.to_numpy(), region)
+    type_id = shapely.get_type_id(geoms)
+    mixed = np.flatnonzero((type_id != _LINESTRING) & (type_id != _MULTILINESTRING))
+    if len(mixed):
+        parts, row = shapely.get_parts(geoms[mixed], return_index=True)
+        lines = np.isin(shapely.get_type_id(parts), (_LINESTRING, _MULTILINESTRING))
+        parts, row = shapely.get_parts(parts[lines]), row[lines]
+        merged = np.full(len(mixed), None, dtype=object)
+        if len(parts):
+            present = np.unique(row)
+            merged[present] = shapely.multilinestrings(parts, indices=np.searchsorted(present, row))
+        geoms[mixed] = merged
+    gdf = gdf.copy()
+    gdf.geometry = geoms
+    return gdf
+
+
+def _read_frame(path: str,
+                columns: Optional[Sequence[str]],
+                bbox: Optional[Bbox],
+                mask: Optional[shapely.Geometry],
+                clip: bool,
+                **window) -> gpd.GeoDataFrame:
+    """
+    bbox/mask шүүлтийг pyogrio-д дамжуулж уншина; clip=True үед шугамыг хилээр огтолно.
+    """
+    pushdown = {} if "fids" in window else {"bbox": bbox, "mask": mask}
+    gdf = pyogrio.read_dataframe(path, columns=columns, **pushdown, **window)
+    if clip and (bbox is not None or mask is not None):
+        gdf = clip_lines(gdf, mask if mask is not None else shapely.box(*bbox))
+    return gdf
+
+
+def _geoparquet_frames(path: str,
+                       chunk_size: int,
+                       bbox: Optional[Bbox],
+                       mask: Optional[shapely.Geometry],
+                       clip: bool) -> Iterator[gpd.GeoDataFrame]:
+    """
+    GeoParquet-ийн багцууд; bbox (mask-ийн хувьд түүний хүрээ) covering bbox
+    баганаар урьдчилан шүүгдэж, дараа нь geometry-гээр нь нарийвчилна.
+    """
+    region = mask if mask is not None else (None if bbox is None else shapely.box(*bbox))
+    prefilter = mask.bounds if mask is not None else bbox
+    for gdf in iter_geoparquet(path, chunk_size, WAY_COLUMNS, bbox=prefilter):
+        if region is not None:
+            gdf = gdf[shapely.intersects(gdf.geometry.to_numpy(), region)]
+            if clip:
+                gdf = clip_lines(gdf, region)
+        yield gdf
+
+
+def _window_edge_list(task: Tuple[str, Dict[str, Any], List[str], Optional[Bbox],
+                                  Optional[shapely.Geometry], bool, Tuple[str, ...],
+                                  Tuple[str, ...], str, bool]) -> Tuple[EdgeList, LoadReport]:
+    """
+    Процессын pool-ын ажил: нэг цонхны (skip_features/max_features эсвэл
+    fids) feature-уудыг уншиж, локал node id-тай ирмэгийн жагсаалт болгоно.
+    """
+    path, window, columns, bbox, mask, clip, *options = task
+    report = LoadReport()
+    with report.stage("read"):
+        gdf = _read_frame(path, columns, bbox, mask, clip, **window)
+    return edge_list_from_frame(gdf, *options, report=report), report
+
+
+def _add_frames(builder: "EdgeListBuilder", frames: Iterable[gpd.GeoDataFrame]) -> None:
+    frames = iter(frames)
+    while True:
+        with builder.report.stage("read"):
+            gdf = next(frames, None)
+        if gdf is None:
+            return
+        builder.add_frame(gdf)
+
+
+def iter_frames(path: str,
+                chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+                columns: Sequence[str] = WAY_COLUMNS,
+                bbox: Optional[Bbox] = None,
+                mask: Optional[shapely.Geometry] = None,
+                clip: bool = False) -> Iterator[gpd.GeoDataFrame]:
+    """
+    Давхаргыг chunk_size feature-ийн цонхоор (None бол нэг дор) уншина; bbox/mask
+    өгвөл нэг удаа шүүсэн FID-уудыг цонхлоно.
+    """
+    filtered = bbox is not None or mask is not None
+    wanted, total, _ = _read_columns(path, columns, filtered=filtered)
+    if chunk_size is None:
+        yield _read_frame(path, wanted, bbox, mask, clip)
+        return
+    if filtered:
+        fids = _filtered_fids(path, bbox, mask)
+        for i in range(0, len(fids), chunk_size):
+            yield _read_frame(path, wanted, bbox, mask, clip, fids=fids[i:i + chunk_size])
+        return
+    skip = 0
+    while total < 0 or skip < total:
+        frame = _read_frame(path, wanted, bbox, mask, clip,
+                            skip_features=skip, max_features=chunk_size)
+        if len(frame) == 0:
+            break
+        yield frame
+        skip += len(frame)
+
+
+def load_edge_list(shp_path: str,
+                   reproject_to_meters: bool = False,
+                   excluded_fclass: Iterable[str] = EXCLUDED_FCLASS,
+                   excluded_access: Iterable[str] = EXCLUDED_ACCESS,
+                   chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+                   workers: int = 1,
+                   bbox: Optional[Bbox] = None,
+                   mask: Optional[shapely.Geometry] = None,
+                   clip: bool = False,
+                   weights: str = "haversine",
+                   report: Optional[LoadReport] = None) -> EdgeList:
+    """
+    Давхаргыг багцлан (workers > 1 бол процессуудад) уншиж ирмэгийн жагсаалт барина;
+    аль ч горимд үр дүн ижил. bbox/mask нь бүсийн шүүлт, .parquet бол GeoParquet.
+    """
+    if bbox is not None and mask is not None:
+        raise ValueError("bbox, mask хоёрын зөвхөн нэгийг өгнө.")
+    report = report if report is not None else LoadReport()
+    t0 = time.perf_counter()
+    builder = EdgeListBuilder(excluded_fclass, excluded_access, weights, reproject_to_meters,
+                              report)
+    _fill(builder, shp_path, chunk_size, workers, bbox, mask, clip)
+    edges = builder.build()
+    report.seconds += time.perf_counter() - t0
+    report.peak_rss_mb = max(report.peak_rss_mb, peak_rss_mb())
+    return edges
+
+
+def _fill(builder: EdgeListBuilder,
+          path: str,
+          chunk_size: Optional[int],
+          workers: int,
+          bbox: Optional[Bbox],
+          mask: Optional[shapely.Geometry],
+          clip: bool) -> None:
+    filtered = bbox is not None or mask is not None
+    if is_geoparquet(path):
+        _add_frames(builder, _geoparquet_frames(path, chunk_size or DEFAULT_CHUNK_SIZE,
+                                                bbox, mask, clip))
+        return
+    columns, total, ordered = _read_columns(path, WAY_COLUMNS, filtered=filtered)
+    windows: Optional[List[Dict[str, Any]]] = None
+    if ordered or filtered:
+        fids = _source_order(path, bbox, mask) if ordered else _filtered_fids(path, bbox, mask)
+        step = chunk_size or max(1, min(DEFAULT_CHUNK_SIZE, -(-len(fids) // workers)))
+        windows = [{"fids": fids[i:i + step]} for i in range(0, len(fids), step)]
+    elif workers > 1 and total >= 0:
+        step = chunk_size or max(1, min(DEFAULT_CHUNK_SIZE, -(-total // workers)))
+        windows = [{"skip_features": skip, "max_features": step}
+                   for skip in range(0, total, step)]
+    if windows is not None:
+        tasks = [(path, window, columns, bbox, mask, clip, builder.excluded_fclass,
+                  builder.excluded_access, builder.weights, builder.reproject_to_meters)
+                 for window in windows]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(_window_edge_list, tasks)
+                for edges, report in results:
+                    builder.add(edges)
+                    builder.report.merge(report)
+        else:
+            for task in tasks:
+                edges, report = _window_edge_list(task)
+                builder.add(edges)
+                builder.report.merge(report)
+        return
+    if workers > 1:
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE  # тоо үл мэдэгдэх үед
+
+    _add_frames(builder, iter_frames(path, chunk_size, bbox=bbox, mask=mask, clip=clip))
+
+
+def edges_to_road_graph(edges: EdgeList) -> RoadGraph:
+    graph = RoadGraph()
+    for nid, (lon, lat) in enumerate(zip(edges.lon.tolist(), edges.lat.tolist())):
+        graph.add_node(nid, lon, lat)
+    for i in range(edges.num_ways):
+        graph.add_way(**{col: edges.ways[col][i] for col in WAY_COLUMNS})
+    for u, v, w, way in zip(edges.src.tolist(), edges.dst.tolist(),
+                            edges.weight.tolist(), edges.way.tolist()):
+        graph.add_edge(u, v, w, oneway="yes", way=way)
+    return graph
+
+
+def edges_to_csr(edges: EdgeList,
+                 remove_redundant: bool = True) -> Tuple[CSRGraph, EdgeCleanupReport]:
+    """
+    RoadGraph-ийг алгасаж ирмэгийн жагсаалтаас шууд CSR барина. Үр дүн нь
+    edges_to_road_graph(...) [+ remove_redundant_edges()] + freeze()-тэй ижил.
+    """
+    n = len(edges.lon)
+    src, dst, weight, way = edges.src, edges.dst, edges.weight, edges.way
+    report = EdgeCleanupReport()
+
+    if remove_redundant:
+        loops = src == dst
+        report.self_loops = int(loops.sum())
+        idx = np.flatnonzero(~loops)
+        pair = src[idx] * n + dst[idx]
+        # (u, v) хос бүрээс хамгийн бага жинтэйг (тэнцвэл эртнийг) сонгож,
+        # хосын анх гарсан байранд нь үлдээнэ (remove_redundant_edges-тэй адил).
+        _, first_pos, group = np.unique(pair, return_index=True, return_inverse=True)
+        group = group.ravel()
+        order = np.lexsort((np.arange(len(idx)), weight[idx], group))
+        head = np.ones(len(order), dtype=bool)
+        head[1:] = group[order][1:] != group[order][:-1]
+        best = np.empty(len(first_pos), dtype=np.int64)
+        best[group[order][head]] = order[head]
+        report.parallel = len(idx) - len(first_pos)
+
+        by_position = np.argsort(first_pos, kind="stable")
+        position = idx[first_pos[by_position]]
+        chosen = idx[best[by_position]]
+        src, dst = src[position], dst[position]
+        weight, way = weight[chosen], way[chosen]
+
+    order = np.argsort(src, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+    extra: Dict[str, np.ndarray] = {}
+    meta: Dict[str, List[str]] = {}
+    if edges.ways:
+        way_arrays, names = encode_way_columns(*(edges.ways[col] for col in WAY_COLUMNS))
+        extra = {name: arr[way[order]] for name, arr in way_arrays.items()}
+        meta = {"edge_names": names}
+    graph = CSRGraph(offsets,
+                     dst[order].astype(np.int32),
+                     np.ascontiguousarray(weight[order], dtype=np.float64),
+                     edges.lon, edges.lat, meta=meta, **extra)
+    return graph, report
+
+
+def load_graph_from_shapefile(shp_path: str,
+                              reproject_to_meters: bool = False,
+                              excluded_fclass: Iterable[str] = EXCLUDED_FCLASS,
+                              excluded_access: Iterable[str] = EXCLUDED_ACCESS,
+                              chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+                              workers: int = 1,
+                              bbox: Optional[Bbox] = None,
+                              mask: Optional[shapely.Geometry] = None,
+                              clip: bool = False,
+                              weights: str = "haversine") -> RoadGraph:
+    graph = edges_to_road_graph(load_edge_list(shp_path,
+                                               reproject_to_meters=reproject_to_meters,
+                                               excluded_fclass=excluded_fclass,
+                                               excluded_access=excluded_access,
+                                               chunk_size=chunk_size,
+                                               workers=workers,
+                                               bbox=bbox,
+                                               mask=mask,
+                                               clip=clip,
+                                               weights=weights))
+    # A* (`is_metric`) жингийн нэгжийг эндээс мэднэ.
+    graph.meta["options"] = {"weights": weights,
+                             "reproject_to_meters": bool(reproject_to_meters)}
     return graph
+
+
+def load_graph_from_geoparquet(path: str, **options) -> RoadGraph:
+    """
+    GeoParquet (WKB)-ээс граф; тохиргоо нь `load_graph_from_shapefile`-тай ижил.
+    """
+    if not is_geoparquet(path):
+        raise ValueError(f"GeoParquet файл биш: {path}")
+    return load_graph_from_shapefile(path, **options)
+
+
+def load_graph_from_flatgeobuf(path: str, **options) -> RoadGraph:
+    """
+    FlatGeobuf-аас граф; bbox/mask шүүлтэд файлын spatial index ашиглагдана.
+    """
+    if not path.lower().endswith(".fgb"):
+        raise ValueError(f"FlatGeobuf файл биш: {path}")
+    return load_graph_from_shapefile(path, **options)
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, Optional, Tuple
+import numpy as np
+import shapely
+from ..components import label_components
+from ..contract import contract_degree2
+from ..csr import CSRGraph
+from ..models import LoadReport
+from ..reorder import bfs_order, hilbert_order, renumber
+from .loader import (
+    DEFAULT_CHUNK_SIZE,
+    Bbox,
+    EXCLUDED_ACCESS,
+    EXCLUDED_FCLASS,
+    edges_to_csr,
+    load_edge_list,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "roadgraph-csr"
+# CSRGraph.ARRAYS өөрчлөгдөх бүрт нэмэгдүүлнэ (cache-ийн түлхүүрт орно).
+SNAPSHOT_VERSION = 5
+SHAPEFILE_PARTS = (".shp", ".shx", ".dbf", ".prj", ".cpg")
+
+
+def save_array_dir(path: str, arrays: Dict[str, np.ndarray], meta: Dict[str, Any],
+                   prefix: str = ".arrays-") -> None:
+    """
+    Массивуудыг `path` хавтаст .npy файлууд, meta-г (массивуудын dtype/shape-тай
+    хамт) meta.json болгож хадгална. Эхлээд prefix-тэй түр хавтаст бичээд дараа
+    нь rename хийдэг тул хагас бичигдсэн хавтас үлдэхгүй.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=prefix, dir=parent)
+    try:
+        for name, arr in arrays.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(arr))
+        meta = dict(meta, arrays={name: {"dtype": arr.dtype.str, "shape": list(arr.shape)}
+                                  for name, arr in arrays.items()})
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def load_array_dir(path: str, names: Optional[Iterable[str]], fmt: str, version: int,
+                   mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    `save_array_dir`-ийн хавтсыг ачаална: (массивууд, meta.json). names=None
+    үед meta.json-д бүртгэгдсэн бүх массив. Формат/хувилбар таарахгүй бол ValueError.
+    """
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != fmt or meta.get("version") != version:
+        raise ValueError(f"{fmt} хувилбар таарахгүй байна: {path}")
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+              for name in (meta["arrays"] if names is None else names)}
+    return arrays, meta
+
+
+def save_snapshot(graph: CSRGraph, path: str) -> None:
+    """
+    CSR графыг `path` хавтаст .npy файлууд + meta.json болгож хадгална (`save_array_dir`).
+    """
+    save_array_dir(path, graph.arrays(),
+                   {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION, "graph": graph.meta},
+                   prefix=".snapshot-")
+
+
+def load_snapshot(path: str, mmap: bool = True) -> CSRGraph:
+    """
+    Snapshot-ыг ачаална. mmap=True үед массивууд read-only mmap байна.
+    """
+    arrays, meta = load_array_dir(path, None, SNAPSHOT_FORMAT, SNAPSHOT_VERSION, mmap)
+    # Index-гүй snapshot-ыг worker бүр санах ойдоо дахин барих тул хүлээж авахгүй.
+    missing = [name for name in CSRGraph.INDEX_ARRAYS if name not in arrays]
+    if missing:
+        raise ValueError(f"Snapshot-д index массив дутуу байна ({', '.join(missing)}): {path}")
+    return CSRGraph.from_arrays(arrays, meta=meta.get("graph"))
+
+
+def source_fingerprint(shp_path: str, options: Dict[str, Any]) -> str:
+    """
+    Эх файлын агуулгын hash (shapefile бол .dbf/.shx/... хамт) + loader-ийн тохиргоо.
+    """
+    h = hashlib.sha256()
+    h.update(f"{SNAPSHOT_FORMAT}:{SNAPSHOT_VERSION}\n".encode())
+    h.update(json.dumps(options, sort_keys=True).encode())
+    stem, ext = os.path.splitext(shp_path)
+    parts = SHAPEFILE_PARTS if ext.lower() == ".shp" else (ext,)
+    for ext in parts:
+        part = stem + ext
+        if not os.path.exists(part):
+            continue
+        h.update(ext.encode())
+        with open(part, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def load_graph_cached(shp_path: str,
+                      cache_dir: Optional[str] = None,
+                      reproject_to_meters: bool = False,
+                      excluded_fclass: Iterable[str] = EXCLUDED_FCLASS,
+                      excluded_access: Iterable[str] = EXCLUDED_ACCESS,
+                      contract: bool = True,
+                      remove_redundant: bool = True,
+                      reorder: str = "hilbert",
+                      chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+                      workers: int = 1,
+                      bbox: Optional[Bbox] = None,
+                      mask: Optional[shapely.Geometry] = None,
+                      clip: bool = False,
+                      weights: str = "haversine",
+                      report: Optional[LoadReport] = None) -> CSRGraph:
+    """
+    Shapefile, тохиргоо өөрчлөгдөөгүй бол snapshot-ыг mmap-аар ачаална, эс бөгөөс
+    дахин барьж хадгална. chunk_size/workers үр дүнд нөлөөлөхгүй тул key-д орохгүй.
+    """
+    report = report if report is not None else LoadReport()
+    if reorder not in ("hilbert", "bfs", "none"):
+        raise ValueError(f"reorder буруу байна: {reorder}")
+    excluded_fclass = tuple(excluded_fclass)
+    excluded_access = tuple(excluded_access)
+    options = {
+        "reproject_to_meters": bool(reproject_to_meters),
+        "excluded_fclass": sorted(excluded_fclass),
+        "excluded_access": sorted(excluded_access),
+        "contract": bool(contract),
+        "remove_redundant": bool(remove_redundant),
+        "reorder": reorder,
+        "bbox": None if bbox is None else [float(v) for v in bbox],
+        "mask": None if mask is None else hashlib.sha256(shapely.to_wkb(mask)).hexdigest(),
+        "clip": bool(clip),
+        "weights": weights,
+    }
+    key = source_fingerprint(shp_path, options)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(shp_path)), ".graph_cache")
+    stem, ext = os.path.splitext(os.path.basename(shp_path))
+    if ext.lower() != ".shp":
+        stem += ext  # roads.parquet, roads.fgb-ийн snapshot-ууд бие биенээ устгахгүй
+    path = os.path.join(cache_dir, f"{stem}-{key[:16]}")
+
+    if os.path.isdir(path):
+        try:
+            with report.stage("snapshot"):
+                graph = load_snapshot(path)
+            if graph.meta.get("key") == key:
+                report.nodes, report.edges = graph.num_nodes, graph.num_edges
+                logger.info("Graph snapshot ачааллаа: %s | %s", path, report.summary())
+                return graph
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Snapshot уншиж чадсангүй (%s), дахин барина.", exc)
+
+    logger.info("Graph snapshot олдсонгүй, shapefile-с барьж байна: %s", shp_path)
+    edges = load_edge_list(shp_path,
+                           reproject_to_meters=reproject_to_meters,
+                           excluded_fclass=excluded_fclass,
+                           excluded_access=excluded_access,
+                           chunk_size=chunk_size,
+                           workers=workers,
+                           bbox=bbox,
+                           mask=mask,
+                           clip=clip,
+                           weights=weights,
+                           report=report)
+    with report.stage("csr"):
+        graph, cleanup = edges_to_csr(edges, remove_redundant=remove_redundant)
+    del edges
+    if remove_redundant:
+        logger.info("Илүүдэл ирмэг хаслаа: %d (self-loop=%d, давхар=%d)",
+                    cleanup.removed, cleanup.self_loops, cleanup.parallel)
+    if contract:
+        with report.stage("contract"):
+            graph = contract_degree2(graph)
+    if reorder != "none":
+        with report.stage("reorder"):
+            order = (hilbert_order(graph.lon, graph.lat) if reorder == "hilbert"
+                     else bfs_order(graph))
+            graph = renumber(graph, order)
+    with report.stage("components"):
+        graph = label_components(graph)
+    with report.stage("spatial"):
+        graph.build_spatial_index()
+    with report.stage("reverse"):
+        graph.build_reverse()
+    report.nodes, report.edges = graph.num_nodes, graph.num_edges
+    graph.meta.update({"key": key, "source": os.path.basename(shp_path), "options": options,
+                       "load_report": report.as_dict()})
+    with report.stage("save"):
+        save_snapshot(graph, path)
+    logger.info("Graph барилаа: %s", report.summary())
+
+    # Ижил shapefile-ийн хуучин snapshot-уудыг цэвэрлэнэ.
+    for name in os.listdir(cache_dir):
+        old = os.path.join(cache_dir, name)
+        if (name.startswith(f"{stem}-") and len(name) == len(stem) + 17
+                and old != path and os.path.isdir(old)):
+            shutil.rmtree(old, ignore_errors=True)
+
+    return load_snapshot(path)
@@ -1,7 +1,153 @@
 # graph/models.py
-from dataclasses import dataclass
+import bisect
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 @dataclass
 class Edge:
     target: int
     weight: float
+    way: int = -1
+    open_weight: Optional[float] = None  # хаалттай үед (weight = inf) анхны жин
+
+@dataclass
+class Way:
+    fclass: Optional[str] = None
+    oneway: str = "no"
+    access: Optional[str] = None
+    maxspeed: int = 0
+    name: Optional[str] = None
+
+@dataclass
+class EdgeCleanupReport:
+    self_loops: int = 0
+    parallel: int = 0
+
+    @property
+    def removed(self) -> int:
+        return self.self_loops + self.parallel
+
+@dataclass
+class EdgeUpdate:
+    """
+    u -> v ирмэгийн шинэчлэлт: weight өгвөл жинг солино, closed=True/False
+    бол хаана/нээнэ. both_directions=True үед v -> u-д мөн адил.
+    """
+    u: int
+    v: int
+    weight: Optional[float] = None
+    closed: Optional[bool] = None
+    both_directions: bool = False
+
+@dataclass
+class EdgeSnap:
+    """
+    a -> b (a < b) ирмэгийн t (0..1) хэсэгт snap хийсэн цэг; geom нь |edge_geom| (0 = шулуун),
+    coords/stations нь a -> b polyline ба оройнуудын t.
+    """
+    a: int
+    b: int
+    geom: int
+    t: float
+    lon: float
+    lat: float
+    dist_m: float
+    coords: List[Tuple[float, float]] = field(default_factory=list, repr=False)
+    stations: List[float] = field(default_factory=list, repr=False)
+
+    def point_at(self, t: float) -> Tuple[float, float]:
+        i = min(max(bisect.bisect_right(self.stations, t), 1), len(self.stations) - 1)
+        t0, t1 = self.stations[i - 1], self.stations[i]
+        f = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+        (x0, y0), (x1, y1) = self.coords[i - 1], self.coords[i]
+        return x0 + (x1 - x0) * f, y0 + (y1 - y0) * f
+
+    def part(self, t0: float, t1: float) -> List[Tuple[float, float]]:
+        """
+        Polyline-ийн t0-оос t1 хүртэлх хэсэг (t1 < t0 бол эсрэг чиглэлд).
+        """
+        lo, hi = min(t0, t1), max(t0, t1)
+        inner = [pt for pt, st in zip(self.coords, self.stations) if lo < st < hi]
+        coords = [self.point_at(lo)] + inner + [self.point_at(hi)]
+        return coords if t0 <= t1 else coords[::-1]
+
+@dataclass
+class SearchStats:
+    """
+    Хайлтын ажлын хэмжээ: settled = дарааллаас эцэслэн гаргасан node,
+    pushed = дараалалд нэмсэн бичлэг.
+    """
+    settled: int = 0
+    pushed: int = 0
+
+
+def peak_rss_mb() -> float:
+    """
+    Процесс болон түүний (дууссан) дэд процессуудын оргил RSS, MiB.
+    """
+    if resource is None:
+        return 0.0
+    unit = 1 if sys.platform == "darwin" else 1024  # macOS: байт, Linux: KiB
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak * unit / 2**20
+
+
+@dataclass
+class LoadReport:
+    """
+    Граф ачааллын үе шат бүрийн хугацаа (сек), оргил RSS ба тоолуурууд.
+    seconds нь ирмэгийн жагсаалт барих (уншихаас merge хүртэлх) нийт
+    хугацаа; зэрэг барих үед stages нь процессуудын хугацааны нийлбэр.
+    """
+    stages: Dict[str, float] = field(default_factory=dict)
+    seconds: float = 0.0
+    features: int = 0
+    segments: int = 0
+    nodes: int = 0
+    edges: int = 0
+    peak_rss_mb: float = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t0
+            self.peak_rss_mb = max(self.peak_rss_mb, peak_rss_mb())
+
+    def merge(self, other: "LoadReport") -> None:
+        for name, sec in other.stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + sec
+        self.features += other.features
+        self.segments += other.segments
+        self.peak_rss_mb = max(self.peak_rss_mb, other.peak_rss_mb)
+
+    @property
+    def features_per_sec(self) -> float:
+        return self.features / self.seconds if self.seconds else 0.0
+
+    @property
+    def segments_per_sec(self) -> float:
+        return self.segments / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.update(features_per_sec=self.features_per_sec,
+                    segments_per_sec=self.segments_per_sec)
+        return data
+
+    def summary(self) -> str:
+        stages = " ".join(f"{name}={sec:.2f}s" for name, sec in self.stages.items())
+        return (f"{stages} | features={self.features} ({self.features_per_sec:,.0f}/s) "
+                f"segments={self.segments} ({self.segments_per_sec:,.0f}/s) "
+                f"nodes={self.nodes} edges={self.edges} | peak RSS={self.peak_rss_mb:.0f} MiB")
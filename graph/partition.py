@@ -0,0 +1,174 @@
+# graph/partition.py
+"""
+Inertial flow хуваалт: min-cut-аар давтан хоёр хувааж, nested олон level-ийн cell үүсгэнэ.
+"""
+import math
+from collections import deque
+from typing import Dict, List, Tuple
+import numpy as np
+from .csr import CSRGraph
+
+CELL_SIZE = 256
+# Level бүрд cell 2^FANOUT_BITS дэд cell-тэй.
+FANOUT_BITS = 3
+INERTIAL_DIRECTIONS = 4
+INERTIAL_BALANCE = 0.25
+
+
+def _min_cut(n: int, a: np.ndarray, b: np.ndarray,
+             source: np.ndarray, sink: np.ndarray) -> Tuple[int, np.ndarray]:
+    """
+    Чиглэлгүй нэгж багтаамжтай ирмэгүүд (a[i], b[i]) дээр source-уудаас
+    sink-үүд рүү Dinic max-flow. (зүсэлтийн хэмжээ, эх талын mask) буцаана.
+    """
+    m = len(a)
+    heads = np.empty(2 * m, dtype=np.int64)
+    tails = np.empty(2 * m, dtype=np.int64)
+    heads[0::2], heads[1::2] = b, a
+    tails[0::2], tails[1::2] = a, b
+    arcs_arr = np.argsort(tails, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tails, minlength=n), out=offsets[1:])
+    arcs, head, off = arcs_arr.tolist(), heads.tolist(), offsets.tolist()
+    cap = [1] * (2 * m)
+    is_source, is_sink = source.tolist(), sink.tolist()
+    starts = np.flatnonzero(source).tolist()
+    flow = 0
+    while True:
+        level = [-1] * n
+        for s in starts:
+            level[s] = 0
+        queue = deque(starts)
+        reached = False
+        while queue:
+            u = queue.popleft()
+            if is_sink[u]:
+                reached = True
+                continue
+            for k in range(off[u], off[u + 1]):
+                i = arcs[k]
+                v = head[i]
+                if cap[i] > 0 and level[v] == -1:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        if not reached:
+            return flow, np.asarray(level) != -1
+        ptr = off[:-1]
+        for s in starts:
+            while True:
+                nodes, path = [s], []
+                while nodes:
+                    u = nodes[-1]
+                    if is_sink[u]:
+                        break
+                    while ptr[u] < off[u + 1]:
+                        i = arcs[ptr[u]]
+                        v = head[i]
+                        if cap[i] > 0 and level[v] == level[u] + 1 and not is_source[v]:
+                            nodes.append(v)
+                            path.append(i)
+                            break
+                        ptr[u] += 1
+                    else:
+                        level[u] = -2
+                        nodes.pop()
+                        if path:
+                            path.pop()
+                            ptr[nodes[-1]] += 1
+                if not nodes:
+                    break
+                for i in path:
+                    cap[i] -= 1
+                    cap[i ^ 1] += 1
+                flow += 1
+
+
+def inertial_flow_bisect(x: np.ndarray, y: np.ndarray,
+                         a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Node-уудыг (локал id, ирмэгүүд a-b, хавтгай координат x, y) хоёр хуваана;
+    хоёр тал бүр дор хаяж INERTIAL_BALANCE хэсэгтэй. True = хоёр дахь хэсэг.
+    """
+    n = len(x)
+    k = max(1, int(n * INERTIAL_BALANCE))
+    best = None
+    for j in range(INERTIAL_DIRECTIONS):
+        angle = math.pi * j / INERTIAL_DIRECTIONS
+        order = np.argsort(x * math.cos(angle) + y * math.sin(angle), kind="stable")
+        source = np.zeros(n, dtype=bool)
+        sink = np.zeros(n, dtype=bool)
+        source[order[:k]] = True
+        sink[order[-k:]] = True
+        cut, side = _min_cut(n, a, b, source, sink)
+        balance = abs(int(side.sum()) * 2 - n)
+        if best is None or (cut, balance) < best[:2]:
+            best = (cut, balance, ~side)
+    return best[2]
+
+
+def bisection_tree(graph: CSRGraph,
+                   cell_size: int = CELL_SIZE) -> Tuple[List[Tuple[np.ndarray, int, int]],
+                                                       Dict[Tuple[int, int], int]]:
+    """
+    Рекурсив inertial flow хуваалт: хэсэг бүрийг cell_size-аас ихгүй болтол
+    хуваана. (навчууд DFS дарааллаар [(node-ууд, prefix, түвшин)],
+    {(түвшин, prefix): дэд модны хэмжээ}); хүүхэд нь prefix * 2 + {0, 1}.
+    """
+    n = graph.num_nodes
+    x, y = np.asarray(graph.lon), np.asarray(graph.lat)
+    if not graph.meta.get("options", {}).get("reproject_to_meters") and n:
+        x = x * math.cos(math.radians(float(np.mean(y))))
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(np.asarray(graph.offsets)))
+    dst = np.asarray(graph.targets, dtype=np.int64)
+    keep = src != dst
+    pairs = np.unique(np.stack([np.minimum(src, dst)[keep], np.maximum(src, dst)[keep]]), axis=1)
+    local = np.empty(n, dtype=np.int64)
+    on_side = np.zeros(n, dtype=bool)
+    leaves: List[Tuple[np.ndarray, int, int]] = []
+    sizes: Dict[Tuple[int, int], int] = {}
+    stack: List[Tuple[np.ndarray, np.ndarray, int, int]] = [
+        (np.arange(n, dtype=np.int64), pairs, 0, 0)]
+    while stack:
+        nodes, edges, prefix, level = stack.pop()
+        sizes[(level, prefix)] = len(nodes)
+        if len(nodes) <= cell_size:
+            leaves.append((nodes, prefix, level))
+            continue
+        local[nodes] = np.arange(len(nodes))
+        side = inertial_flow_bisect(x[nodes], y[nodes], local[edges[0]], local[edges[1]])
+        on_side[nodes] = side
+        ea, eb = on_side[edges[0]], on_side[edges[1]]
+        # Эхний хэсэг стекийн оройд үлдэх тул навчууд DFS дарааллаар гарна.
+        for part, mask in ((1, ea & eb), (0, ~ea & ~eb)):
+            stack.append((nodes[side == bool(part)], edges[:, mask],
+                          prefix * 2 + part, level + 1))
+    return leaves, sizes
+
+
+def multilevel_partition(graph: CSRGraph,
+                         cell_size: int = CELL_SIZE,
+                         fanout_bits: int = FANOUT_BITS) -> np.ndarray:
+    """
+    cells[k - 1, v] = v-ийн level k cell (k = 1 нь хамгийн нарийн). Дээд
+    level-д 2^fanout_bits-ээс олон cell үлдэхгүй болтол level нэмнэ.
+    """
+    leaves, sizes = bisection_tree(graph, cell_size)
+    levels: List[np.ndarray] = []
+    limit = cell_size
+    while True:
+        cells = np.zeros(graph.num_nodes, dtype=np.int32)
+        count, last = 0, None
+        for nodes, prefix, level in leaves:
+            # Хэмжээ нь limit-ээс ихгүй хамгийн өндөр өвөг.
+            d = level
+            while d > 0 and sizes[(d - 1, prefix >> (level - d + 1))] <= limit:
+                d -= 1
+            key = (d, prefix >> (level - d))
+            if key != last:
+                count, last = count + 1, key
+            cells[nodes] = count - 1
+        levels.append(cells)
+        if count <= 1 << fanout_bits:
+            break
+        limit <<= fanout_bits
+    return np.stack(levels)
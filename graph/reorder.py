@@ -0,0 +1,89 @@
+from collections import deque
+import numpy as np
+from .csr import CSRGraph
+
+
+def hilbert_order(lon: np.ndarray, lat: np.ndarray, bits: int = 16) -> np.ndarray:
+    """
+    Координатуудыг Hilbert муруйн дагуу эрэмбэлсэн дараалал (хуучин id-ууд).
+    """
+    if len(lon) == 0:
+        return np.zeros(0, dtype=np.int64)
+    side = 1 << bits
+
+    def quantize(a: np.ndarray) -> np.ndarray:
+        lo, hi = float(a.min()), float(a.max())
+        scale = (side - 1) / (hi - lo) if hi > lo else 0.0
+        return ((a - lo) * scale).astype(np.int64)
+
+    x, y = quantize(np.asarray(lon)), quantize(np.asarray(lat))
+    d = np.zeros(len(x), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return np.argsort(d, kind="stable")
+
+
+def bfs_order(graph: CSRGraph) -> np.ndarray:
+    """
+    BFS-ээр нээгдсэн дараалал; холбоогүй хэсэг бүрийг хамгийн бага id-аас эхлүүлнэ.
+    """
+    n = graph.num_nodes
+    seen = bytearray(n)
+    order = []
+    for root in range(n):
+        if seen[root]:
+            continue
+        seen[root] = 1
+        queue = deque([root])
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            for v, _ in graph.neighbors(u):
+                if not seen[v]:
+                    seen[v] = 1
+                    queue.append(v)
+    return np.array(order, dtype=np.int64)
+
+
+def renumber(graph: CSRGraph, order: np.ndarray) -> CSRGraph:
+    """
+    order[i] дахь хуучин node шинэ i дугаартай болно. Node болон ирмэгийн
+    бүх массив хамт зөөгдөж, orig_ids анхны id руу буцах холбоосыг хадгална.
+    """
+    n = graph.num_nodes
+    order = np.asarray(order, dtype=np.int64)
+    if len(order) != n or not np.array_equal(np.sort(order), np.arange(n)):
+        raise ValueError("order нь 0..n-1-ийн сэлгэмэл байх ёстой.")
+    new_id = np.empty(n, dtype=np.int64)
+    new_id[order] = np.arange(n)
+
+    offsets = np.asarray(graph.offsets)
+    deg = np.diff(offsets)[order]
+    new_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(deg, out=new_offsets[1:])
+    # Шинэ ирмэг j нь хуучин offsets[order[i]] + (j - new_offsets[i]) ирмэг.
+    idx = (np.repeat(offsets[:-1][order] - new_offsets[:-1], deg)
+           + np.arange(new_offsets[-1], dtype=np.int64))
+
+    arrays = graph.arrays()
+    for name in CSRGraph.INDEX_ARRAYS:
+        arrays.pop(name, None)
+    if "orig_ids" not in arrays:
+        arrays["orig_ids"] = np.arange(n, dtype=np.int64)
+    for name in CSRGraph.NODE_ARRAYS:
+        if name in arrays:
+            arrays[name] = np.ascontiguousarray(np.asarray(arrays[name])[order])
+    for name in CSRGraph.EDGE_ARRAYS:
+        if name in arrays:
+            arrays[name] = np.ascontiguousarray(np.asarray(arrays[name])[idx])
+    arrays["targets"] = new_id[arrays["targets"]].astype(graph.targets.dtype)
+    arrays["offsets"] = new_offsets
+    return CSRGraph.from_arrays(arrays, meta=graph.meta)
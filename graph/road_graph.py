@@ -1,33 +1,178 @@
 # graph/road_graph.py
-from typing import Dict, Tuple, List
-from .models import Edge
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, Tuple, List
+import numpy as np
+from .models import Edge, EdgeCleanupReport, EdgeUpdate, Way
+from .spatial import GridIndex
+
+if TYPE_CHECKING:
+    from .csr import CSRGraph
 
 class RoadGraph:
     def __init__(self) -> None:
         self.nodes: Dict[int, Tuple[float, float]] = {}
         self.adj: Dict[int, List[Edge]] = {}
+        # Урвуу adjacency: v -> [(u, u->v ирмэгийн объект)]; Edge нь adj-тай
+        # нэг объект тул update_edges хоёр талд шууд харагдана.
+        self.radj: Dict[int, List[Tuple[int, Edge]]] = {}
+        self.ways: List[Way] = []
+        # Loader-ийн тохиргоо (meta["options"]: weights, reproject_to_meters), CSRGraph.meta-тай адил.
+        self.meta: Dict[str, Any] = {}
+        self.version = 0
+        self._grid: Optional[GridIndex] = None
+        self._grid_ids: List[int] = []
+        self._main_mask: Optional[np.ndarray] = None
 
     def add_node(self, nid: int, lon: float, lat: float) -> None:
         if nid not in self.nodes:
             self.nodes[nid] = (lon, lat)
             self.adj[nid] = []
+            self.radj[nid] = []
+            self._main_mask = None
+
+    def add_way(self,
+                fclass: Optional[str] = None,
+                oneway: str = "no",
+                access: Optional[str] = None,
+                maxspeed: int = 0,
+                name: Optional[str] = None) -> int:
+        """
+        Замын (OSM way) шинжийг бүртгээд add_edge(..., way=)-д өгөх дугаарыг буцаана.
+        """
+        self.ways.append(Way(fclass=fclass, oneway=oneway, access=access,
+                             maxspeed=maxspeed, name=name))
+        return len(self.ways) - 1
 
-    def add_edge(self, u: int, v: int, w: float, oneway: str = "no") -> None:
+    def add_edge(self, u: int, v: int, w: float, oneway: str = "no", way: int = -1) -> None:
         ow = (oneway or "no").strip().lower()
         if ow in ("yes", "1", "true"):
-            self.adj[u].append(Edge(target=v, weight=w))
+            self._link(u, Edge(target=v, weight=w, way=way))
         elif ow in ("-1", "reverse"):
-            self.adj[v].append(Edge(target=u, weight=w))
+            self._link(v, Edge(target=u, weight=w, way=way))
         else:
-            self.adj[u].append(Edge(target=v, weight=w))
-            self.adj[v].append(Edge(target=u, weight=w))
-
-    def nearest_node(self, lon: float, lat: float) -> int:
-        best_id = -1
-        best_dist = float("inf")
-        for nid, (n_lon, n_lat) in self.nodes.items():
-            d = (n_lon - lon) ** 2 + (n_lat - lat) ** 2
-            if d < best_dist:
-                best_dist = d
-                best_id = nid
-        return best_id
+            self._link(u, Edge(target=v, weight=w, way=way))
+            self._link(v, Edge(target=u, weight=w, way=way))
+
+    def _link(self, u: int, edge: Edge) -> None:
+        self._main_mask = None
+        self.adj[u].append(edge)
+        self.radj[edge.target].append((u, edge))
+
+    def remove_redundant_edges(self) -> EdgeCleanupReport:
+        """
+        (u, v) хос бүрд хамгийн бага жинтэй ирмэгийг л үлдээж, self-loop-уудыг хасна.
+        """
+        report = EdgeCleanupReport()
+        for u, edges in self.adj.items():
+            best: Dict[int, Edge] = {}
+            for e in edges:
+                if e.target == u:
+                    report.self_loops += 1
+                    continue
+                cur = best.get(e.target)
+                if cur is None:
+                    best[e.target] = e
+                else:
+                    report.parallel += 1
+                    if e.weight < cur.weight:
+                        best[e.target] = e
+            if len(best) != len(edges):
+                self.adj[u] = list(best.values())
+        if report.removed:
+            self.radj = {nid: [] for nid in self.nodes}
+            for u, edges in self.adj.items():
+                for e in edges:
+                    self.radj[e.target].append((u, e))
+        return report
+
+    def update_edges(self, updates: Iterable[EdgeUpdate]) -> int:
+        """
+        Ирмэгүүдийг хааж/нээж, жинг нь байран дээр нь өөрчилнө.
+        Өөрчлөгдсөн ирмэгийн тоог буцаана.
+        """
+        inf = float("inf")
+        count = 0
+        for upd in updates:
+            pairs = [(upd.u, upd.v), (upd.v, upd.u)] if upd.both_directions else [(upd.u, upd.v)]
+            for a, b in pairs:
+                for e in self.adj.get(a, []):
+                    if e.target != b:
+                        continue
+                    closed = e.open_weight is not None
+                    open_weight = e.open_weight if closed else e.weight
+                    if upd.weight is not None:
+                        open_weight = upd.weight
+                    if upd.closed is not None:
+                        closed = upd.closed
+                    e.weight, e.open_weight = (inf, open_weight) if closed else (open_weight, None)
+                    count += 1
+        self.version += 2
+        return count
+
+    def neighbors(self, u: int) -> Iterator[Tuple[int, float]]:
+        return ((e.target, e.weight) for e in self.adj.get(u, []))
+
+    def reverse_neighbors(self, v: int) -> Iterator[Tuple[int, float]]:
+        """
+        v руу орж ирэх ирмэгүүд: (эх node, жин).
+        """
+        return ((u, e.weight) for u, e in self.radj.get(v, []))
+
+    def path_coords(self, node_path: List[int]) -> List[Tuple[float, float]]:
+        return [self.nodes[nid] for nid in node_path]
+
+    def freeze(self) -> "CSRGraph":
+        from .csr import CSRGraph
+        return CSRGraph.from_road_graph(self)
+
+    def nearest_node(self, lon: float, lat: float, main_component: bool = False,
+                     max_dist_m: Optional[float] = None) -> int:
+        """
+        Хамгийн ойр node-ийн id (spatial index-ээр; node нэмэгдвэл дахин барина).
+        main_component=True үед зөвхөн хамгийн том SCC-ийн node-уудаас сонгоно.
+        max_dist_m дотор node байхгүй бол -1.
+        """
+        pos = self._spatial_index().nearest(lon, lat, mask=self._snap_mask(main_component),
+                                            max_dist_m=max_dist_m)
+        return self._grid_ids[pos] if pos != -1 else -1
+
+    def nearest_nodes(self, lons: np.ndarray, lats: np.ndarray, main_component: bool = False,
+                      max_dist_m: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Олон цэгийн хамгийн ойр node-ийн id-ууд ба зай (м), олдоогүй бол -1, inf.
+        """
+        pos, dist = self._spatial_index().nearest_many(lons, lats,
+                                                       mask=self._snap_mask(main_component),
+                                                       max_dist_m=max_dist_m)
+        ids = np.asarray(self._grid_ids, dtype=np.int64)
+        return np.where(pos >= 0, ids[np.maximum(pos, 0)] if len(ids) else -1, -1), dist
+
+    def _snap_mask(self, main_component: bool) -> Optional[np.ndarray]:
+        """
+        Spatial index-ийн дараалалтай (_grid_ids) хамгийн том SCC-ийн mask.
+        Ирмэг/node нэмэгдэхэд дахин тооцно; хаалт бүтцийг өөрчлөхгүй тул
+        CSRGraph.scc-тэй адил update_edges-ээс хамаарахгүй.
+        """
+        if not main_component:
+            return None
+        self._spatial_index()
+        if self._main_mask is None:
+            from .components import strong_components
+            from .csr import CSRGraph
+            pos = {nid: i for i, nid in enumerate(self._grid_ids)}
+            n = len(pos)
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(self.adj[nid]) for nid in self._grid_ids])
+            m = int(offsets[-1])
+            targets = np.fromiter((pos[e.target] for nid in self._grid_ids for e in self.adj[nid]),
+                                  dtype=np.int32, count=m)
+            coords = self._grid.lon, self._grid.lat
+            scc = strong_components(CSRGraph(offsets, targets, np.zeros(m), *coords))
+            self._main_mask = (scc == np.argmax(np.bincount(scc))) if n else np.zeros(0, dtype=bool)
+        return self._main_mask
+
+    def _spatial_index(self) -> GridIndex:
+        if self._grid is None or len(self._grid_ids) != len(self.nodes):
+            self._grid_ids = list(self.nodes)
+            coords = np.array(list(self.nodes.values()), dtype=np.float64).reshape(-1, 2)
+            self._grid = GridIndex.build(coords[:, 0], coords[:, 1])
+        return self._grid
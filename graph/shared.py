@@ -0,0 +1,109 @@
+import json
+import os
+import struct
+import sys
+import tempfile
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional
+import numpy as np
+from .csr import CSRGraph
+
+SHM_ENV = "ROAD_GRAPH_SHM"
+# Бусад массив read-only; эдгээрт бичвэл (update_edges) бүх worker шууд харна.
+WRITABLE_ARRAYS = ("weights", "open_weights", "version")
+
+_MAGIC = b"RGSHM001"
+_PREFIX = struct.Struct("<8sQ")
+_ALIGN = 64
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def publish_shared(graph: CSRGraph,
+                   name: Optional[str] = None) -> shared_memory.SharedMemory:
+    """
+    Графын бүх массивыг нэг shared memory segment-д хуулна.
+    Буцаасан объектыг амьд байлгаж, дууссаны дараа `release_shared` дуудна.
+    """
+    arrays = graph.arrays()
+    if "open_weights" not in arrays:
+        arrays["open_weights"] = arrays["weights"]
+    layout: Dict[str, Dict] = {}
+    offset = 0
+    for arr_name, arr in arrays.items():
+        layout[arr_name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset = _align(offset + arr.nbytes)
+    header = json.dumps({"arrays": layout, "meta": graph.meta}).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header))
+
+    shm = _open_segment(name, create=True, size=max(data_start + offset, 1))
+    _PREFIX.pack_into(shm.buf, 0, _MAGIC, len(header))
+    shm.buf[_PREFIX.size:_PREFIX.size + len(header)] = header
+    for arr_name, arr in arrays.items():
+        spec = layout[arr_name]
+        dst = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf,
+                         offset=data_start + spec["offset"])
+        dst[...] = arr
+        del dst
+    return shm
+
+
+def _open_segment(name: Optional[str], create: bool = False,
+                  size: int = 0) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    # Python < 3.13 дээр resource tracker нь segment-ийг бүртгэсэн процесс
+    # гарахад unlink хийчихдэг (fork хийсэн worker-ууд tracker-аа хуваалцдаг).
+    # Амьдралын мөчлөгийг publish/release_shared өөрсдөө удирдана.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _lock_path(name: str) -> str:
+    return os.path.join(tempfile.gettempdir(), f"{name.lstrip('/')}.lock")
+
+
+def release_shared(shm: shared_memory.SharedMemory) -> None:
+    """
+    `publish_shared`-ийн segment-ийг хаагаад устгана (master процесс дуудна).
+    """
+    shm.close()
+    if sys.version_info < (3, 13):
+        resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
+    try:
+        os.remove(_lock_path(shm.name))
+    except OSError:
+        pass
+
+
+def attach_shared(name: str) -> CSRGraph:
+    """
+    `publish_shared`-ийн үүсгэсэн segment-д холбогдоно. Массивууд хуулагдахгүй
+    тул бүх worker нэг л хувийг ашиглана; WRITABLE_ARRAYS-аас бусад нь read-only.
+    """
+    shm = _open_segment(name)
+    magic, header_len = _PREFIX.unpack_from(shm.buf, 0)
+    if magic != _MAGIC:
+        raise ValueError(f"Shared memory segment графын биш байна: {name}")
+    header = json.loads(bytes(shm.buf[_PREFIX.size:_PREFIX.size + header_len]))
+    data_start = _align(_PREFIX.size + header_len)
+
+    arrays = {}
+    for arr_name, spec in header["arrays"].items():
+        arr = np.ndarray(tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]),
+                         buffer=shm.buf, offset=data_start + spec["offset"])
+        if arr_name not in WRITABLE_ARRAYS:
+            arr.flags.writeable = False
+        arrays[arr_name] = arr
+
+    graph = CSRGraph.from_arrays(arrays, meta=header["meta"])
+    # Worker бүр жинд бичиж болох тул seqlock-ийн бичигчдийг процесс хооронд түгжинэ.
+    graph.write_lock_path = _lock_path(name)
+    # Массивууд shm.buf-ийг ашиглаж байгаа тул segment-ийг графтай хамт амьд байлгана.
+    graph._shm = shm
+    return graph
+
@@ -0,0 +1,369 @@
+import heapq
+import math
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import shapely
+from .geo import EARTH_RADIUS_M
+from .models import EdgeSnap
+
+if TYPE_CHECKING:
+    from .csr import CSRGraph
+
+DEG_M = EARTH_RADIUS_M * math.pi / 180.0  # өргөргийн 1 градус, метрээр
+NODES_PER_CELL = 1.0
+BATCH_SIZE = 65_536  # nearest_many нэг удаад боловсруулах цэгийн тоо
+SNAP_SEARCH_M = 10.0  # хаалттай ирмэгийг алгасахад хайх радиусын эхний утга
+
+
+class GridIndex:
+    """
+    Node-уудын жигд торон spatial index (нүд бүрийн node-ууд CSR хэлбэрээр, equirectangular зай).
+    params = [lon0, lat0, cell, nx, ny, kx].
+    """
+
+    def __init__(self, offsets: np.ndarray, nodes: np.ndarray, params: np.ndarray,
+                 lon: np.ndarray, lat: np.ndarray) -> None:
+        self.offsets = offsets
+        self.nodes = nodes
+        self.params = params
+        self.lon0, self.lat0, self.cell, nx, ny, self.kx = (float(v) for v in params)
+        self.nx, self.ny = int(nx), int(ny)
+        self._off = memoryview(offsets)
+        self._nodes = memoryview(nodes)
+        self.lon = np.ascontiguousarray(lon, dtype=np.float64)
+        self.lat = np.ascontiguousarray(lat, dtype=np.float64)
+        self._lon = memoryview(self.lon)
+        self._lat = memoryview(self.lat)
+
+    @classmethod
+    def build(cls, lon: np.ndarray, lat: np.ndarray) -> "GridIndex":
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        n = len(lon)
+        if n == 0:
+            params = np.array([0.0, 0.0, 1.0, 1, 1, 1.0])
+            return cls(np.zeros(2, dtype=np.int64), np.empty(0, dtype=np.int32), params, lon, lat)
+        kx = math.cos(math.radians(float(np.mean(lat))))
+        lon0, lat0 = float(lon.min()), float(lat.min())
+        width = (float(lon.max()) - lon0) * kx
+        height = float(lat.max()) - lat0
+        # Нэг нүдэнд дунджаар NODES_PER_CELL node ногдохоор.
+        cell = math.sqrt(max(width * height, 1e-12) * NODES_PER_CELL / n)
+        cell = max(cell, 1e-6, max(width, height) / 4096)
+        nx = int(width // cell) + 1
+        ny = int(height // cell) + 1
+        params = np.array([lon0, lat0, cell, nx, ny, kx], dtype=np.float64)
+
+        cx = np.minimum(((lon - lon0) * kx // cell).astype(np.int64), nx - 1)
+        cy = np.minimum(((lat - lat0) // cell).astype(np.int64), ny - 1)
+        cell_of = cy * nx + cx
+        order = np.argsort(cell_of, kind="stable")
+        offsets = np.zeros(nx * ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell_of, minlength=nx * ny), out=offsets[1:])
+        return cls(offsets, order.astype(np.int32), params, lon, lat)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"grid_offsets": self.offsets, "grid_nodes": self.nodes, "grid_params": self.params}
+
+    def _ring(self, cx: int, cy: int, r: int):
+        """
+        (cx, cy)-ээс Chebyshev зай нь яг r байх, торонд багтах нүднүүдийн node-ууд.
+        """
+        nx, ny, off, nodes = self.nx, self.ny, self._off, self._nodes
+        y_lo, y_hi = max(cy - r, 0), min(cy + r, ny - 1)
+        for y in range(y_lo, y_hi + 1):
+            if y in (cy - r, cy + r):
+                xs = range(max(cx - r, 0), min(cx + r, nx - 1) + 1)
+            else:
+                xs = [x for x in (cx - r, cx + r) if 0 <= x < nx]
+            row = y * nx
+            for x in xs:
+                c = row + x
+                a, b = off[c], off[c + 1]
+                if a != b:
+                    yield from nodes[a:b]
+
+    def _start(self, lon: float, lat: float) -> Tuple[float, float, int, int, int, int]:
+        x = (lon - self.lon0) * self.kx
+        y = lat - self.lat0
+        cx = math.floor(x / self.cell)
+        cy = math.floor(y / self.cell)
+        # Торноос гадуурх цэгийн хувьд эхний хоосон цагирагуудыг алгасна.
+        r0 = max(0, -cx, cx - (self.nx - 1), -cy, cy - (self.ny - 1))
+        r_max = r0 + max(self.nx, self.ny)
+        return x, y, cx, cy, r0, r_max
+
+    def k_nearest(self, lon: float, lat: float, k: int = 1,
+                  mask: Optional[np.ndarray] = None,
+                  max_dist_m: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Хамгийн ойр k node, [(node, зай_м)] ойроос нь. mask өгвөл зөвхөн
+        mask[node] үнэн node-ууд; max_dist_m-ээс хол node-ууд орохгүй.
+        """
+        if k <= 0 or len(self.nodes) == 0:
+            return []
+        x, y, cx, cy, r, r_max = self._start(lon, lat)
+        lon0, lat0, kx, cell = self.lon0, self.lat0, self.kx, self.cell
+        lons, lats = self._lon, self._lat
+        limit = math.inf if max_dist_m is None else (max_dist_m / DEG_M) ** 2
+        if r > 0 and (max(r - 1, 0) * cell) ** 2 <= limit:
+            # Торноос гадуурх цэгт цагираг олноор тэлэх тул шууд векторчилж тооцно.
+            return self._scan(x, y, k, mask, limit)
+        # (-d2, -node) max-heap, хэмжээ <= k; тэнцүү зайтай бол бага id-г авна.
+        best: List[Tuple[float, int]] = []
+        while r <= r_max and (max(r - 1, 0) * cell) ** 2 <= limit:
+            for v in self._ring(cx, cy, r):
+                if mask is not None and not mask[v]:
+                    continue
+                dx = (lons[v] - lon0) * kx - x
+                dy = lats[v] - lat0 - y
+                d2 = dx * dx + dy * dy
+                if d2 > limit:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-d2, -v))
+                elif (-d2, -v) > best[0]:
+                    heapq.heapreplace(best, (-d2, -v))
+            # Шалгаагүй нүднүүдийн бүх цэг r * cell-ээс хол.
+            reach = (r * cell) ** 2
+            if len(best) == k and -best[0][0] <= reach:
+                break
+            r += 1
+        return [(-nv, math.sqrt(-nd2) * DEG_M) for nd2, nv in sorted(best, reverse=True)]
+
+    def _scan(self, x: float, y: float, k: int, mask: Optional[np.ndarray],
+              limit: float) -> List[Tuple[int, float]]:
+        d2 = ((self.lon - self.lon0) * self.kx - x) ** 2 + (self.lat - self.lat0 - y) ** 2
+        if mask is not None:
+            d2[~np.asarray(mask, dtype=bool)] = np.inf
+        if k == 1:
+            order = [int(np.argmin(d2))]
+        else:
+            part = np.argpartition(d2, k - 1)[:k] if k < len(d2) else np.arange(len(d2))
+            order = part[np.lexsort((part, d2[part]))]
+        # mask-аар хасагдсан (inf) node-ууд үр дүнд орохгүй.
+        return [(int(v), math.sqrt(d2[v]) * DEG_M) for v in order
+                if d2[v] <= limit and d2[v] < math.inf]
+
+    def nearest(self, lon: float, lat: float,
+                mask: Optional[np.ndarray] = None,
+                max_dist_m: Optional[float] = None) -> int:
+        found = self.k_nearest(lon, lat, 1, mask=mask, max_dist_m=max_dist_m)
+        return found[0][0] if found else -1
+
+    def nearest_many(self, lons: np.ndarray, lats: np.ndarray,
+                     mask: Optional[np.ndarray] = None,
+                     max_dist_m: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Олон цэгийн хамгийн ойр node-ийг векторчилж олно: (node-ууд int64,
+        зай_м float64). Олдоогүй цэгт -1, inf. Үр дүн нь `nearest`-тэй ижил.
+        """
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        if lons.shape != lats.shape:
+            raise ValueError("lons, lats-ийн урт ижил байх ёстой")
+        ids = np.full(len(lons), -1, dtype=np.int64)
+        d2 = np.full(len(lons), np.inf)
+        if len(self.nodes) == 0:
+            return ids, d2
+        keep = None if mask is None else np.asarray(mask, dtype=bool)
+        limit = math.inf if max_dist_m is None else (max_dist_m / DEG_M) ** 2
+        for lo in range(0, len(lons), BATCH_SIZE):
+            part = slice(lo, lo + BATCH_SIZE)
+            ids[part], d2[part] = self._nearest_batch(lons[part], lats[part], keep, limit)
+        return ids, np.sqrt(d2) * DEG_M
+
+    def _nearest_batch(self, lons: np.ndarray, lats: np.ndarray,
+                       keep: Optional[np.ndarray], limit: float) -> Tuple[np.ndarray, np.ndarray]:
+        x = (lons - self.lon0) * self.kx
+        y = lats - self.lat0
+        cx = np.floor(x / self.cell).astype(np.int64)
+        cy = np.floor(y / self.cell).astype(np.int64)
+        best = np.full(len(x), -1, dtype=np.int64)
+        best_d2 = np.full(len(x), np.inf)
+        inside = (cx >= 0) & (cx < self.nx) & (cy >= 0) & (cy < self.ny)
+        # Торноос гадуурх (ховор) цэгүүдийг нэг нэгээр нь.
+        for q in np.flatnonzero(~inside):
+            found = self.k_nearest(float(lons[q]), float(lats[q]), 1, mask=keep,
+                                   max_dist_m=None if math.isinf(limit) else math.sqrt(limit) * DEG_M)
+            if found:
+                best[q] = found[0][0]
+                best_d2[q] = (found[0][1] / DEG_M) ** 2
+
+        active = np.flatnonzero(inside)
+        r = 0
+        r_max = max(self.nx, self.ny)
+        while len(active) and r <= r_max and (max(r - 1, 0) * self.cell) ** 2 <= limit:
+            span = np.arange(-r, r + 1)
+            ox, oy = np.meshgrid(span, span)
+            ring = np.maximum(np.abs(ox), np.abs(oy)).ravel() == r
+            ox, oy = ox.ravel()[ring], oy.ravel()[ring]
+            # (идэвхтэй цэг × цагирагийн нүд) хос бүрийн node-уудыг задлана.
+            qx = cx[active, None] + ox
+            qy = cy[active, None] + oy
+            valid = (qx >= 0) & (qx < self.nx) & (qy >= 0) & (qy < self.ny)
+            owner = np.broadcast_to(active[:, None], qx.shape)[valid]
+            cells = (qy * self.nx + qx)[valid]
+            start = self.offsets[cells]
+            counts = self.offsets[cells + 1] - start
+            owner = np.repeat(owner, counts)
+            pos = np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            cand = self.nodes[pos].astype(np.int64)
+            if keep is not None:
+                owner, cand = owner[keep[cand]], cand[keep[cand]]
+            cd2 = ((self.lon[cand] - self.lon0) * self.kx - x[owner]) ** 2 \
+                + (self.lat[cand] - self.lat0 - y[owner]) ** 2
+            near = cd2 <= limit
+            owner, cand, cd2 = owner[near], cand[near], cd2[near]
+            if len(owner):
+                # owner эрэмбэлэгдсэн тул цэг бүрийн хэсэг дэх хамгийн ойр
+                # (тэнцвэл бага id) нэр дэвшигчийг reduceat-аар олно.
+                heads = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+                q = owner[heads]
+                vd2 = np.minimum.reduceat(cd2, heads)
+                ties = cd2 == np.repeat(vd2, np.diff(np.r_[heads, len(owner)]))
+                v = np.minimum.reduceat(np.where(ties, cand, np.iinfo(np.int64).max), heads)
+                better = (vd2 < best_d2[q]) | ((vd2 == best_d2[q]) & (v < best[q]))
+                best[q[better]] = v[better]
+                best_d2[q[better]] = vd2[better]
+            # Шалгаагүй нүднүүдийн бүх цэг r * cell-ээс хол.
+            active = active[~(best_d2[active] <= (r * self.cell) ** 2)]
+            r += 1
+        return best, best_d2
+
+    def within(self, lon: float, lat: float, radius_m: float,
+               mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        radius_m метрийн доторх бүх node, [(node, зай_м)] ойроос нь.
+        """
+        if len(self.nodes) == 0:
+            return []
+        x, y, cx, cy, r, r_max = self._start(lon, lat)
+        lon0, lat0, kx, cell = self.lon0, self.lat0, self.kx, self.cell
+        lons, lats = self._lon, self._lat
+        limit = (radius_m / DEG_M) ** 2
+        found: List[Tuple[float, int]] = []
+        # r-р цагирагийн нүднүүд цэгээс (r - 1) * cell-ээс хол.
+        while r <= r_max and (max(r - 1, 0) * cell) ** 2 <= limit:
+            for v in self._ring(cx, cy, r):
+                if mask is not None and not mask[v]:
+                    continue
+                dx = (lons[v] - lon0) * kx - x
+                dy = lats[v] - lat0 - y
+                d2 = dx * dx + dy * dy
+                if d2 <= limit:
+                    found.append((d2, v))
+            r += 1
+        found.sort()
+        return [(v, math.sqrt(d2) * DEG_M) for d2, v in found]
+
+
+class EdgeIndex:
+    """
+    Ирмэгүүдийн polyline-уудын R-tree (shapely STRtree). u -> v ба v -> u
+    ихэр ирмэгүүд нэг геометртэй тул нэг "хэсэг" (a < b) болж орно.
+    Координат нь `GridIndex`-тэй ижил kx-ээр масштаблагдсан.
+    """
+
+    def __init__(self, a: np.ndarray, b: np.ndarray, geom: np.ndarray,
+                 lines: np.ndarray, kx: float) -> None:
+        self.a = a
+        self.b = b
+        self.geom = geom
+        self.lines = lines
+        self.kx = kx
+        self.tree = shapely.STRtree(lines)
+
+    @classmethod
+    def build(cls, graph: "CSRGraph", kx: float,
+              node_mask: Optional[np.ndarray] = None) -> "EdgeIndex":
+        """
+        node_mask өгвөл хоёр үзүүр нь mask-д орсон ирмэгүүдээр л барина.
+        """
+        offsets = np.asarray(graph.offsets)
+        src = np.repeat(np.arange(graph.num_nodes, dtype=np.int64), np.diff(offsets))
+        tgt = np.asarray(graph.targets, dtype=np.int64)
+        sign = (np.zeros(len(tgt), dtype=np.int64) if graph.edge_geom is None
+                else np.asarray(graph.edge_geom, dtype=np.int64))
+        keep = np.flatnonzero(np.ones(len(tgt), dtype=bool) if node_mask is None
+                              else node_mask[src] & node_mask[tgt])
+        lo, hi = np.minimum(src, tgt)[keep], np.maximum(src, tgt)[keep]
+        gid = np.abs(sign[keep])
+        _, first = np.unique(np.column_stack([lo, hi, gid]), axis=0, return_index=True)
+        rep = keep[first]
+        a, b, gid = lo[first], hi[first], gid[first]
+        # Геометрийг a -> b чиглэлд эргүүлнэ.
+        forward = np.where(src[rep] == a, sign[rep] >= 0, sign[rep] < 0)
+
+        if graph.edge_geom is None:
+            glen = np.zeros(len(rep), dtype=np.int64)
+            g_lo = g_hi = glen
+        else:
+            geom_offsets = np.asarray(graph.geom_offsets)
+            k = np.maximum(gid - 1, 0)
+            g_lo = geom_offsets[k]
+            g_hi = geom_offsets[k + 1]
+            glen = np.where(gid > 0, g_hi - g_lo, 0)
+        count = glen + 2
+        starts = np.concatenate([[0], np.cumsum(count)])
+        piece = np.repeat(np.arange(len(rep)), count)
+        j = np.arange(int(starts[-1])) - starts[piece]
+        lon = np.asarray(graph.lon)
+        lat = np.asarray(graph.lat)
+        xs = np.where(j == 0, lon[a[piece]], lon[b[piece]])
+        ys = np.where(j == 0, lat[a[piece]], lat[b[piece]])
+        inner = np.flatnonzero((j > 0) & (j < count[piece] - 1))
+        if len(inner):
+            p = piece[inner]
+            idx = np.where(forward[p], g_lo[p] + j[inner] - 1, g_hi[p] - j[inner])
+            xs[inner] = np.asarray(graph.geom_lon)[idx]
+            ys[inner] = np.asarray(graph.geom_lat)[idx]
+        lines = shapely.linestrings(np.column_stack([xs * kx, ys]), indices=piece)
+        return cls(a, b, gid, lines, kx)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def nearest(self, lon: float, lat: float,
+                max_dist_m: Optional[float] = None,
+                usable: Optional[Callable[[int, int, int], bool]] = None) -> Optional[EdgeSnap]:
+        """
+        Хамгийн ойр ирмэг дээрх проекц; max_dist_m дотор ирмэг байхгүй бол None.
+        usable(a, b, geom) өгвөл False буцаасан (жишээ нь хаалттай) хэсгийг
+        алгасаж, радиусыг хоёр дахин томруулсаар дараагийн ойрыг хайна.
+        """
+        if len(self.lines) == 0:
+            return None
+        pt = shapely.Point(lon * self.kx, lat)
+        limit = math.inf if max_dist_m is None else max_dist_m / DEG_M
+        found, dist = self.tree.query_nearest(
+            pt, max_distance=None if max_dist_m is None else limit, return_distance=True)
+        radius = SNAP_SEARCH_M / DEG_M
+        while len(found):
+            for j in np.lexsort((found, dist)):
+                i = int(found[j])
+                if usable is None or usable(int(self.a[i]), int(self.b[i]), int(self.geom[i])):
+                    return self._snap(i, pt, float(dist[j]))
+            # radius доторх бүх ирмэгийг шалгасан тул дараагийн нэр дэвшигчид түүнээс цааш.
+            if radius >= limit or len(found) == len(self.lines):
+                return None
+            radius = min(max(radius, float(dist.max())) * 2, limit)
+            found = self.tree.query(pt, predicate="dwithin", distance=radius)
+            dist = shapely.distance(self.lines[found], pt)
+        return None
+
+    def _snap(self, i: int, pt: shapely.Point, dist: float) -> EdgeSnap:
+        line = self.lines[i]
+        t = float(shapely.line_locate_point(line, pt, normalized=True))
+        if not math.isfinite(t):  # тэг урттай ирмэг
+            t = 0.0
+        proj = shapely.line_interpolate_point(line, t, normalized=True)
+        xy = shapely.get_coordinates(line)
+        seg = np.hypot(np.diff(xy[:, 0]), np.diff(xy[:, 1]))
+        total = float(seg.sum())
+        stations = (np.concatenate([[0.0], np.cumsum(seg)]) / total if total > 0
+                    else np.linspace(0.0, 1.0, len(xy)))
+        return EdgeSnap(a=int(self.a[i]), b=int(self.b[i]), geom=int(self.geom[i]), t=t,
+                        lon=proj.x / self.kx, lat=proj.y, dist_m=dist * DEG_M,
+                        coords=list(zip((xy[:, 0] / self.kx).tolist(), xy[:, 1].tolist())),
+                        stations=stations.tolist())
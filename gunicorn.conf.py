@@ -0,0 +1,49 @@
+# gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py app:app
+#
+# Master процесс графыг нэг удаа ачаалж shared memory-д байршуулна.
+# Worker бүр app.py-г import хийхдээ ROAD_GRAPH_SHM-ээр тэр segment-д
+# read-only холбогдох тул worker-ийн тооноос үл хамааран граф RAM-д нэг л хувь байна.
+import multiprocessing
+import os
+
+from graph.algorithms.alt import load_or_build_landmarks
+from graph.algorithms.ch import load_or_build_hierarchy
+from graph.algorithms.crp import load_or_build_overlay
+from graph.algorithms.hub_labels import load_or_build_hub_labels
+from graph.io.snapshot import load_graph_cached
+from graph.shared import SHM_ENV, publish_shared, release_shared
+
+SHAPEFILE_PATH = "data/gis_osm_roads_free_1.shp"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(SHAPEFILE_PATH)), ".graph_cache")
+REGION_BBOX = (tuple(float(v) for v in os.environ["ROUTE_BBOX"].split(","))
+               if os.environ.get("ROUTE_BBOX") else None)
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+
+_segment = None
+
+
+def on_starting(server):
+    global _segment
+    graph = load_graph_cached(SHAPEFILE_PATH, reproject_to_meters=False,
+                              workers=multiprocessing.cpu_count(),
+                              bbox=REGION_BBOX)
+    if os.environ.get("ROUTE_BUILD_CH"):
+        # Worker-ууд hierarchy-г cache-аас mmap-аар ачаална.
+        load_or_build_hierarchy(graph, CACHE_DIR)
+    if os.environ.get("ROUTE_BUILD_ALT"):
+        load_or_build_landmarks(graph, CACHE_DIR)
+    if os.environ.get("ROUTE_BUILD_HL"):
+        load_or_build_hub_labels(graph, CACHE_DIR)
+    if os.environ.get("ROUTE_BUILD_CRP"):
+        load_or_build_overlay(graph, CACHE_DIR, workers=multiprocessing.cpu_count())
+    _segment = publish_shared(graph)
+    os.environ[SHM_ENV] = _segment.name
+    server.log.info(f"Graph shared memory: {_segment.name} ({_segment.size / 2**20:.1f} MiB)")
+
+
+def on_exit(server):
+    if _segment is not None:
+        release_shared(_segment)
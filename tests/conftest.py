@@ -0,0 +1,71 @@
+import random
+import geopandas as gpd
+import pytest
+from shapely.geometry import LineString, MultiLineString
+
+from graph.io.snapshot import load_graph_cached
+
+GRID = 14
+STEP = 0.002
+ORIGIN = (106.80, 47.85)
+FCLASSES = ("residential", "primary", "secondary", "service", "footway", "unclassified")
+
+
+def road_frame(size: int = GRID, seed: int = 1) -> gpd.GeoDataFrame:
+    """
+    Туршилтын замын сүлжээ: завсрын цэгтэй хэвтээ гудамжууд (зарим нь
+    нэг чиглэлтэй), MultiLineString босоо замууд, давхар way ба тусгаарлагдсан хэсэг.
+    """
+    rng = random.Random(seed)
+    lon0, lat0 = ORIGIN
+    rows = []
+    for j in range(size):
+        for i in range(0, size - 1, 3):
+            coords = []
+            end = min(i + 3, size - 1)
+            for k in range(i, end + 1):
+                x, y = lon0 + k * STEP, lat0 + j * STEP
+                coords.append((x, y))
+                if k < end:
+                    coords.append((x + STEP / 3, y + rng.uniform(-3e-4, 3e-4)))
+                    coords.append((x + 2 * STEP / 3, y + rng.uniform(-3e-4, 3e-4)))
+            rows.append({
+                "geometry": LineString(coords),
+                "fclass": rng.choice(FCLASSES),
+                "oneway": rng.choice(["no", "no", "yes", "-1"]) if j % 4 == 0 else "no",
+                "access": rng.choice([None, None, None, "private"]),
+                "maxspeed": rng.choice([0, 30, 50]),
+                "name": f"h{j}",
+            })
+    for i in range(size):
+        coords = [(lon0 + i * STEP, lat0 + j * STEP) for j in range(size)]
+        half = size // 2
+        rows.append({
+            "geometry": MultiLineString([coords[:half + 1], coords[half:]]),
+            "fclass": "primary", "oneway": "no", "access": None, "maxspeed": 50,
+            "name": f"v{i}",
+        })
+    rows.extend(dict(row) for row in rows[:10])
+    rows.append({
+        "geometry": LineString([(lon0 - 0.05, lat0 - 0.05), (lon0 - 0.049, lat0 - 0.05)]),
+        "fclass": "service", "oneway": "no", "access": None, "maxspeed": 0, "name": "stub",
+    })
+    return gpd.GeoDataFrame(rows, crs="EPSG:4326")
+
+
+@pytest.fixture(scope="session")
+def roads_path(tmp_path_factory) -> str:
+    path = tmp_path_factory.mktemp("roads") / "roads.shp"
+    road_frame().to_file(path)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def cache_dir(tmp_path_factory) -> str:
+    return str(tmp_path_factory.mktemp("cache"))
+
+
+@pytest.fixture
+def graph(roads_path, cache_dir):
+    # Snapshot-ын mmap массивууд read-only тул update_edges тест бүрд хувийн хуулбар үүсгэнэ.
+    return load_graph_cached(roads_path, cache_dir=cache_dir)
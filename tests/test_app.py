@@ -0,0 +1,90 @@
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import ORIGIN, STEP, road_frame
+
+TOKEN = "test-token"
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    root = tmp_path_factory.mktemp("app")
+    (root / "data").mkdir()
+    road_frame().to_file(root / "data" / "gis_osm_roads_free_1.shp")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(root)
+        mp.setenv("ROUTE_ADMIN_TOKEN", TOKEN)
+        mp.setenv("ROUTE_CLICK_LOG", "")
+        sys.modules.pop("app", None)
+        module = importlib.import_module("app")
+        yield module
+    sys.modules.pop("app", None)
+
+
+def post_updates(app_module, updates):
+    return app_module.app.test_client().post(
+        "/api/admin/edges", json={"updates": updates}, headers={"X-Admin-Token": TOKEN})
+
+
+def first_edge(graph):
+    u = next(n for n in range(graph.num_nodes) if graph.offsets[n + 1] > graph.offsets[n])
+    return u, int(graph.targets[graph.offsets[u]])
+
+
+@pytest.mark.parametrize("value", ["false", "0", 0, 1])
+def test_admin_rejects_non_bool_flags(app_module, value):
+    graph = app_module.GRAPH
+    u, v = first_edge(graph)
+    before = (graph.version, list(graph.weights))
+    for key in ("closed", "both_directions"):
+        assert post_updates(app_module, [{"u": u, "v": v, key: value}]).status_code == 400
+    assert (graph.version, list(graph.weights)) == before
+
+
+def test_admin_closes_and_reopens(app_module):
+    graph = app_module.GRAPH
+    u, v = first_edge(graph)
+    e = graph.edge_between(u, v)
+    assert post_updates(app_module, [{"u": u, "v": v, "closed": True}]).status_code == 200
+    assert graph.weights[e] == float("inf")
+    assert post_updates(app_module, [{"u": u, "v": v, "closed": False}]).status_code == 200
+    assert graph.weights[e] < float("inf")
+
+
+@pytest.mark.parametrize("snap", ["edge", "node"])
+def test_path_reports_loader_nodes(app_module, snap):
+    graph = app_module.GRAPH
+    query = (f"/api/path?alg=dijkstra&snap={snap}&start_lon={ORIGIN[0] + 0.5 * STEP}"
+             f"&start_lat={ORIGIN[1] + 1.1 * STEP}&end_lon={ORIGIN[0] + 12.5 * STEP}"
+             f"&end_lat={ORIGIN[1] + 12.9 * STEP}")
+    data = app_module.app.test_client().get(query).get_json()
+    core = graph.original_ids(data["nodes"])
+    assert len(core) > len(data["nodes"])
+    if snap == "node":
+        assert data["orig_nodes"] == core
+    else:
+        start = data["orig_nodes"].index(core[0])
+        assert data["orig_nodes"][start:start + len(core)] == core
+
+
+def test_snap_json_and_binary_agree_with_nearest_nodes(app_module):
+    graph = app_module.GRAPH
+    rng = np.random.default_rng(6)
+    points = ORIGIN + rng.uniform(-1, 15, (50, 2)) * STEP
+    points[0] = (ORIGIN[0] + 40 * STEP, ORIGIN[1])  # max_dist_m-ээс хол
+    nodes, dist = graph.nearest_nodes(points[:, 0], points[:, 1], main_component=True,
+                                      max_dist_m=500)
+    assert nodes[0] == -1 and (nodes[1:] >= 0).all()
+    client = app_module.app.test_client()
+    data = client.post("/api/snap", json={"points": points.tolist(), "max_dist_m": 500}).get_json()
+    assert data["nodes"] == nodes.tolist()
+    assert data["dist_m"][0] is None and np.allclose(data["dist_m"][1:], dist[1:])
+    raw = client.post("/api/snap?max_dist_m=500", data=points.astype("<f8").tobytes(),
+                      content_type="application/octet-stream").get_data()
+    assert np.array_equal(np.frombuffer(raw[:8 * len(points)], dtype="<i8"), nodes)
+    assert np.array_equal(np.frombuffer(raw[8 * len(points):], dtype="<f8"), dist)
+    assert client.post("/api/snap", data=b"\0" * 15,
+                       content_type="application/octet-stream").status_code == 400
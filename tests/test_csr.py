@@ -0,0 +1,97 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from graph import EdgeUpdate, csr, dijkstra_shortest, dijkstra_snapped
+from graph.attributes import FCLASS_CODES, way_flags
+from graph.io.loader import edges_to_road_graph, load_edge_list, load_graph_from_shapefile
+
+from conftest import ORIGIN, STEP
+
+
+def assert_loader_path(road, ids, weight):
+    # Шахагдсан node-уудыг оруулсан тул loader-ийн граф дээрх бүрэн зам байх ёстой.
+    hops = [min(w for v, w in road.neighbors(u) if v == x) for u, x in zip(ids, ids[1:])]
+    assert np.isclose(sum(hops), weight)
+
+
+def test_csr_is_smaller_and_agrees(roads_path):
+    edges = load_edge_list(roads_path)
+    tracemalloc.start()
+    road = edges_to_road_graph(edges)
+    road_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    frozen = road.freeze()
+    assert road_bytes >= 5 * sum(arr.nbytes for arr in frozen.arrays().values())
+    rng = np.random.default_rng(1)
+    for s, t in rng.integers(frozen.num_nodes, size=(30, 2)).tolist():
+        assert dijkstra_shortest(frozen, s, t) == dijkstra_shortest(road, s, t)
+
+
+def test_edge_attributes_follow_ways(roads_path):
+    road = load_graph_from_shapefile(roads_path)
+    frozen = road.freeze()
+    assert [frozen.edge_fclass.dtype, frozen.edge_flags.dtype, frozen.edge_maxspeed.dtype,
+            frozen.edge_name.dtype] == [np.uint8, np.uint8, np.uint16, np.int32]
+    names = frozen.meta["edge_names"]
+    ways = [road.ways[edge.way] for u in range(len(road.nodes)) for edge in road.adj[u]]
+    assert len(ways) == frozen.num_edges
+    for e, way in enumerate(ways):
+        assert FCLASS_CODES[frozen.edge_fclass[e]] == way.fclass
+        assert frozen.edge_flags[e] == way_flags(way.oneway, way.access)
+        assert frozen.edge_maxspeed[e] == way.maxspeed
+        assert names[frozen.edge_name[e]] == (way.name or "")
+
+
+def test_may_reach_rejects_only_unreachable_pairs(graph):
+    stub = graph.nearest_node(ORIGIN[0] - 0.05, ORIGIN[1] - 0.05)
+    rng = np.random.default_rng(4)
+    pairs = rng.integers(graph.num_nodes, size=(300, 2)).tolist()
+    pairs += [(stub, t) for t in range(0, graph.num_nodes, 7)]
+    rejected = 0
+    for s, t in pairs:
+        if not graph.may_reach(s, t):
+            assert dijkstra_shortest(graph, s, t) == ([], float("inf"))
+            rejected += 1
+    assert rejected >= graph.num_nodes // 7
+
+
+def test_original_ids_point_at_loader_nodes(graph, roads_path):
+    road = load_graph_from_shapefile(roads_path)
+    main = np.flatnonzero(np.asarray(graph.scc) == graph.meta["main_scc"])
+    path, weight = dijkstra_shortest(graph, int(main[0]), int(main[-1]))
+    assert path
+    ids = graph.original_ids(path)
+    assert len(ids) > len(path)
+    assert road.nodes[ids[0]] == graph.nodes[path[0]]
+    assert road.nodes[ids[-1]] == graph.nodes[path[-1]]
+    assert_loader_path(road, ids, weight)
+
+
+def test_snapped_original_ids_cover_partial_edges(graph, roads_path):
+    road = load_graph_from_shapefile(roads_path)
+    src = graph.snap_to_edge(ORIGIN[0] + 0.5 * STEP, ORIGIN[1] + 1.1 * STEP, main_component=True)
+    dst = graph.snap_to_edge(ORIGIN[0] + 12.5 * STEP, ORIGIN[1] + 12.9 * STEP, main_component=True)
+    path, _ = dijkstra_snapped(graph, src, dst)
+    ids = graph.snapped_original_ids(src, dst, path)
+    core = graph.original_ids(path)
+    start = ids.index(core[0])
+    assert ids[start:start + len(core)] == core
+    assert len(ids) > len(core)
+    for u, x in zip(ids, ids[1:]):
+        assert any(v == x for v, _ in road.neighbors(u))
+
+
+def test_reader_gives_up_on_stuck_writer(graph, monkeypatch):
+    monkeypatch.setattr(csr, "READ_TIMEOUT_S", 0.05)
+    u = int(np.flatnonzero(np.diff(np.asarray(graph.offsets)))[0])
+    v = int(graph.targets[graph.offsets[u]])
+    graph.update_edges([EdgeUpdate(u=u, v=v, weight=1.0)])
+    graph.version_counter[0] += 1  # бичигч version-ийг сондгой үлдээгээд унасан
+    with pytest.raises(TimeoutError):
+        graph.read_consistent(lambda: None)
+    graph.update_edges([EdgeUpdate(u=u, v=v, closed=True)])
+    assert graph.version % 2 == 0
+    closed = graph.read_consistent(lambda: graph.weights[graph.edge_indices(u, v)].tolist())
+    assert closed == [float("inf")]
@@ -0,0 +1,217 @@
+import math
+import numpy as np
+import pytest
+
+from graph import (
+    EdgeUpdate,
+    astar_shortest,
+    bidijkstra_shortest,
+    bidijkstra_snapped,
+    dijkstra_shortest,
+    dijkstra_snapped,
+)
+from graph.algorithms.alt import build_landmarks, load_landmarks, save_landmarks
+from graph.algorithms.astar import is_metric
+from graph.algorithms.ch import build_hierarchy
+from graph.algorithms.crp import build_overlay
+from graph.algorithms.hub_labels import HubLabels, build_hub_labels
+from graph.io.loader import load_graph_from_shapefile
+from graph.io.snapshot import load_graph_cached
+from graph.models import SearchStats
+
+from conftest import ORIGIN, STEP, road_frame
+
+PAIRS = 150
+CELL_SIZE = 16  # туршилтын граф жижиг тул CRP олон түвшинтэй байхаар
+ALGS = ("bidijkstra", "ch", "alt", "hl", "crp")
+CITY = 40  # урт маршрутын туршилтын том сүлжээ
+# Хотын төвөөр дайрах маршрутууд (торны нүдээр); булангаас булан хүртэлх
+# маршрутад Манхэттэн торон дээр хоёр талын хайлт бараг бүх node-ийг хамардаг.
+CROSS_CITY = (((10, 20), (30, 20)), ((20, 10), (20, 30)),
+              ((12, 12), (28, 28)), ((28, 12), (12, 28)))
+
+
+def engines(graph):
+    """
+    alg -> (node-оос node, snap хийсэн цэгүүдээс) хайлт; app.py-ийн
+    WEIGHTED_ENGINES-тэй ижил дуудлагууд.
+    """
+    ch = build_hierarchy(graph)
+    lm = build_landmarks(graph)
+    hl = build_hub_labels(graph)
+    crp = build_overlay(graph, cell_size=CELL_SIZE)
+    return {
+        "bidijkstra": (bidijkstra_shortest, bidijkstra_snapped),
+        "ch": (ch.shortest, ch.snapped),
+        "alt": (lm.shortest, lm.snapped),
+        "hl": (hl.shortest, hl.snapped),
+        "crp": (crp.shortest, crp.snapped),
+    }
+
+
+@pytest.fixture(scope="module")
+def city(tmp_path_factory):
+    path = tmp_path_factory.mktemp("city") / "roads.shp"
+    road_frame(CITY).to_file(path)
+    return load_graph_cached(str(path), cache_dir=str(path.parent / "cache"))
+
+
+def cross_city(graph):
+    return [tuple(graph.nearest_node(ORIGIN[0] + x * STEP, ORIGIN[1] + y * STEP,
+                                     main_component=True) for x, y in pair)
+            for pair in CROSS_CITY]
+
+
+def run_pairs(graph, shortest, pairs):
+    stats = SearchStats()
+    return [shortest(graph, s, t, stats)[1] for s, t in pairs], stats.settled
+
+
+def random_pairs(graph, count=PAIRS, seed=7):
+    rng = np.random.default_rng(seed)
+    n = graph.num_nodes
+    return list(zip(rng.integers(n, size=count).tolist(), rng.integers(n, size=count).tolist()))
+
+
+def same_weight(a, b):
+    return a == b or math.isclose(a, b, rel_tol=1e-9)
+
+
+def path_weight(graph, path):
+    return sum(min(w for v, w in graph.neighbors(u) if v == x) for u, x in zip(path, path[1:]))
+
+
+def check_pairs(graph, shortest):
+    for s, t in random_pairs(graph):
+        path, weight = shortest(graph, s, t)
+        expected = dijkstra_shortest(graph, s, t)[1]
+        assert same_weight(weight, expected), (s, t)
+        if path:
+            assert path[0] == s and path[-1] == t
+            assert same_weight(path_weight(graph, path), expected)
+
+
+def close_edges(graph, share=0.1, seed=11):
+    rng = np.random.default_rng(seed)
+    src = np.repeat(np.arange(graph.num_nodes), np.diff(np.asarray(graph.offsets)))
+    picked = rng.choice(graph.num_edges, size=int(graph.num_edges * share), replace=False)
+    targets = np.asarray(graph.targets)
+    graph.update_edges([EdgeUpdate(u=int(src[e]), v=int(targets[e]), closed=True)
+                        for e in picked])
+
+
+def scale_weights(graph, factor):
+    src = np.repeat(np.arange(graph.num_nodes), np.diff(np.asarray(graph.offsets)))
+    targets, weights = np.asarray(graph.targets), np.array(graph.weights)
+    graph.update_edges([EdgeUpdate(u=int(src[e]), v=int(targets[e]), weight=float(weights[e] * factor))
+                        for e in range(graph.num_edges)])
+
+
+@pytest.mark.parametrize("factor", [1.0, 0.2])
+def test_astar_matches_dijkstra(graph, factor):
+    if factor != 1.0:
+        # Жинг их тойргийн уртаас нь бууруулсан ч хязгаар admissible хэвээр байх ёстой.
+        scale_weights(graph, factor)
+    check_pairs(graph, astar_shortest)
+
+
+@pytest.mark.parametrize("alg", ALGS)
+def test_engine_matches_dijkstra(graph, alg):
+    check_pairs(graph, engines(graph)[alg][0])
+
+
+@pytest.mark.parametrize("alg", ALGS)
+def test_snapped_engine_matches_dijkstra(graph, alg):
+    snapped = engines(graph)[alg][1]
+    rng = np.random.default_rng(13)
+    points = ORIGIN + rng.uniform(-1, 15, (40, 2)) * STEP
+    snaps = [graph.snap_to_edge(lon, lat, main_component=True) for lon, lat in points]
+    for src, dst in zip(snaps[::2], snaps[1::2]):
+        expected = dijkstra_snapped(graph, src, dst)[1]
+        assert same_weight(snapped(graph, src, dst)[1], expected)
+
+
+def test_bidijkstra_settles_fewer(city):
+    pairs = cross_city(city)
+    expected, settled = run_pairs(city, dijkstra_shortest, pairs)
+    weights, bi_settled = run_pairs(city, bidijkstra_shortest, pairs)
+    assert all(map(same_weight, weights, expected))
+    assert bi_settled <= 0.7 * settled
+
+
+def test_alt_beats_astar_from_mmapped_tables(city, tmp_path):
+    save_landmarks(build_landmarks(city), str(tmp_path / "alt"))
+    lm = load_landmarks(str(tmp_path / "alt"))
+    for name in ("fwd", "bwd"):
+        table = lm.arrays()[name]
+        assert isinstance(table, np.memmap) and table.dtype == np.float32, name
+    pairs = cross_city(city)
+    expected, astar_settled = run_pairs(city, astar_shortest, pairs)
+    weights, alt_settled = run_pairs(city, lm.shortest, pairs)
+    assert all(map(same_weight, weights, expected))
+    assert alt_settled <= 0.5 * astar_settled
+
+
+@pytest.mark.parametrize("update", ["decrease", "close"])
+def test_alt_after_update(graph, update):
+    lm = build_landmarks(graph)
+    if update == "decrease":
+        scale_weights(graph, 0.2)
+    else:
+        close_edges(graph)
+    assert lm.is_valid(graph)
+    check_pairs(graph, lm.shortest)
+
+
+def test_crp_after_customize(graph):
+    crp = build_overlay(graph, cell_size=CELL_SIZE)
+    close_edges(graph)
+    scale_weights(graph, 0.5)
+    assert crp.is_valid(graph) and not crp.is_customized(graph)
+    assert crp.customize(graph) > 0
+    assert crp.is_customized(graph)
+    check_pairs(graph, crp.shortest)
+
+
+def test_static_indexes_invalidated_by_update(graph):
+    ch, hl = build_hierarchy(graph), build_hub_labels(graph)
+    assert ch.is_valid(graph) and hl.is_valid(graph)
+    close_edges(graph, share=0.01)
+    assert not ch.is_valid(graph) and not hl.is_valid(graph)
+
+
+def test_hl_reports_scanned_entries(graph):
+    hl = build_hub_labels(graph)
+    s, t = next((s, t) for s, t in random_pairs(graph) if s != t and hl.distance(s, t) < math.inf)
+    stats = SearchStats()
+    hl.shortest(graph, s, t, stats)
+    assert stats.settled > 0
+
+
+def test_hl_table_skips_empty_labels():
+    # 1-ийн орох label хоосон: reduceat дараагийн сегментийн утгыг буцаах ёсгүй.
+    arrays = {
+        "order": np.arange(3),
+        "out_offsets": np.array([0, 1, 2, 3]), "out_hubs": np.array([0, 1, 2]),
+        "out_dists": np.zeros(3),
+        "in_offsets": np.array([0, 1, 1, 3]), "in_hubs": np.array([0, 0, 2]),
+        "in_dists": np.array([0.0, 5.0, 0.0]),
+    }
+    table = HubLabels(arrays).distance_table(np.array([0]), np.array([0, 1, 2]))
+    assert table.tolist() == [[0.0, math.inf, 5.0]]
+    assert HubLabels(arrays).distance_table(np.array([0]), np.array([1])).tolist() == [[math.inf]]
+
+
+def test_astar_uses_bound_on_road_graph(roads_path, caplog):
+    road = load_graph_from_shapefile(roads_path)
+    assert is_metric(road)
+    ids = list(road.nodes)
+    astar_stats, dijkstra_stats = SearchStats(), SearchStats()
+    for s, t in zip(ids[:40], ids[::-1][:40]):
+        weight = astar_shortest(road, s, t, astar_stats)[1]
+        assert same_weight(weight, dijkstra_shortest(road, s, t, dijkstra_stats)[1])
+    assert astar_stats.settled < dijkstra_stats.settled
+    road.meta.clear()
+    with caplog.at_level("WARNING"):
+        astar_shortest(road, ids[0], ids[-1])
+    assert "h = 0" in caplog.text
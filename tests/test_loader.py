@@ -0,0 +1,153 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyproj
+import pytest
+import shapely
+from shapely.geometry import LineString
+
+from graph.io import loader
+from graph.io.convert import convert
+from graph.io.loader import edges_to_csr, edges_to_road_graph, load_edge_list
+from graph.io.snapshot import load_graph_cached
+from graph.models import LoadReport
+
+from conftest import ORIGIN, STEP, road_frame
+
+BBOX = (ORIGIN[0] + 2.5 * STEP, ORIGIN[1] + 2.5 * STEP,
+        ORIGIN[0] + 8.5 * STEP, ORIGIN[1] + 9.5 * STEP)
+
+
+def assert_same_edges(a, b):
+    for name in ("lon", "lat", "src", "dst", "way"):
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+    assert np.allclose(a.weight, b.weight, rtol=1e-12)
+    assert a.ways.keys() == b.ways.keys()
+    for col in a.ways:
+        assert list(a.ways[col]) == list(b.ways[col]), col
+
+
+@pytest.fixture(scope="module")
+def edges(roads_path):
+    return load_edge_list(roads_path)
+
+
+def test_csr_matches_road_graph(edges):
+    road = edges_to_road_graph(edges)
+    expected_report = road.remove_redundant_edges()
+    expected = road.freeze()
+    graph, report = edges_to_csr(edges)
+    assert (report.self_loops, report.parallel) == (expected_report.self_loops,
+                                                    expected_report.parallel)
+    assert report.parallel > 0
+    for name in ("offsets", "targets", "weights", "lon", "lat",
+                 "edge_fclass", "edge_flags", "edge_maxspeed", "edge_name"):
+        assert np.array_equal(np.asarray(getattr(graph, name)),
+                              np.asarray(getattr(expected, name))), name
+    assert graph.meta["edge_names"] == expected.meta["edge_names"]
+
+
+def test_weights_are_geodesic_meters(edges, tmp_path):
+    _, _, geodesic = pyproj.Geod(ellps="WGS84").inv(edges.lon[edges.src], edges.lat[edges.src],
+                                                     edges.lon[edges.dst], edges.lat[edges.dst])
+    # Бөмбөрцөг ба эллипсоидын ялгаа хотын хэмжээнд 0.5%-иас бага.
+    assert np.allclose(edges.weight, geodesic, rtol=5e-3)
+    path = str(tmp_path / "mercator.shp")
+    road_frame().to_crs(epsg=3857).to_file(path)
+    with pytest.raises(ValueError):
+        load_edge_list(path)
+    assert len(load_edge_list(path, weights="average").weight) == len(edges.weight)
+
+
+@pytest.mark.parametrize("options", [{"chunk_size": 17}, {"chunk_size": 17, "workers": 2},
+                                     {"chunk_size": None}])
+def test_loader_modes_agree(roads_path, edges, options):
+    assert_same_edges(load_edge_list(roads_path, **options), edges)
+
+
+@pytest.mark.parametrize("options", [{}, {"chunk_size": 17, "workers": 2}])
+def test_load_report_counts_and_stages(roads_path, edges, options):
+    frame = road_frame()
+    kept = frame[~frame["fclass"].isin(loader.EXCLUDED_FCLASS)
+                 & ~frame["access"].isin(loader.EXCLUDED_ACCESS)]
+    segments = sum(len(line.coords) - 1 for geom in kept.geometry
+                   for line in getattr(geom, "geoms", [geom]))
+    report = LoadReport()
+    load_edge_list(roads_path, report=report, **options)
+    assert (report.features, report.segments) == (len(frame), segments)
+    assert (report.nodes, report.edges) == (len(edges.lon), len(edges.src))
+    assert {"read", "filter", "coords", "dedup", "edges", "merge"} <= report.stages.keys()
+    assert report.seconds > 0 and report.peak_rss_mb > 0
+    assert report.segments_per_sec == report.segments / report.seconds
+
+
+def test_each_load_logs_one_report(roads_path, tmp_path, caplog):
+    with caplog.at_level("INFO", logger="graph.io.snapshot"):
+        built = load_graph_cached(roads_path, cache_dir=str(tmp_path))
+        load_graph_cached(roads_path, cache_dir=str(tmp_path))
+    summaries = [r for r in caplog.records if "peak RSS" in r.getMessage()]
+    assert len(summaries) == 2  # барихад нэг, snapshot-оос ачаалахад нэг
+    assert built.meta["load_report"]["nodes"] == built.num_nodes
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".fgb"])
+def test_converted_formats_match_shapefile(roads_path, edges, tmp_path, suffix):
+    path = str(tmp_path / f"roads{suffix}")
+    convert(roads_path, path)
+    assert_same_edges(load_edge_list(path), edges)
+    assert_same_edges(load_edge_list(path, chunk_size=17), edges)
+
+
+@pytest.mark.parametrize("options", [{"chunk_size": 7}, {"chunk_size": 7, "workers": 2}])
+def test_bbox_windows_filter_once(roads_path, monkeypatch, options):
+    expected = load_edge_list(roads_path, bbox=BBOX, chunk_size=None)
+    assert 0 < len(expected.src) < len(load_edge_list(roads_path).src)
+    filters = []
+    real = loader.pyogrio.read_dataframe
+
+    def counting(path, **kwargs):
+        if kwargs.get("bbox") is not None:
+            filters.append(kwargs)
+        return real(path, **kwargs)
+
+    monkeypatch.setattr(loader.pyogrio, "read_dataframe", counting)
+    assert_same_edges(load_edge_list(roads_path, bbox=BBOX, **options), expected)
+    assert len(filters) == 1 and filters[0]["read_geometry"] is False
+
+
+def baseline_node_count(path):
+    # Анхны loader-ийн get_node_id: shapely-ийн Python float-ууд дээр round(x, 6).
+    gdf = gpd.read_file(path)
+    keys = set()
+    for row in gdf.itertuples():
+        if row.access in loader.EXCLUDED_ACCESS or row.fclass in loader.EXCLUDED_FCLASS:
+            continue
+        lines = getattr(row.geometry, "geoms", [row.geometry])
+        for line in lines:
+            keys.update((round(x, 6), round(y, 6)) for x, y in line.coords)
+    return len(keys)
+
+
+def test_node_keys_match_baseline_rounding(tmp_path):
+    # Хагас микро-градусын цэгүүд: x * 1e6-ийн дугуйралт round()-оос ялгаатай гардаг.
+    ties = [ORIGIN[0] + (k + 0.5) / 1e6 for k in range(60)]
+    frame = road_frame()
+    extra = frame.iloc[[0]].copy()
+    extra["geometry"] = [LineString([(x, ORIGIN[1] - STEP) for x in ties])]
+    extra["fclass"], extra["access"] = "service", None
+    path = str(tmp_path / "ties.shp")
+    pd.concat([frame, extra], ignore_index=True).to_file(path)
+    assert len(load_edge_list(path).lon) == baseline_node_count(path)
+
+
+def test_polygon_mask_and_clip(roads_path):
+    assert_same_edges(load_edge_list(roads_path, mask=shapely.box(*BBOX)),
+                      load_edge_list(roads_path, bbox=BBOX))
+    triangle = shapely.Polygon([(BBOX[0], BBOX[1]), (BBOX[2], BBOX[1]), (BBOX[0], BBOX[3])])
+    loose = load_edge_list(roads_path, mask=triangle)
+    clipped = load_edge_list(roads_path, mask=triangle, clip=True)
+    inside = shapely.covers(triangle.buffer(1e-9), shapely.points(clipped.lon, clipped.lat))
+    assert inside.all()
+    assert not shapely.covers(triangle, shapely.points(loose.lon, loose.lat)).all()
+    assert_same_edges(load_edge_list(roads_path, mask=triangle, clip=True,
+                                     chunk_size=7, workers=2), clipped)
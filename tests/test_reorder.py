@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from graph import dijkstra_shortest
+from graph.io.snapshot import load_graph_cached
+
+from conftest import road_frame
+
+
+@pytest.fixture(scope="module")
+def city_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("reorder") / "roads.shp"
+    road_frame(40).to_file(path)
+    return str(path)
+
+
+def edge_span(graph):
+    # Ирмэгийн хоёр үзүүрийн id-ийн зөрүү: бага бол хөршүүд санах ойд ойрхон.
+    src = np.repeat(np.arange(graph.num_nodes), np.diff(np.asarray(graph.offsets)))
+    return np.abs(src - np.asarray(graph.targets))
+
+
+@pytest.mark.parametrize("mode", ["hilbert", "bfs"])
+def test_reorder_keeps_routes_and_improves_locality(city_path, tmp_path, mode):
+    base = load_graph_cached(city_path, cache_dir=str(tmp_path), reorder="none")
+    graph = load_graph_cached(city_path, cache_dir=str(tmp_path), reorder=mode)
+    # orig_ids loader-ийн id руу заадаг тул хоёр графыг түүгээр нь холбоно.
+    to_base = {o: i for i, o in enumerate(np.asarray(base.orig_ids).tolist())}
+    orig = np.asarray(graph.orig_ids).tolist()
+    rng = np.random.default_rng(2)
+    for s, t in rng.integers(graph.num_nodes, size=(30, 2)).tolist():
+        weight = dijkstra_shortest(graph, s, t)[1]
+        expected = dijkstra_shortest(base, to_base[orig[s]], to_base[orig[t]])[1]
+        assert weight == expected or np.isclose(weight, expected, rtol=1e-12)
+    span, base_span = edge_span(graph), edge_span(base)
+    if mode == "hilbert":
+        assert np.median(span) * 4 <= np.median(base_span)
+    else:
+        assert span.mean() < base_span.mean()
@@ -0,0 +1,42 @@
+import multiprocessing
+
+import numpy as np
+
+from graph import EdgeUpdate, dijkstra_shortest
+from graph.shared import attach_shared, publish_shared, release_shared
+
+
+def close_in_worker(name, u, v):
+    graph = attach_shared(name)
+    graph.update_edges([EdgeUpdate(u=u, v=v, closed=True)])
+
+
+def assert_no_copies(attached, graph):
+    segment = np.frombuffer(attached._shm.buf, dtype=np.uint8)
+    expected = graph.arrays()
+    expected.setdefault("open_weights", expected["weights"])
+    for name, arr in attached.arrays().items():
+        assert np.shares_memory(arr, segment), name
+        assert np.array_equal(arr, expected[name]), name
+
+
+def test_workers_share_one_copy(graph):
+    shm = publish_shared(graph)
+    try:
+        attached = attach_shared(shm.name)
+        assert_no_copies(attached, graph)
+        u = int(np.flatnonzero(np.diff(np.asarray(graph.offsets)))[0])
+        v = int(graph.targets[graph.offsets[u]])
+        assert dijkstra_shortest(attached, u, v) == dijkstra_shortest(graph, u, v)
+
+        # Өөр процесст хийсэн бичилт хуулбаргүйгээр энд шууд харагдана.
+        worker = multiprocessing.get_context("spawn").Process(
+            target=close_in_worker, args=(shm.name, u, v))
+        worker.start()
+        worker.join(60)
+        assert worker.exitcode == 0
+        assert attached.version == graph.version + 2
+        assert attached.weights[attached.edge_indices(u, v)].tolist() == [float("inf")]
+        del attached
+    finally:
+        release_shared(shm)
@@ -0,0 +1,42 @@
+import json
+import os
+import pytest
+
+from graph.csr import CSRGraph
+from graph.io.snapshot import load_graph_cached, load_snapshot, save_snapshot
+
+
+def test_snapshot_round_trip(graph, tmp_path):
+    save_snapshot(graph, str(tmp_path / "g"))
+    loaded = load_snapshot(str(tmp_path / "g"))
+    for name, arr in graph.arrays().items():
+        assert (loaded.arrays()[name] == arr).all(), name
+    assert loaded.meta == graph.meta
+
+
+@pytest.mark.parametrize("name", CSRGraph.INDEX_ARRAYS)
+def test_snapshot_without_index_is_rejected(graph, tmp_path, name):
+    path = str(tmp_path / "g")
+    save_snapshot(graph, path)
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    del meta["arrays"][name]
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_stale_snapshot_is_rebuilt(roads_path, tmp_path):
+    cache = str(tmp_path / "cache")
+    graph = load_graph_cached(roads_path, cache_dir=cache)
+    (path,) = [os.path.join(cache, name) for name in os.listdir(cache)]
+    os.remove(os.path.join(path, "rev_offsets.npy"))
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    del meta["arrays"]["rev_offsets"]
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    rebuilt = load_graph_cached(roads_path, cache_dir=cache)
+    assert rebuilt.rev_offsets is not None
+    assert rebuilt.num_edges == graph.num_edges
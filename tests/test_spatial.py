@@ -0,0 +1,115 @@
+import numpy as np
+
+from graph import EdgeUpdate, dijkstra_shortest, dijkstra_snapped
+from graph.components import label_components
+from graph.geo import haversine_m
+from graph.io.loader import load_graph_from_shapefile
+from graph.spatial import DEG_M
+
+from conftest import ORIGIN, STEP
+
+
+def test_snap_skips_closed_edges(graph):
+    lon, lat = ORIGIN[0] + 2.4 * STEP, ORIGIN[1] + 2.1 * STEP
+    snap = graph.snap_to_edge(lon, lat, main_component=True)
+    graph.update_edges([EdgeUpdate(u=snap.a, v=snap.b, closed=True, both_directions=True)])
+    moved = graph.snap_to_edge(lon, lat, main_component=True)
+    assert (moved.a, moved.b, moved.geom) != (snap.a, snap.b, snap.geom)
+    assert moved.dist_m >= snap.dist_m
+    assert graph.snap_weights(moved) != (float("inf"), float("inf"))
+    if moved.dist_m > snap.dist_m:
+        limit = (snap.dist_m + moved.dist_m) / 2
+        assert graph.snap_to_edge(lon, lat, main_component=True, max_dist_m=limit) is None
+    target = graph.snap_to_edge(ORIGIN[0] + 9.6 * STEP, ORIGIN[1] + 10.2 * STEP, main_component=True)
+    assert dijkstra_snapped(graph, moved, target)[1] < float("inf")
+
+
+def test_road_graph_snaps_to_main_component(roads_path):
+    road = load_graph_from_shapefile(roads_path)
+    frozen = label_components(road.freeze())
+    main = np.flatnonzero(np.asarray(frozen.scc) == frozen.meta["main_scc"])
+    assert len(main) < frozen.num_nodes
+    rng = np.random.default_rng(3)
+    lons = ORIGIN[0] + rng.uniform(-1, 15, 100) * STEP
+    lats = ORIGIN[1] + rng.uniform(-1, 15, 100) * STEP
+    ids, _ = road.nearest_nodes(lons, lats, main_component=True)
+    for lon, lat, nid in zip(lons, lats, ids):
+        brute = min(haversine_m(lon, lat, *road.nodes[int(m)]) for m in main)
+        assert nid in main
+        assert np.isclose(haversine_m(lon, lat, *road.nodes[int(nid)]), brute, rtol=1e-3)
+    assert road.nearest_node(lons[0], lats[0], main_component=True) == ids[0]
+
+
+def test_grid_matches_brute_force(graph):
+    rng = np.random.default_rng(5)
+    lons = ORIGIN[0] + rng.uniform(-2, 16, 200) * STEP
+    lats = ORIGIN[1] + rng.uniform(-2, 16, 200) * STEP
+    all_lon, all_lat = np.asarray(graph.lon), np.asarray(graph.lat)
+    main = np.asarray(graph.scc) == graph.meta["main_scc"]
+    for main_component in (False, True):
+        ids, dist = graph.nearest_nodes(lons, lats, main_component=main_component)
+        for lon, lat, nid, d in zip(lons, lats, ids, dist):
+            brute = haversine_m(lon, lat, all_lon, all_lat)
+            if main_component:
+                assert main[nid]
+                brute = brute[main]
+            assert np.isclose(haversine_m(lon, lat, all_lon[nid], all_lat[nid]), brute.min(),
+                              rtol=1e-3)
+            assert np.isclose(d, brute.min(), rtol=1e-3)
+    lon, lat, radius = lons[0], lats[0], 1.5 * STEP * 111_000
+    brute = haversine_m(lon, lat, all_lon, all_lat)
+    nearest = [nid for nid, _ in graph.k_nearest(lon, lat, 5)]
+    assert np.allclose(brute[nearest], np.sort(brute)[:5], rtol=1e-3)
+    within = {nid for nid, _ in graph.nodes_within(lon, lat, radius)}
+    assert within >= set(np.flatnonzero(brute < radius * 0.999).tolist())
+    assert within <= set(np.flatnonzero(brute < radius * 1.001).tolist())
+
+
+def test_grid_empty_mask_finds_nothing(graph):
+    grid = graph.spatial_index
+    none = np.zeros(graph.num_nodes, dtype=bool)
+    # Торон дотор ба гадна (векторчилсан _scan замаар) хоёуланд нь.
+    for lon, lat in ((ORIGIN[0] + 3.3 * STEP, ORIGIN[1] + 4.1 * STEP),
+                     (ORIGIN[0] - 20 * STEP, ORIGIN[1] + 30 * STEP)):
+        assert grid.k_nearest(lon, lat, 3, mask=none) == []
+        assert grid.nearest(lon, lat, mask=none) == -1
+        ids, dist = grid.nearest_many([lon], [lat], mask=none)
+        assert ids[0] == -1 and dist[0] == np.inf
+
+
+def segment_dist_m(lon, lat, road, kx):
+    # Loader-ийн граф дээрх бүх шулуун хэсэг хүртэлх зай (R-tree-гүй).
+    u, v = np.array([(u, v) for u in road.nodes for v, _ in road.neighbors(u)]).T
+    xy = np.array([road.nodes[i] for i in range(len(road.nodes))]) * [kx, 1.0]
+    q = np.array([lon * kx, lat])
+    p, d = xy[u], xy[v] - xy[u]
+    t = np.clip(((q - p) * d).sum(1) / np.maximum((d * d).sum(1), 1e-300), 0.0, 1.0)
+    return np.hypot(*(p + d * t[:, None] - q).T).min() * DEG_M
+
+
+def part(weight, share):
+    return weight * share if weight < float("inf") else weight
+
+
+def test_edge_snap_matches_segments_and_endpoint_routes(graph, roads_path):
+    assert graph._edge_index == {}  # R-tree анхны snap хүртэл баригдахгүй
+    road = load_graph_from_shapefile(roads_path)
+    kx = graph.spatial_index.kx
+    rng = np.random.default_rng(9)
+    clicks = ORIGIN + rng.uniform(0, 13, (20, 2)) * STEP
+    snaps = [graph.snap_to_edge(lon, lat) for lon, lat in clicks]
+    for (lon, lat), snap in zip(clicks, snaps):
+        assert np.isclose(snap.dist_m, segment_dist_m(lon, lat, road, kx), rtol=1e-6)
+        assert snap.dist_m <= graph.spatial_index.k_nearest(lon, lat)[0][1] + 1e-6
+    for src, dst in zip(snaps, snaps[1:]):
+        # Хоёр үзүүрээс хэсэгчилсэн жингээр эхэлсэн хайлт = 4 хослолын хамгийн бага нь.
+        src_ab, src_ba = graph.snap_weights(src)
+        dst_ab, dst_ba = graph.snap_weights(dst)
+        best = float("inf")
+        for s, s_cost in ((src.a, part(src_ba, src.t)), (src.b, part(src_ab, 1 - src.t))):
+            for t, t_cost in ((dst.a, part(dst_ab, dst.t)), (dst.b, part(dst_ba, 1 - dst.t))):
+                best = min(best, s_cost + dijkstra_shortest(graph, s, t)[1] + t_cost)
+        weight = dijkstra_snapped(graph, src, dst)[1]
+        assert weight <= best * (1 + 1e-9)
+        if (src.a, src.b, src.geom) != (dst.a, dst.b, dst.geom):
+            assert np.isclose(weight, best, rtol=1e-9)